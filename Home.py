@@ -124,3 +124,22 @@ with row2_col2:
 st.markdown("---")
 st.info("📌 Aby wrócić do strony głównej z podstron, użyj nawigacji po lewej stronie.")
 
+
+# Pamięć gotowych wykresów jest wspólna dla wszystkich sesji w tym procesie
+with st.expander("🛠️ Pamięć wykresów"):
+    import sys
+
+    # Bez importu: moduł wykresów (numpy, matplotlib) ładuje dopiero strona, która rysuje
+    wykresy = sys.modules.get("obliczenia.wykresy")
+    if wykresy is None:
+        st.caption("Żadna strona nie rysowała jeszcze wykresów w tym procesie serwera.")
+    else:
+        stat = wykresy.domyslna_pamiec().statystyki()
+        kol1, kol2, kol3 = st.columns(3)
+        kol1.metric("Trafienia",
+                    f"{stat['wspolczynnik_trafien']:.0%}" if stat["trafienia"] + stat["chybienia"] else "–",
+                    help=f"{stat['trafienia']} trafień, {stat['chybienia']} chybień")
+        kol2.metric("Zajęta pamięć", f"{stat['bajty'] / 2**20:.1f} MB",
+                    help=f"Limit {stat['limit_bajtow'] / 2**20:.0f} MB")
+        kol3.metric("Obrazy", stat["wpisy"])
+        st.button("Wyczyść pamięć wykresów", on_click=wykresy.domyslna_pamiec().wyczysc)
@@ -0,0 +1,60 @@
+"""Wczytywanie archiwum pomiarów: rozpakowanie do katalogu tymczasowego a czytanie z pamięci (obliczenia.archiwum).
+
+    python -m benchmarks.archiwum --pliki 64 --wiersze 20000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+from benchmarks.wczytywanie_csv import generuj_plik
+from obliczenia.archiwum import wczytaj_archiwum
+from obliczenia.zwilzanie import przygotuj_dane, wczytaj_plik
+
+
+def generuj_archiwum(pliki, wiersze):
+    bufor = io.BytesIO()
+    with tempfile.TemporaryDirectory() as katalog, zipfile.ZipFile(bufor, "w", zipfile.ZIP_DEFLATED) as archiwum:
+        for i in range(pliki):
+            sciezka = os.path.join(katalog, f"woda{i}.csv")
+            generuj_plik(sciezka, wiersze, seed=i)
+            archiwum.write(sciezka, f"pomiary/woda{i}.csv")
+    return bufor.getvalue()
+
+
+def rozpakuj_i_wczytaj(dane):
+    # Dawny sposób: rozpakowanie na dysk i wczytywanie plików po kolei
+    with tempfile.TemporaryDirectory() as katalog:
+        with zipfile.ZipFile(io.BytesIO(dane)) as archiwum:
+            archiwum.extractall(katalog)
+        ramki = []
+        for korzen, _, nazwy in os.walk(katalog):
+            for nazwa in sorted(nazwy):
+                ramki.append(przygotuj_dane(wczytaj_plik.__wrapped__(os.path.join(korzen, nazwa))))
+        return ramki
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pliki", type=int, default=64)
+    parser.add_argument("--wiersze", type=int, default=20000)
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Procesy dla czytania z pamięci")
+    args = parser.parse_args(argv)
+
+    # Bez pamięci dyskowej parserów, by mierzyć samo parsowanie
+    os.environ["CHEMISTAPP_PAMIEC"] = ""
+    dane = generuj_archiwum(args.pliki, args.wiersze)
+    print(f"archiwum: {args.pliki} plików × {args.wiersze} wierszy, {len(dane) / 2**20:.1f} MB")
+
+    for opis, funkcja in (("rozpakowanie + po kolei", rozpakuj_i_wczytaj),
+                          ("z pamięci, 1 proces", lambda d: wczytaj_archiwum(d, procesy=1)),
+                          ("z pamięci, równolegle", lambda d: wczytaj_archiwum(d, procesy=args.procesy))):
+        start = time.perf_counter()
+        wynik = funkcja(dane)
+        print(f"{opis:<24} {time.perf_counter() - start:7.2f} s  ({len(wynik)} plików)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Modele izotermy: siatka w pętli a jednym rzutowaniem, dopasowanie modeli po kolei a równolegle.
+
+    python -m benchmarks.modele_izoterm --punkty 20 --powtorzenia 5
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from obliczenia.modele_izoterm import MODELE, frumkin_model, porownaj_modele
+
+
+def siatka_w_petli(c, y, wezly):
+    # Dawny sposób: model liczony osobno dla każdego węzła siatki
+    return min(np.sum((frumkin_model(c, *p) - y) ** 2) for p in itertools.product(*wezly))
+
+
+def siatka_rzutowaniem(c, y, wezly):
+    G, K, a = np.meshgrid(*wezly, indexing="ij")
+    return np.sum((frumkin_model(c, G[..., None], K[..., None], a[..., None]) - y) ** 2, axis=-1).min()
+
+
+def zmierz(funkcja, powtorzenia):
+    start = time.perf_counter()
+    for _ in range(powtorzenia):
+        funkcja()
+    return (time.perf_counter() - start) / powtorzenia
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--punkty", type=int, default=20)
+    parser.add_argument("--powtorzenia", type=int, default=5)
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Procesy dla dopasowania równoległego")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    c = np.geomspace(1e-5, 1e-2, args.punkty)
+    y = frumkin_model(c, 3e-6, 5e3, 1.0) + rng.normal(0, 0.3, args.punkty)
+    wezly = [np.geomspace(1e-8, 5e-5, 20), np.geomspace(1e-1, 1e8, 24), np.linspace(-5.0, 1.9, 12)]
+
+    print(f"siatka Frumkina {np.prod([len(w) for w in wezly])} węzłów × {args.punkty} punktów")
+    for opis, funkcja in (("w pętli", siatka_w_petli), ("jednym rzutowaniem", siatka_rzutowaniem)):
+        print(f"  {opis:<22} {zmierz(lambda: funkcja(c, y, wezly), 1) * 1000:8.1f} ms")
+
+    print(f"{len(MODELE)} modele")
+    for opis, procesy in (("po kolei", 1), ("równolegle", args.procesy)):
+        czas = zmierz(lambda: porownaj_modele(c, y, procesy=procesy), args.powtorzenia)
+        print(f"  {opis:<22} {czas * 1000:8.1f} ms")
+    print(porownaj_modele(c, y, procesy=1)[["pozycja", "model", "AICc", "waga"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
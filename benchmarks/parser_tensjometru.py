@@ -0,0 +1,84 @@
+"""Porównanie czasu wczytywania eksportu tensjometru: dawne `load_data` kontra `wczytaj_tensjometr`.
+
+    python -m benchmarks.parser_tensjometru --wiersze 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from obliczenia.tensjometr import wczytaj_tensjometr
+
+
+def stara_metoda(plik):
+    # Kopia dawnego load_data z pages/dyfuzja.py (bez dekoratora Streamlit)
+    df = pd.read_csv(plik, sep="\t", engine="python", encoding="cp1250")
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].str.replace(",", ".", regex=False)
+    df.columns = [col.strip().lower() for col in df.columns]
+    for col in ["sigma", "f", "tlife", "temp"]:
+        df[col] = df[col].astype(float)
+    return df
+
+
+def generuj_plik(sciezka, wiersze, seed=0):
+    """Zapisuje syntetyczny plik w formacie eksportu tensjometru."""
+    rng = np.random.default_rng(seed)
+    tlife = rng.integers(30, 20000, wiersze)
+    sigma = 72 - 5 * np.log1p(tlife / 100) + rng.normal(0, 0.2, wiersze)
+    f = 12 - np.log(tlife)
+    temp = 23 + rng.normal(0, 0.1, wiersze)
+
+    def z_przecinkiem(wartosci, fmt):
+        return np.char.replace(np.char.mod(fmt, wartosci), ".", ",")
+
+    kolumny = [
+        np.arange(1, wiersze + 1).astype(str),
+        z_przecinkiem(sigma, "%.1f"),
+        z_przecinkiem(f, "%.3f"),
+        tlife.astype(str),
+        z_przecinkiem(temp, "%.1f"),
+        np.full(wiersze, "10/25/21 01:13:13 am"),
+        np.full(wiersze, "00:00:00"),
+    ]
+    with open(sciezka, "w", encoding="cp1250", newline="\n") as f_out:
+        f_out.write("#\tsigma\tf\tTlife\tTemp\tDate/Time\tTMeas\n")
+        np.savetxt(f_out, np.column_stack(kolumny), fmt="%s", delimiter="\t")
+
+
+def zmierz(funkcja, plik, powtorzenia):
+    czasy = []
+    for _ in range(powtorzenia):
+        start = time.perf_counter()
+        funkcja(plik)
+        czasy.append(time.perf_counter() - start)
+    return min(czasy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wiersze", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--powtorzenia", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as katalog:
+        for wiersze in args.wiersze:
+            plik = os.path.join(katalog, f"synt_{wiersze}.txt")
+            generuj_plik(plik, wiersze)
+
+            nowa = wczytaj_tensjometr(plik)
+            stara = stara_metoda(plik)
+            for col in ("sigma", "f", "tlife", "temp"):
+                np.testing.assert_allclose(nowa[col], stara[col].to_numpy())
+
+            t_stara = zmierz(stara_metoda, plik, args.powtorzenia)
+            t_nowa = zmierz(wczytaj_tensjometr, plik, args.powtorzenia)
+            print(f"{wiersze:>10} wierszy: load_data {t_stara:8.3f} s | "
+                  f"wczytaj_tensjometr {t_nowa:8.3f} s | przyspieszenie ×{t_stara / t_nowa:.1f}")
+
+
+if __name__ == "__main__":
+    main()
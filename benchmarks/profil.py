@@ -0,0 +1,47 @@
+"""Narzut pomiaru etapów (obliczenia.profil) na krótkie wywołanie: bez dekoratora, wyłączony, włączony.
+
+    python -m benchmarks.profil --punkty 50 --powtorzenia 20000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from obliczenia import profil
+from obliczenia.regresja import regresja_liniowa
+
+
+def zmierz(funkcja, x, y, powtorzenia):
+    start = time.perf_counter()
+    for _ in range(powtorzenia):
+        funkcja(x, y)
+    return (time.perf_counter() - start) / powtorzenia
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--punkty", type=int, default=50)
+    parser.add_argument("--powtorzenia", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = np.arange(args.punkty, dtype=float)
+    y = 0.5 * x + rng.normal(0, 1, args.punkty)
+
+    profil.wylacz()
+    wyniki = [("bez dekoratora", zmierz(regresja_liniowa.__wrapped__, x, y, args.powtorzenia)),
+              ("pomiar wyłączony", zmierz(regresja_liniowa, x, y, args.powtorzenia))]
+    profil.wlacz(os.devnull, pamiec=False)
+    wyniki.append(("pomiar czasu", zmierz(regresja_liniowa, x, y, args.powtorzenia)))
+    profil.wlacz(os.devnull, pamiec=True)
+    wyniki.append(("czas i pamięć", zmierz(regresja_liniowa, x, y, args.powtorzenia)))
+    profil.wylacz()
+
+    bazowy = wyniki[0][1]
+    for opis, czas in wyniki:
+        print(f"{opis:<18} {czas * 1e6:8.2f} µs  (+{(czas - bazowy) * 1e6:6.2f} µs)")
+
+
+if __name__ == "__main__":
+    main()
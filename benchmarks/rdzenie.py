@@ -0,0 +1,218 @@
+"""Wzorcowe wartości i czasy wszystkich rdzeni obliczeniowych (bez uruchamiania Streamlit).
+
+Każdy przypadek liczy wynik na prawdziwym pliku z `data/` albo na
+syntetycznych danych w kilku rozmiarach. Wyniki porównywane są z
+`wartosci_wzorcowe.json` (kod wyjścia 1 przy niezgodności), a mediany
+czasów dopisywane do pliku historii JSON-lines, by śledzić zmiany między
+wersjami.
+
+    python -m benchmarks.rdzenie --powtorzenia 5
+    python -m benchmarks.rdzenie --tylko izoterma --bez-historii
+    python -m benchmarks.rdzenie --aktualizuj-wzorce
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Pamięć dyskowa wczytanych plików zafałszowałaby czasy parsowania
+os.environ["CHEMISTAPP_PAMIEC"] = ""
+
+import numpy as np
+
+from benchmarks.parser_tensjometru import generuj_plik
+from obliczenia import energia, izoterma, kinetyka, zwilzanie
+from obliczenia.regresja import regresja_liniowa
+from obliczenia.tensjometr import wczytaj_tensjometr
+
+KATALOG_APLIKACJI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KATALOG_DANYCH = os.path.join(KATALOG_APLIKACJI, "data")
+PLIK_WZORCOW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wartosci_wzorcowe.json")
+PLIK_HISTORII = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historia.jsonl")
+TOLERANCJA = 1e-6
+T = kinetyka.na_kelwiny(23.1, "Celsjusz")
+
+
+def _dane(*czesci):
+    return os.path.join(KATALOG_DANYCH, *czesci)
+
+
+# --- przypadki na prawdziwych plikach: (nazwa, funkcja zwracająca słownik liczb) ---
+
+def kinetyka_pliki():
+    premi = kinetyka.analizuj_plik(_dane("Kinetyka adsorpcji", "10-6 CTB.txt"), T=T)
+    mice = kinetyka.analizuj_plik(_dane("Kinetyka adsorpcji", "CTB 10-2.txt"), T=T)
+    return {
+        "a_premicelarny": premi["a_sqrt_tlife"],
+        "a_micelarny": mice["a_inv_tlife"],
+        "D_premicelarny": premi["D_premicelarny"],
+        "k2": kinetyka.stala_k2(mice["a_inv_tlife"], premi["a_sqrt_tlife"]),
+    }
+
+
+def zwilzanie_washburn():
+    wynik = zwilzanie.analizuj_plik(_dane("Energia powierzchniowa", "Carbopol woda.csv"), B=1e-5)
+    return {"slope": wynik["slope"], "theta": wynik["theta"]}
+
+
+def zwilzanie_goniometr():
+    katy = {}
+    for plik in ("wodaceramika1.xls", "diodometanceramika.xls", "formamidceramika2.xls", "glicerolceramika3.xls"):
+        wynik = zwilzanie.analizuj_plik(_dane("katy_zwilzania", plik), B=1e-5)
+        katy[wynik["ciecz"]] = wynik["theta"]
+    return katy
+
+
+def energia_ceramika():
+    # Kąty zmierzone goniometrem na ceramice dla czterech cieczy z tabeli CIECZE
+    katy = zwilzanie_goniometr()
+    nazwy = {"woda": "Woda", "dijodometan": "Dijodometan", "formamid": "Formamid", "glicerol": "Glicerol"}
+    ciecze = [energia.CIECZE[nazwy[c]] for c in katy]
+    gamma, gamma_d, gamma_p = (np.array([c[k] for c in ciecze]) for k in ("gamma", "gamma_d", "gamma_p"))
+    cos_theta = np.cos(np.radians(list(katy.values())))
+    _, _, gamma_c = energia.zisman(gamma, cos_theta)
+    wynik = energia.owrk(gamma, gamma_d, gamma_p, cos_theta)
+    return {"gamma_c": gamma_c, "gamma_S_p": wynik.gamma_S_p, "gamma_S_d": wynik.gamma_S_d}
+
+
+def izoterma_plik():
+    df = izoterma.wczytaj_plik(_dane("izoterma data.csv"))
+    c, y = df["stezenie"].to_numpy(), df["napiecie"].to_numpy()
+    dopasowanie = izoterma.dopasuj_szyszkowski(c, y)
+    parametry = izoterma.parametry_izotermy(dopasowanie.B, dopasowanie.A)
+    return {klucz: float(parametry[klucz]) for klucz in ("B_sz", "A_sz", "CMC", "Gamma_max", "DeltaGm")}
+
+
+PRZYPADKI_WZORCOWE = {
+    "kinetyka": kinetyka_pliki,
+    "zwilzanie_washburn": zwilzanie_washburn,
+    "zwilzanie_goniometr": zwilzanie_goniometr,
+    "energia": energia_ceramika,
+    "izoterma": izoterma_plik,
+}
+
+
+# --- przypadki skalowane: (nazwa, rozmiar) -> funkcja bez argumentów ---
+
+def _syntetyczne(katalog, rozmiary):
+    rng = np.random.default_rng(0)
+    zadania = []
+    for n in rozmiary:
+        plik = os.path.join(katalog, f"tensjometr_{n}.txt")
+        generuj_plik(plik, n)
+        zadania.append(("kinetyka.parser", n, lambda plik=plik: wczytaj_tensjometr(plik)))
+
+        x = rng.uniform(1, 100, n)
+        y = 2 * x + rng.normal(0, 1, n)
+        maski = rng.random((64, n)) > 0.1
+        zadania.append(("regresja.64_masek", n, lambda x=x, y=y, m=maski: regresja_liniowa(x, y, m)))
+
+        czas = np.linspace(0, 600, min(n, 20000))
+        masa2 = 1e-4 * np.minimum(czas, 400) + rng.normal(0, 1e-6, len(czas))
+        zadania.append(("zwilzanie.okna", len(czas), lambda t=czas, m=masa2: zwilzanie.najlepsze_okno(t, m)))
+
+        c = np.geomspace(1e-6, 1e-2, min(n, 2000))
+        gamma = izoterma.szyszkowski_model(c, 0.07, 4e-6) + rng.normal(0, 0.2, len(c))
+        zadania.append(("izoterma.dopasowanie", len(c), lambda c=c, g=gamma: izoterma.dopasuj_szyszkowski(c, g)))
+
+    liczby_cieczy = sorted({min(max(n // 1000, 3), 60) for n in rozmiary})
+    for k in liczby_cieczy:
+        gamma = rng.uniform(20, 73, k)
+        gamma_d = gamma * rng.uniform(0.3, 1.0, k)
+        cos_theta = rng.uniform(-0.5, 1.0, k)
+        zadania.append(("energia.owrk_pary", k, lambda g=gamma, d=gamma_d, ct=cos_theta: energia.owrk_pary(
+            [str(i) for i in range(len(g))], g, d, g - d, ct)))
+    return zadania
+
+
+def zmierz(funkcja, powtorzenia):
+    czasy = []
+    for _ in range(powtorzenia):
+        # Powtórzenie z tymi samymi danymi trafiałoby w pamięć dopasowań zamiast liczyć dopasowanie
+        izoterma.wyczysc_pamiec_dopasowan()
+        start = time.perf_counter()
+        funkcja()
+        czasy.append(time.perf_counter() - start)
+    return statistics.median(czasy)
+
+
+def porownaj(nazwa, wynik, wzorzec):
+    """Lista opisów rozbieżności między wynikiem a wzorcem."""
+    if wzorzec is None:
+        return [f"{nazwa}: brak wzorca (uruchom z --aktualizuj-wzorce)"]
+    bledy = []
+    for klucz, oczekiwana in wzorzec.items():
+        wartosc = wynik.get(klucz)
+        if wartosc is None or not np.isclose(wartosc, oczekiwana, rtol=TOLERANCJA, atol=0):
+            bledy.append(f"{nazwa}.{klucz}: {wartosc!r} zamiast {oczekiwana!r}")
+    return bledy
+
+
+def _wersja_kodu():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=KATALOG_APLIKACJI,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--powtorzenia", type=int, default=3)
+    parser.add_argument("--rozmiary", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--tylko", default="", help="Uruchom tylko przypadki zawierające ten tekst")
+    parser.add_argument("--historia", default=PLIK_HISTORII, help="Plik JSON-lines z historią czasów")
+    parser.add_argument("--bez-historii", action="store_true")
+    parser.add_argument("--aktualizuj-wzorce", action="store_true", help="Zapisz bieżące wyniki jako wzorcowe")
+    args = parser.parse_args(argv)
+
+    with open(PLIK_WZORCOW, encoding="utf-8") as f:
+        wzorce = json.load(f)
+
+    pomiary, bledy = [], []
+    for nazwa, przypadek in PRZYPADKI_WZORCOWE.items():
+        if args.tylko not in nazwa:
+            continue
+        wynik = {klucz: float(wartosc) for klucz, wartosc in przypadek().items()}
+        if args.aktualizuj_wzorce:
+            wzorce[nazwa] = wynik
+        else:
+            bledy += porownaj(nazwa, wynik, wzorce.get(nazwa))
+        czas = zmierz(przypadek, args.powtorzenia)
+        pomiary.append({"przypadek": nazwa, "rozmiar": None, "mediana_s": czas})
+        print(f"{nazwa:<24} {'plik':>8} {czas * 1000:10.2f} ms")
+
+    with tempfile.TemporaryDirectory() as katalog:
+        for nazwa, rozmiar, funkcja in _syntetyczne(katalog, args.rozmiary):
+            if args.tylko not in nazwa:
+                continue
+            czas = zmierz(funkcja, args.powtorzenia)
+            pomiary.append({"przypadek": nazwa, "rozmiar": rozmiar, "mediana_s": czas,
+                            "na_sekunde": rozmiar / czas})
+            print(f"{nazwa:<24} {rozmiar:>8} {czas * 1000:10.2f} ms  ({rozmiar / czas:,.0f} /s)")
+
+    if args.aktualizuj_wzorce:
+        with open(PLIK_WZORCOW, "w", encoding="utf-8") as f:
+            json.dump(wzorce, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Zapisano wzorce -> {PLIK_WZORCOW}")
+
+    if not args.bez_historii:
+        wspolne = {"czas": time.strftime("%Y-%m-%dT%H:%M:%S"), "wersja": _wersja_kodu(),
+                   "python": platform.python_version(), "numpy": np.__version__}
+        with open(args.historia, "a", encoding="utf-8") as f:
+            for pomiar in pomiary:
+                f.write(json.dumps({**wspolne, **pomiar}, ensure_ascii=False) + "\n")
+
+    for blad in bledy:
+        print(f"NIEZGODNOŚĆ {blad}", file=sys.stderr)
+    return 1 if bledy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
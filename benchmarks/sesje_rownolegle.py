@@ -0,0 +1,82 @@
+"""Przepustowość wielu sesji naraz: dopasowania w wątkach sesji kontra wspólna pula zadań.
+
+Każda symulowana sesja (wątek, jak w serwerze Streamlit) dopasowuje własne
+serie izoterm. Bez puli wszystkie sesje liczą w jednym procesie i
+rywalizują o GIL; z pulą obliczenia trafiają do procesów PulaZadan.
+
+    python -m benchmarks.sesje_rownolegle --sesje 24 --serie 8
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from obliczenia import izoterma
+from obliczenia.zadania import PulaZadan
+
+
+def serie_sesji(numer, liczba):
+    rng = np.random.default_rng(numer)
+    c = np.geomspace(1e-6, 1e-2, 15)
+    return {f"s{numer}_{i}": (c, izoterma.szyszkowski_model(c, rng.uniform(0.05, 0.2), rng.uniform(1e-6, 1e-5))
+                              + rng.normal(0, 0.2, len(c)), None)
+            for i in range(liczba)}
+
+
+def w_watkach(sesje):
+    def sesja(serie):
+        izoterma.dopasuj_serie(serie, procesy=1)
+
+    watki = [threading.Thread(target=sesja, args=(serie,)) for serie in sesje]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+
+def w_puli(sesje, pula):
+    def sesja(numer, serie):
+        klucz = izoterma.zglos_dopasowanie_serii(pula, numer, serie)
+        stan = pula.czekaj(klucz, 600)
+        assert stan.stan == "gotowe", stan.blad
+
+    watki = [threading.Thread(target=sesja, args=(i, serie)) for i, serie in enumerate(sesje)]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sesje", type=int, default=24)
+    parser.add_argument("--serie", type=int, default=8, help="Serii na sesję")
+    parser.add_argument("--procesy", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    sesje = [serie_sesji(i, args.serie) for i in range(args.sesje)]
+    pula = PulaZadan(args.procesy)
+    try:
+        # Rozgrzanie procesów puli (importy numpy/pandas) poza pomiarem
+        pula.czekaj(izoterma.zglos_dopasowanie_serii(pula, "rozgrzewka", serie_sesji(args.sesje, args.procesy)), 600)
+
+        start = time.perf_counter()
+        w_watkach(sesje)
+        t_watki = time.perf_counter() - start
+
+        start = time.perf_counter()
+        w_puli(sesje, pula)
+        t_pula = time.perf_counter() - start
+    finally:
+        pula.zamknij()
+
+    dopasowania = args.sesje * args.serie
+    print(f"{args.sesje} sesji × {args.serie} serii, {args.procesy} procesów")
+    print(f"wątki sesji: {t_watki:8.3f} s ({dopasowania / t_watki:,.0f} dopasowań/s)")
+    print(f"pula zadań:  {t_pula:8.3f} s ({dopasowania / t_pula:,.0f} dopasowań/s) | ×{t_watki / t_pula:.1f}")
+
+
+if __name__ == "__main__":
+    main()
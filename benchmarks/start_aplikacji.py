@@ -0,0 +1,75 @@
+"""Czas pierwszego wyrenderowania strony głównej i każdej podstrony (zimny start).
+
+Każdy pomiar odbywa się w świeżym procesie Pythona, więc obejmuje importy
+wykonywane przez stronę. Opcja --budzet kończy skrypt kodem 1, gdy mediana
+dla którejkolwiek strony przekroczy podany czas.
+
+    python -m benchmarks.start_aplikacji --powtorzenia 5 --budzet 2.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+KATALOG_APLIKACJI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STRONY = ["Home.py", "pages/dyfuzja.py", "pages/energia.py", "pages/izoterma.py", "pages/zwilzanie.py"]
+
+# Sam Streamlit jest importowany przed pomiarem – liczy się tylko koszt strony
+_POMIAR = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+czas = time.perf_counter() - start
+print(czas, int(len(at.exception) > 0), len(sys.modules))
+"""
+
+
+def zmierz_strone(strona, katalog_danych):
+    env = dict(os.environ, PYTHONPATH=KATALOG_APLIKACJI,
+               CHEMISTAPP_POMIARY=os.path.join(katalog_danych, "pomiary.sqlite"),
+               CHEMISTAPP_PAMIEC=os.path.join(katalog_danych, "pamiec"))
+    wynik = subprocess.run([sys.executable, "-c", _POMIAR, strona], cwd=KATALOG_APLIKACJI, env=env,
+                           capture_output=True, text=True, check=True)
+    czas, blad, moduly = wynik.stdout.split()[-3:]
+    if blad == "1":
+        raise RuntimeError(f"Strona {strona} zgłosiła wyjątek podczas renderowania.")
+    return float(czas), int(moduly)
+
+
+def zmierz_sprawdzanie_zaleznosci():
+    sys.path.insert(0, KATALOG_APLIKACJI)
+    start = time.perf_counter()
+    import start_app
+    start_app.brakujace_pakiety(os.path.join(KATALOG_APLIKACJI, start_app.requirements_file))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--powtorzenia", type=int, default=3)
+    parser.add_argument("--budzet", type=float, default=None, help="Maksymalna mediana czasu strony [s]")
+    args = parser.parse_args(argv)
+
+    przekroczone = []
+    with tempfile.TemporaryDirectory() as katalog_danych:
+        for strona in STRONY:
+            pomiary = [zmierz_strone(strona, katalog_danych) for _ in range(args.powtorzenia)]
+            mediana = statistics.median(p[0] for p in pomiary)
+            print(f"{strona:<22} {mediana * 1000:8.1f} ms  (modułów: {pomiary[-1][1]})")
+            if args.budzet is not None and mediana > args.budzet:
+                przekroczone.append(strona)
+
+    print(f"{'start_app (zależności)':<22} {zmierz_sprawdzanie_zaleznosci() * 1000:8.1f} ms")
+
+    if przekroczone:
+        print(f"Przekroczony budżet {args.budzet} s: {', '.join(przekroczone)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Porównanie wczytywania CSV wagi: `sep=None, engine="python"` z zamianą przecinków kontra wykrywanie formatu.
+
+    python -m benchmarks.wczytywanie_csv --wiersze 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from obliczenia.zwilzanie import przygotuj_dane, wczytaj_plik
+
+
+def stara_metoda(plik):
+    # Dawne wczytaj_plik + przygotuj_dane: sniffer na całym pliku i zamiana tekstu kolumna po kolumnie
+    df = pd.read_csv(plik, sep=None, engine="python", encoding="utf-8-sig")
+    df.columns = [str(col).strip() for col in df.columns]
+    df = df.rename(columns={"Time [s]": "time", "Mass² [g²]": "masa^2"})
+    for col in ("time", "masa^2"):
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", "."), errors="coerce")
+    return df
+
+
+def nowa_metoda(plik):
+    return przygotuj_dane(wczytaj_plik.__wrapped__(plik))
+
+
+def generuj_plik(sciezka, wiersze, seed=0):
+    """Zapisuje syntetyczny eksport wagi: BOM, ';', przecinek dziesiętny i puste kolumny na końcu."""
+    rng = np.random.default_rng(seed)
+    czas = np.arange(wiersze) * 0.5
+    masa2 = 1e-4 * np.minimum(czas, 400) + rng.normal(0, 1e-6, wiersze)
+    kolumny = [np.char.replace(np.char.mod("%.6E", wartosci), ".", ",") for wartosci in (czas, masa2)]
+    with open(sciezka, "w", encoding="utf-8-sig", newline="\n") as f:
+        f.write("Time [s];Mass² [g²];;;;\n")
+        np.savetxt(f, np.column_stack(kolumny + [np.full(wiersze, ";;;")]), fmt="%s", delimiter=";")
+
+
+def zmierz(funkcja, plik, powtorzenia):
+    czasy = []
+    for _ in range(powtorzenia):
+        start = time.perf_counter()
+        funkcja(plik)
+        czasy.append(time.perf_counter() - start)
+    return min(czasy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wiersze", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--powtorzenia", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as katalog:
+        for wiersze in args.wiersze:
+            plik = os.path.join(katalog, f"waga_{wiersze}.csv")
+            generuj_plik(plik, wiersze)
+
+            nowa = nowa_metoda(plik)
+            stara = stara_metoda(plik)
+            for col in ("time", "masa^2"):
+                np.testing.assert_allclose(nowa[col], stara[col].to_numpy())
+
+            t_stara = zmierz(stara_metoda, plik, args.powtorzenia)
+            t_nowa = zmierz(nowa_metoda, plik, args.powtorzenia)
+            print(f"{wiersze:>10} wierszy: sep=None {t_stara:8.3f} s | "
+                  f"wykrywanie formatu {t_nowa:8.3f} s | przyspieszenie ×{t_stara / t_nowa:.1f}")
+
+
+if __name__ == "__main__":
+    main()
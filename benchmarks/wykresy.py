@@ -0,0 +1,70 @@
+"""Czas odświeżenia wykresu: pełne rysowanie matplotlib a obraz z pamięci wykresów.
+
+Dla długiej serii (--dlugie) porównywane jest też rysowanie wszystkich
+punktów z rysowaniem po przerzedzeniu (LTTB) z oknem regresji
+przerzedzanym do osobnego budżetu.
+
+    python -m benchmarks.wykresy --punkty 5000 --powtorzenia 20 --dlugie 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from obliczenia.wykresy import PamiecWykresow, przerzedz, renderuj
+
+
+def rysuj(ax, x, y, a, b):
+    ax.scatter(x, y, s=4, label="Dane")
+    ax.plot(x, a * x + b, color="red", label="Regresja")
+    ax.legend()
+
+
+def porownaj_przerzedzanie(punkty):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 600, punkty)
+    y = 1e-4 * np.minimum(x, 400) + rng.normal(0, 1e-6, punkty)
+    okno = (x >= 100) & (x <= 400)
+    pamiec = PamiecWykresow()
+
+    for opis, indeksy in (("wszystkie punkty", slice(None)), ("przerzedzone", None)):
+        start = time.perf_counter()
+        if indeksy is None:
+            indeksy = przerzedz(x, y, zachowaj=okno)
+        obraz = renderuj(rysuj, x[indeksy], y[indeksy], 1e-4, 0.0, pamiec=pamiec)
+        czas = time.perf_counter() - start
+        print(f"{punkty} punktów, {opis:<17} {czas * 1000:8.1f} ms, PNG {len(obraz) / 1024:.0f} KiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--punkty", type=int, default=5000)
+    parser.add_argument("--powtorzenia", type=int, default=20)
+    parser.add_argument("--dlugie", type=int, default=0, help="Długość serii do porównania przerzedzania")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 100, args.punkty))
+    y = 0.5 * x + rng.normal(0, 1, args.punkty)
+    pamiec = PamiecWykresow()
+
+    start = time.perf_counter()
+    renderuj(rysuj, x, y, 0.5, 0.0, pamiec=pamiec)
+    pierwsze = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.powtorzenia):
+        renderuj(rysuj, x, y, 0.5, 0.0, pamiec=pamiec)
+    ponowne = (time.perf_counter() - start) / args.powtorzenia
+
+    stat = pamiec.statystyki()
+    print(f"pierwsze rysowanie   {pierwsze * 1000:8.1f} ms")
+    print(f"ponowne (z pamięci)  {ponowne * 1000:8.2f} ms")
+    print(f"trafienia {stat['wspolczynnik_trafien']:.0%}, pamięć {stat['bajty'] / 1024:.0f} KiB w {stat['wpisy']} obrazach")
+
+    if args.dlugie:
+        porownaj_przerzedzanie(args.dlugie)
+
+
+if __name__ == "__main__":
+    main()
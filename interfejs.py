@@ -0,0 +1,59 @@
+"""Elementy interfejsu Streamlit wspólne dla stron aplikacji (obliczenia pozostają w pakiecie `obliczenia`)."""
+import streamlit as st
+
+
+def uzytkownik():
+    # Limit równoległych obliczeń i pomiary czasu etapów liczone są na sesję przeglądarki
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
+
+
+def panel_wydajnosci():
+    """Percentyle czasów wczytywania, dopasowań i rysowania w pasku bocznym (przy CHEMISTAPP_PROFIL)."""
+    from obliczenia import profil
+
+    if not profil.wlaczony():
+        return
+    sesja = uzytkownik()
+    profil.ustaw_sesje(sesja)
+    with st.sidebar.expander("⏱️ Wydajność"):
+        st.caption("Ta sesja")
+        st.dataframe(profil.percentyle(sesja=sesja).round(2))
+        st.caption("Wszystkie sesje")
+        st.dataframe(profil.percentyle().round(2))
+
+
+def pomoc_pakietu(zawartosc, uwagi=""):
+    """Tekst pomocy przycisku pobierania pakietu analizy (obliczenia.eksport): zawartość, format tabel i uwagi."""
+    return f"{zawartosc}. Tabele: Parquet (CSV, gdy brak pyarrow)." + (f" {uwagi}" if uwagi else "")
+
+
+@st.fragment(run_every=1.0)
+def postep_zadania(klucz, opis):
+    from obliczenia.zadania import domyslna_pula
+
+    stan = domyslna_pula().stan(klucz)
+    if stan is None or stan.stan not in ("czeka", "trwa"):
+        st.rerun()
+    tekst = f"{opis}: {stan.gotowe}/{stan.wszystkie}" if stan.stan == "trwa" else f"{opis}: w kolejce..."
+    st.progress(stan.gotowe / max(stan.wszystkie, 1), text=tekst)
+
+
+def wynik_zadania(nazwa, opis, czekaj=0.0):
+    """StanZadania zakończonego zadania z st.session_state[nazwa] = (klucz, ...) albo None, gdy jeszcze trwa.
+
+    Trwające zadanie pokazuje pasek postępu odświeżany co sekundę bez
+    uruchamiania całego skryptu; po zakończeniu skrypt jest uruchamiany ponownie.
+    """
+    from obliczenia.zadania import StanZadania, domyslna_pula
+
+    klucz = st.session_state[nazwa][0]
+    stan = domyslna_pula().czekaj(klucz, czekaj) if czekaj else domyslna_pula().stan(klucz)
+    if stan is None:
+        return StanZadania("blad", 0, 0, None, "Wynik obliczeń usunięto z pamięci serwera – uruchom je ponownie.")
+    if stan.stan in ("czeka", "trwa"):
+        postep_zadania(klucz, opis)
+        return None
+    return stan
@@ -0,0 +1 @@
+"""Obliczenia numeryczne aplikacji, niezależne od interfejsu Streamlit."""
@@ -0,0 +1,165 @@
+"""Archiwa pomiarów (.zip) czytane bezpośrednio, bez rozpakowywania na dysk.
+
+Pliki archiwum są dekompresowane kolejno do pamięci (`zipfile.ZipFile.open`)
+i przypisywane do analizy: arkusze .xls/.xlsx (waga) do zwilżania, a pliki
+tekstowe po kolumnach nagłówka wykrytego z początku pliku (zob. obliczenia.wykrywanie). Pliki tego samego archiwum
+parsowane są równolegle w puli procesów; pakiety analiz (z manifest.json)
+nie są archiwami pomiarów i czyta je obliczenia.eksport.
+"""
+import io
+import os
+import zipfile
+from collections import namedtuple
+
+from obliczenia.wsadowe import mapuj_rownolegle
+from obliczenia.wykrywanie import ROZMIAR_PROBKI, wykryj_format
+
+MAKS_ROZMIAR = 1 << 30  # [B] łącznie po dekompresji – ochrona przed "bombą zip"
+ZWILZANIE, KINETYKA, IZOTERMA, ENERGIA = "zwilzanie", "kinetyka", "izoterma", "energia"
+RODZAJE_ROZSZERZEN = {".xls": ZWILZANIE, ".xlsx": ZWILZANIE}
+ROZSZERZENIA_TEKSTOWE = (".csv", ".txt", ".dat", "")  # binarne .dat SITA nie mają nagłówka kolumn
+_POMIJANE = ("__MACOSX/", ".")  # metadane archiwizatorów i pliki ukryte
+_OLE = b"\xd0\xcf\x11\xe0"  # nagłówek arkusza .xls
+
+CzlonekArchiwum = namedtuple("CzlonekArchiwum", ["nazwa", "rodzaj", "dane", "blad"])
+CzlonekArchiwum.__doc__ = ("Ścieżka pliku w archiwum, rozpoznana analiza (albo None), wczytana ramka "
+                           "(None przy błędzie) i opis błędu.")
+
+
+def jest_archiwum(plik):
+    """Czy plik (ścieżka, para (nazwa, bajty) albo obiekt plikowy) jest archiwum .zip z pomiarami."""
+    nazwa, dane = plik if isinstance(plik, tuple) else (getattr(plik, "name", plik), None)
+    if not str(nazwa).lower().endswith(".zip"):
+        return False
+    if dane is None and hasattr(plik, "getvalue"):
+        dane = plik.getvalue()
+    try:
+        with zipfile.ZipFile(io.BytesIO(dane) if dane is not None else plik) as archiwum:
+            return "manifest.json" not in archiwum.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def czlonkowie(zrodlo):
+    """Generator par (ścieżka w archiwum, bajty) dla plików archiwum (ścieżka, bajty lub obiekt plikowy)."""
+    if isinstance(zrodlo, bytes):
+        zrodlo = io.BytesIO(zrodlo)
+    with zipfile.ZipFile(zrodlo) as archiwum:
+        pliki = [info for info in archiwum.infolist() if not info.is_dir()
+                 and not any(czesc.startswith(_POMIJANE) for czesc in info.filename.split("/"))]
+        if sum(info.file_size for info in pliki) > MAKS_ROZMIAR:
+            raise ValueError(f"Archiwum po rozpakowaniu przekracza {MAKS_ROZMIAR >> 20} MB.")
+        for info in pliki:
+            with archiwum.open(info) as f:
+                yield info.filename, f.read()
+
+
+def rozpoznaj_rodzaj(nazwa, dane):
+    """Analiza, do której pasuje plik: ZWILZANIE, KINETYKA, IZOTERMA, ENERGIA albo None."""
+    rozszerzenie = os.path.splitext(nazwa)[1].lower()
+    if rozszerzenie in RODZAJE_ROZSZERZEN:
+        return RODZAJE_ROZSZERZEN[rozszerzenie]
+    if dane.startswith(_OLE):
+        return ZWILZANIE
+    if rozszerzenie not in ROZSZERZENIA_TEKSTOWE:
+        return None
+    kolumny = {kolumna.strip().lower() for kolumna in wykryj_format(dane[:ROZMIAR_PROBKI]).kolumny}
+    if {"sigma", "tlife"} <= kolumny:
+        return KINETYKA
+    if "stezenie" in kolumny:
+        return IZOTERMA
+    if {"ciecz", "theta"} <= kolumny:
+        return ENERGIA
+    if kolumny & {"time [s]", "mass [g]", "mass² [g²]", "ca mean [°]"}:
+        return ZWILZANIE
+    return None
+
+
+def _rdzen(nazwa):
+    # Nazwa pliku bez katalogu i rozszerzenia: "a/Woda 1.xls" i "Woda 1.csv" to ten sam pomiar
+    return os.path.splitext(os.path.basename(str(nazwa)))[0].lower()
+
+
+def _rodzaj_pliku(plik):
+    nazwa, dane = plik if isinstance(plik, tuple) else (plik, None)
+    if dane is None:
+        with open(plik, "rb") as f:
+            dane = f.read(ROZMIAR_PROBKI)
+    return rozpoznaj_rodzaj(str(nazwa), dane)
+
+
+def rozpakuj(pliki, rodzaj=None):
+    """Zastępuje archiwa na liście plików ich zawartością.
+
+    Elementy to ścieżki albo pary (nazwa, bajty); pliki z archiwów zwracane
+    są jako pary ("archiwum.zip/ścieżka", bajty), a z `rodzaj` tylko te
+    rozpoznane jako ta analiza. Plik archiwum o tej samej nazwie (bez
+    rozszerzenia) co plik podany obok archiwum (np. rozpakowana kopia lub
+    jej eksport CSV) jest pomijany, by pomiar nie był liczony dwa razy.
+    Zwraca (pliki, pominięte nazwy z archiwów).
+    """
+    archiwa = [jest_archiwum(plik) for plik in pliki]
+    luzne = {_rdzen(plik[0] if isinstance(plik, tuple) else plik) for plik, archiwum in zip(pliki, archiwa)
+             if not archiwum and (rodzaj is None or _rodzaj_pliku(plik) == rodzaj)} if any(archiwa) else set()
+    wynik, pominiete = [], []
+    for plik, archiwum in zip(pliki, archiwa):
+        if not archiwum:
+            wynik.append(plik)
+            continue
+        nazwa, zrodlo = plik if isinstance(plik, tuple) else (os.path.basename(plik), plik)
+        for czlonek, dane in czlonkowie(zrodlo):
+            pelna = f"{nazwa}/{czlonek}"
+            if _rdzen(czlonek) not in luzne and (rodzaj is None or rozpoznaj_rodzaj(czlonek, dane) == rodzaj):
+                wynik.append((pelna, dane))
+            else:
+                pominiete.append(pelna)
+    return wynik, pominiete
+
+
+def _wczytaj_czlonka(zadanie):
+    # Parser analizy dla jednego pliku; importy tutaj, bo moduły analiz importują ten moduł
+    nazwa, dane, rodzaj = zadanie
+    plik = io.BytesIO(dane)
+    plik.name = os.path.basename(nazwa)
+    try:
+        if rodzaj == ZWILZANIE:
+            from obliczenia.zwilzanie import przygotuj_dane, wczytaj_plik
+            df = przygotuj_dane(wczytaj_plik(plik, plik.name))
+        elif rodzaj == KINETYKA:
+            from obliczenia.kinetyka import wczytaj_plik
+            df = wczytaj_plik(plik)
+        elif rodzaj == IZOTERMA:
+            from obliczenia.izoterma import wczytaj_plik
+            df = wczytaj_plik(plik)
+        elif rodzaj == ENERGIA:
+            from obliczenia.magazyn import wczytaj_punkty
+            df = wczytaj_punkty(plik)
+        else:
+            return CzlonekArchiwum(nazwa, None, None, "Nie rozpoznano rodzaju pomiaru.")
+    except Exception as e:
+        return CzlonekArchiwum(nazwa, rodzaj, None, f"{type(e).__name__}: {e}")
+    return CzlonekArchiwum(nazwa, rodzaj, df, "")
+
+
+def zadania_archiwum(zrodlo, rodzaje=None):
+    """Zadania dla `_wczytaj_czlonka`, po jednym na plik archiwum rozpoznany jako jedna z `rodzaje`."""
+    zadania = []
+    for nazwa, dane in czlonkowie(zrodlo):
+        rodzaj = rozpoznaj_rodzaj(nazwa, dane)
+        if rodzaje is None or rodzaj in rodzaje:
+            zadania.append((nazwa, dane, rodzaj))
+    return zadania
+
+
+def wczytaj_archiwum(zrodlo, rodzaje=None, procesy=None):
+    """Wczytuje pliki archiwum równolegle, każdy parserem rozpoznanej analizy.
+
+    Zwraca listę CzlonekArchiwum w kolejności archiwum; `rodzaje` ogranicza
+    wczytywanie do podanych analiz (pozostałe pliki są pomijane).
+    """
+    return mapuj_rownolegle(_wczytaj_czlonka, zadania_archiwum(zrodlo, rodzaje), procesy)
+
+
+def zglos_wczytanie_archiwum(pula, uzytkownik, zrodlo, rodzaje=None):
+    """Zgłasza wczytanie archiwum do puli obliczeń (obliczenia.zadania); wynikiem jest lista CzlonekArchiwum."""
+    return pula.zglos(uzytkownik, _wczytaj_czlonka, zadania_archiwum(zrodlo, rodzaje))
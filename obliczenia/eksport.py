@@ -0,0 +1,220 @@
+"""Pakiety analiz: surowe dane, parametry dopasowań i wielkości pochodne w jednym archiwum.
+
+Pakiet to archiwum .zip (albo katalog) z plikiem manifest.json i jedną
+tabelą na plik: Parquet, gdy dostępny jest pyarrow (wymieniony w
+requirements.txt), a bez niego CSV (separator ';', UTF-8 z BOM). Tabele
+dopisywane są porcjami i zapisywane na dysk co ROZMIAR_PORCJI wierszy, więc
+partie tysięcy plików nie są składane w pamięci. Wczytany pakiet odtwarza wyniki
+bez ponownego dopasowywania.
+"""
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+WERSJA_PAKIETU = 1
+MANIFEST = "manifest.json"
+ROZMIAR_PORCJI = 65536  # [wiersze] na grupę wierszy Parquet / zapis CSV
+FORMAT_DOMYSLNY = "parquet" if importlib.util.find_spec("pyarrow") else "csv"
+
+Pakiet = namedtuple("Pakiet", ["analiza", "parametry", "tabele", "utworzono"])
+Pakiet.__doc__ = "Rodzaj analizy, jej parametry (słownik), tabele {nazwa: DataFrame} i data zapisu."
+
+
+def _do_json(wartosc):
+    # Skalary i tablice numpy w parametrach analizy
+    if isinstance(wartosc, np.generic):
+        return wartosc.item()
+    if isinstance(wartosc, np.ndarray):
+        return wartosc.tolist()
+    return str(wartosc)
+
+
+class ZapisPakietu:
+    """Zapisuje pakiet analizy; `dopisz(tabela, df)` można wołać wielokrotnie dla tej samej tabeli.
+
+    `cel` to ścieżka archiwum .zip, ścieżka katalogu albo obiekt plikowy
+    (np. BytesIO), do którego trafi archiwum. Używany jako menedżer kontekstu
+    zamyka pakiet przy wyjściu, a przy błędzie usuwa pliki tymczasowe.
+    """
+
+    def __init__(self, cel, analiza, parametry=None, format=None):
+        self.format = format or FORMAT_DOMYSLNY
+        if self.format not in ("parquet", "csv"):
+            raise ValueError(f"Nieznany format tabel: {self.format}")
+        self.cel = cel
+        self.manifest = {
+            "wersja": WERSJA_PAKIETU,
+            "analiza": analiza,
+            "utworzono": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "parametry": parametry or {},
+            "tabele": {},
+        }
+        self._do_katalogu = isinstance(cel, (str, os.PathLike)) and not str(cel).lower().endswith(".zip")
+        if self._do_katalogu:
+            os.makedirs(cel, exist_ok=True)
+            self._katalog = cel
+        else:
+            self._katalog = tempfile.mkdtemp(prefix="pakiet_")
+        self._porcje = {}
+        self._pisarze = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, *_):
+        if typ is None:
+            self.zamknij()
+        else:
+            self._porzuc()
+
+    def dopisz(self, tabela, df):
+        """Dopisuje wiersze do tabeli; zapis na dysk następuje po zebraniu ROZMIAR_PORCJI wierszy."""
+        opis = self.manifest["tabele"].get(tabela)
+        if opis is None:
+            tekst = [str(col) for col in df.columns
+                     if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype)]
+            opis = self.manifest["tabele"][tabela] = {"plik": f"{tabela}.{self.format}", "wiersze": 0,
+                                                     "tekst": tekst}
+            self._porcje[tabela] = []
+        opis["wiersze"] += len(df)
+        porcje = self._porcje[tabela]
+        porcje.append(df)
+        if sum(len(p) for p in porcje) >= ROZMIAR_PORCJI:
+            self._zapisz_porcje(tabela)
+
+    def _zapisz_porcje(self, tabela):
+        porcje = self._porcje[tabela]
+        if not porcje:
+            return
+        df = pd.concat(porcje, ignore_index=True) if len(porcje) > 1 else porcje[0].reset_index(drop=True)
+        df.columns = [str(col) for col in df.columns]
+        porcje.clear()
+        sciezka = os.path.join(self._katalog, self.manifest["tabele"][tabela]["plik"])
+
+        if self.format == "csv":
+            # Nagłówek (i BOM) tylko w pierwszej porcji
+            df.to_csv(sciezka, mode="a", header=not os.path.exists(sciezka), index=False, sep=";",
+                      encoding="utf-8-sig")
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pisarz = self._pisarze.get(tabela)
+        if pisarz is None:
+            dane = pa.Table.from_pandas(df, preserve_index=False)
+            pisarz = self._pisarze[tabela] = pq.ParquetWriter(sciezka, dane.schema, compression="zstd")
+        else:
+            # Kolejne porcje rzutowane na schemat pierwszej (np. kolumna pusta tylko w jednej porcji)
+            dane = pa.Table.from_pandas(df, schema=pisarz.schema, preserve_index=False)
+        pisarz.write_table(dane)
+
+    def zamknij(self):
+        """Zapisuje resztę porcji i manifest, a dla celu .zip pakuje katalog do archiwum."""
+        try:
+            for tabela in self._porcje:
+                self._zapisz_porcje(tabela)
+            for pisarz in self._pisarze.values():
+                pisarz.close()
+            self._pisarze.clear()
+            with open(os.path.join(self._katalog, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2, ensure_ascii=False, default=_do_json)
+            if self._do_katalogu:
+                return
+            # Parquet jest już skompresowany – deflate tylko dla CSV
+            kompresja = zipfile.ZIP_STORED if self.format == "parquet" else zipfile.ZIP_DEFLATED
+            with zipfile.ZipFile(self.cel, "w", kompresja) as archiwum:
+                archiwum.write(os.path.join(self._katalog, MANIFEST), MANIFEST)
+                for opis in self.manifest["tabele"].values():
+                    sciezka = os.path.join(self._katalog, opis["plik"])
+                    if os.path.exists(sciezka):
+                        archiwum.write(sciezka, opis["plik"])
+        finally:
+            if not self._do_katalogu:
+                shutil.rmtree(self._katalog, ignore_errors=True)
+
+    def _porzuc(self):
+        for pisarz in self._pisarze.values():
+            pisarz.close()
+        self._pisarze.clear()
+        if not self._do_katalogu:
+            shutil.rmtree(self._katalog, ignore_errors=True)
+
+
+def zapisz_pakiet(analiza, tabele, parametry=None, format=None):
+    """Bajty archiwum .zip (np. dla przycisku pobierania).
+
+    `tabele` to słownik {nazwa: DataFrame albo iterowalne porcji DataFrame}.
+    """
+    bufor = io.BytesIO()
+    with ZapisPakietu(bufor, analiza, parametry, format) as pakiet:
+        for nazwa, dane in tabele.items():
+            for df in [dane] if isinstance(dane, pd.DataFrame) else dane:
+                pakiet.dopisz(nazwa, df)
+    return bufor.getvalue()
+
+
+def zapisz_wyniki_wsadowe(sciezka, analiza, wyniki, dane=(), parametry=None):
+    """Zapis wyników partii: plik .csv – sama tabela wyników, inaczej pakiet (.zip lub katalog).
+
+    `dane` to iterowalne ramek z surowymi danymi kolejnych plików; są
+    dopisywane do tabeli "dane" po jednej, bez składania całej partii.
+    """
+    if str(sciezka).lower().endswith(".csv"):
+        wyniki.to_csv(sciezka, index=False, sep=";", encoding="utf-8-sig")
+        return
+    with ZapisPakietu(sciezka, analiza, parametry) as pakiet:
+        pakiet.dopisz("wyniki", wyniki)
+        for df in dane:
+            pakiet.dopisz("dane", df)
+
+
+def _wczytaj_tabele(f, opis):
+    if opis["plik"].endswith(".parquet"):
+        return pd.read_parquet(f)
+    # CSV nie odróżnia pustego tekstu od braku wartości – kolumny tekstowe z manifestu
+    tekst = opis.get("tekst", [])
+    df = pd.read_csv(f, sep=";", encoding="utf-8-sig", dtype={col: str for col in tekst})
+    for col in tekst:
+        if col in df.columns:
+            df[col] = df[col].fillna("")
+    return df
+
+
+def wczytaj_pakiet(zrodlo, tabele=None):
+    """Wczytuje pakiet z archiwum .zip (ścieżka, bajty lub obiekt plikowy) albo z katalogu.
+
+    `tabele` ogranicza wczytywanie do podanych nazw (np. bez surowych danych).
+    """
+    if isinstance(zrodlo, (str, os.PathLike)) and os.path.isdir(zrodlo):
+        return _wczytaj(lambda nazwa: open(os.path.join(zrodlo, nazwa), "rb"), tabele)
+    if isinstance(zrodlo, bytes):
+        zrodlo = io.BytesIO(zrodlo)
+    try:
+        with zipfile.ZipFile(zrodlo) as archiwum:
+            return _wczytaj(archiwum.open, tabele)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"To nie jest pakiet analizy: {e}") from e
+
+
+def _wczytaj(otworz, tabele):
+    with otworz(MANIFEST) as f:
+        manifest = json.load(f)
+    if manifest.get("wersja", 0) > WERSJA_PAKIETU:
+        raise ValueError("Pakiet zapisano nowszą wersją aplikacji.")
+    wczytane = {}
+    for nazwa, opis in manifest["tabele"].items():
+        if tabele is not None and nazwa not in tabele:
+            continue
+        with otworz(opis["plik"]) as f:
+            wczytane[nazwa] = _wczytaj_tabele(f, opis)
+    return Pakiet(manifest["analiza"], manifest.get("parametry", {}), wczytane, manifest.get("utworzono"))
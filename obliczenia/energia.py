@@ -0,0 +1,81 @@
+"""Energia powierzchniowa ciała stałego: metody Zismana i OWRK."""
+from collections import namedtuple
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from obliczenia.regresja import regresja_liniowa
+
+WynikOWRK = namedtuple("WynikOWRK", ["gamma_S_p", "gamma_S_d", "gamma_S", "se_p", "se_d", "a", "b", "r2", "n"])
+WynikOWRK.__doc__ = "Składniki γˢᵖ, γˢᵈ, γˢ [mN/m], ich błędy standardowe oraz prosta OWRK y = a·x + b."
+
+# Ciecze pomiarowe: γ, γᵈ, γᵖ [mN/m]
+CIECZE = {
+    "Woda": {"gamma": 72.8, "gamma_d": 21.8, "gamma_p": 51.0},
+    "Glicerol": {"gamma": 63.4, "gamma_d": 37.0, "gamma_p": 26.4},
+    "Etanodiol": {"gamma": 48.3, "gamma_d": 29.3, "gamma_p": 19.0},
+    "Formamid": {"gamma": 58.2, "gamma_d": 39.5, "gamma_p": 18.7},
+    "Etanol": {"gamma": 22.4, "gamma_d": 17.0, "gamma_p": 5.4},
+    "Dijodometan": {"gamma": 50.8, "gamma_d": 50.8, "gamma_p": 0.0},
+}
+
+
+def zisman(gamma, cos_theta):
+    """Zwraca (nachylenie, wyraz wolny, γ_c) prostej cos θ od γ cieczy."""
+    wynik = regresja_liniowa(gamma, cos_theta)
+    return zisman_z_regresji(wynik)
+
+
+def zisman_z_regresji(wynik):
+    """Zwraca (nachylenie, wyraz wolny, γ_c) z gotowego wyniku regresji cos θ od γ."""
+    slope, intercept = wynik.a, wynik.b
+    gamma_c = (1 - intercept) / slope if slope != 0 else np.nan
+    return slope, intercept, gamma_c
+
+
+def wspolrzedne_owrk(gamma, gamma_d, gamma_p, cos_theta):
+    """Przekształca pomiary do postaci liniowej OWRK: x = √γᵖ/√γᵈ, y = γ(1 + cos θ)/(2√γᵈ)."""
+    gamma, gamma_d, gamma_p, cos_theta = (np.asarray(v, dtype=np.float64)
+                                          for v in (gamma, gamma_d, gamma_p, cos_theta))
+    x = np.sqrt(gamma_p) / np.sqrt(gamma_d)
+    y = gamma * (cos_theta + 1) / (2 * np.sqrt(gamma_d))
+    return x, y
+
+
+def owrk(gamma, gamma_d, gamma_p, cos_theta, wagi=None, maski=None):
+    """Rozwiązuje OWRK metodą (ważonych) najmniejszych kwadratów dla wszystkich cieczy naraz.
+
+    γˢᵖ = a², γˢᵈ = b², a błędy standardowe propagowane są z błędów a i b.
+    Z `maski` o kształcie (k, n) liczy k rozwiązań w jednym wywołaniu.
+    """
+    x, y = wspolrzedne_owrk(gamma, gamma_d, gamma_p, cos_theta)
+    return owrk_z_regresji(regresja_liniowa(x, y, maski, wagi))
+
+
+def owrk_z_regresji(wynik):
+    """Składniki energii powierzchniowej z gotowego wyniku regresji we współrzędnych OWRK."""
+    a, b = wynik.a, wynik.b
+    gamma_S_p = a ** 2
+    gamma_S_d = b ** 2
+    return WynikOWRK(gamma_S_p, gamma_S_d, gamma_S_p + gamma_S_d,
+                     2 * np.abs(a) * wynik.se_a, 2 * np.abs(b) * wynik.se_b,
+                     a, b, wynik.r2, wynik.n)
+
+
+def owrk_pary(ciecze, gamma, gamma_d, gamma_p, cos_theta):
+    """Rozwiązania OWRK dla wszystkich par C(N, 2) cieczy, policzone jednym wywołaniem."""
+    pary = list(combinations(range(len(ciecze)), 2))
+    if not pary:
+        return pd.DataFrame(columns=["ciecz_1", "ciecz_2", "gamma_S_p", "gamma_S_d", "gamma_S"])
+    maski = np.zeros((len(pary), len(ciecze)), dtype=bool)
+    idx = np.array(pary)
+    maski[np.arange(len(pary))[:, None], idx] = True
+    wynik = owrk(gamma, gamma_d, gamma_p, cos_theta, maski=maski)
+    return pd.DataFrame({
+        "ciecz_1": [ciecze[i] for i, _ in pary],
+        "ciecz_2": [ciecze[j] for _, j in pary],
+        "gamma_S_p": wynik.gamma_S_p,
+        "gamma_S_d": wynik.gamma_S_d,
+        "gamma_S": wynik.gamma_S,
+    })
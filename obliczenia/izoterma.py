@@ -0,0 +1,489 @@
+"""Izoterma napięcia powierzchniowego: wczytywanie danych i model Szyszkowskiego.
+
+Moduł można uruchomić wsadowo; z `-o wyniki.zip` (lub katalogiem) zapisywany
+jest pakiet analizy z seriami pomiarowymi (zob. obliczenia.eksport). Archiwa
+.zip z pomiarami czytane są bez rozpakowywania (zob. obliczenia.archiwum).
+"""
+import argparse
+import functools
+import hashlib
+import io
+import os
+import sys
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from obliczenia import profil
+from obliczenia.archiwum import IZOTERMA, rozpakuj
+from obliczenia.eksport import zapisz_wyniki_wsadowe
+from obliczenia.pamiec import bez_zapisu, z_pamiecia
+from obliczenia.regresja import regresja_liniowa
+from obliczenia.wsadowe import mapuj_rownolegle, mapuj_z_limitem, rozwin_wzorce
+from obliczenia.wykrywanie import wczytaj_tabele
+
+R = 8.314  # Stała gazowa [J/mol·K]
+T_DOMYSLNA = 298  # Temperatura [K]
+GRANICE_DOMYSLNE = ((0.001, 1e-7), (1.0, 1.0))  # ([B_min, A_min], [B_max, A_max])
+
+WynikDopasowania = namedtuple("WynikDopasowania", ["B", "A", "sse", "r2", "kowariancja"])
+WynikDopasowania.__doc__ = "Parametry B i A [mol/L], suma kwadratów reszt, R² i macierz kowariancji (B, A)."
+
+KOLUMNY_SERII = ("seria", "probka", "surfaktant")
+KOLUMNY_TEMPERATURY = ("temp", "temperatura")  # [°C], jak w eksporcie tensjometru
+KOLUMNY_WYNIKOW = ["pozycja", "seria", "punkty", "T", "B_sz", "A_sz", "CMC", "Gamma (CMC)", "Gamma_max",
+                   "DeltaGm", "R2", "blad"]
+
+WynikTermodynamiki = namedtuple("WynikTermodynamiki", ["DeltaHm", "DeltaSm", "se_H", "se_S", "r2", "n"])
+WynikTermodynamiki.__doc__ = "ΔHm [kJ/mol] i ΔSm [J/(mol·K)] z prostej ΔGm(T), ich błędy standardowe, R² i liczba temperatur."
+
+PUNKTY_PACZKI = 12500  # prób × punktów w paczce bootstrapu: ok. 0,1 s
+KROK_TERMINU = 25  # próby paczki dopasowywane między sprawdzeniami terminu
+
+_dopasowania = OrderedDict()
+_MAKS_DOPASOWAN = 256
+
+
+def _typ_kolumny(nazwa):
+    # Stężenie, napięcia i temperatura zawsze liczbowe; nazwy serii zostają tekstem
+    nazwa = nazwa.lower()
+    if nazwa in ("stezenie", "napiecie") + KOLUMNY_TEMPERATURY or nazwa.startswith("napiecie_"):
+        return np.float64
+    return None
+
+
+def wyczysc_pamiec_dopasowan():
+    """Usuwa zapamiętane w procesie wyniki `dopasuj_szyszkowski` (np. przed pomiarem czasu dopasowania)."""
+    _dopasowania.clear()
+
+
+@z_pamiecia(wersja=2)
+def wczytaj_plik(plik):
+    """Wczytuje CSV z kolumnami 'stezenie' i 'napiecie' (separator i znak dziesiętny wykrywane z pliku)."""
+    df = wczytaj_tabele(plik, typy=_typ_kolumny)
+    df.columns = [col.strip().lower() for col in df.columns]
+    return df
+
+
+def szyszkowski_model(c, B_sz, A_sz, y0=72.0):
+    """Model Szyszkowskiego γ = γ₀·(1 − B·ln(c/A + 1))."""
+    safe_c = np.maximum(c, 1e-12)
+    return y0 * (1 - B_sz * np.log(safe_c/A_sz + 1))
+
+
+def siatka_krzywych(c, A_min=1e-10, A_max=1.0, punkty_A=400):
+    """Tablicuje ln(c/A + 1) na siatce (ln A, c), do rysowania krzywych bez liczenia modelu.
+
+    Model jest liniowy względem B, więc do odtworzenia dowolnej krzywej
+    wystarcza interpolacja tej tablicy po ln A. Zwraca (ln A, tablica, c).
+    """
+    lnA = np.linspace(np.log(A_min), np.log(A_max), punkty_A)
+    safe_c = np.maximum(np.asarray(c, dtype=np.float64), 1e-12)
+    return lnA, np.log(safe_c[None, :] / np.exp(lnA)[:, None] + 1), safe_c
+
+
+def krzywa_z_siatki(siatka, B_sz, A_sz, y0=72.0):
+    """Krzywa modelu dla (B, A) interpolowana liniowo po ln A z `siatka_krzywych`.
+
+    Dla A spoza zakresu siatki model liczony jest dokładnie zamiast
+    przycinania A do krańca siatki; A ≤ 0 zgłasza ValueError.
+    """
+    lnA, L, c = siatka
+    if not np.isfinite(A_sz) or A_sz <= 0:
+        raise ValueError(f"Parametr A musi być dodatni, podano {A_sz}.")
+    if not lnA[0] <= np.log(A_sz) <= lnA[-1]:
+        return szyszkowski_model(c, B_sz, A_sz, y0)
+    pozycja = np.interp(np.log(A_sz), lnA, np.arange(len(lnA)))
+    i = min(int(pozycja), len(lnA) - 2)
+    w = pozycja - i
+    return y0 * (1 - B_sz * ((1 - w) * L[i] + w * L[i + 1]))
+
+
+def jakobian_szyszkowskiego(c, B_sz, A_sz, y0=72.0):
+    """Pochodne modelu po (B, A) w postaci macierzy (n, 2)."""
+    safe_c = np.maximum(c, 1e-12)
+    dB = -y0 * np.log(safe_c/A_sz + 1)
+    dA = y0 * B_sz * safe_c / (A_sz * (safe_c + A_sz))
+    return np.column_stack([dB, dA])
+
+
+@profil.mierzony("dopasowanie")
+def dopasuj_szyszkowski(c, y, y0=72.0, granice=GRANICE_DOMYSLNE, siatka=(40, 40), starty=3):
+    """Dopasowuje model Szyszkowskiego z wielu punktów startowych.
+
+    Model jest liczony jednym rzutowaniem numpy na siatce (B liniowo, A
+    logarytmicznie) w granicach `granice`; `starty` najlepszych węzłów jest
+    doprecyzowywanych metodą najmniejszych kwadratów z analitycznym jakobianem.
+    Wyniki są zapamiętywane wg skrótu danych, γ₀ i granic.
+    """
+    from scipy.optimize import least_squares  # import scipy trwa długo, a potrzebny jest tylko tutaj
+
+    c = np.asarray(c, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    (B_min, A_min), (B_max, A_max) = granice
+
+    h = hashlib.blake2b(c.tobytes() + y.tobytes(), digest_size=16)
+    klucz = (h.hexdigest(), float(y0), tuple(map(float, (B_min, A_min, B_max, A_max))), tuple(siatka), starty)
+    if klucz in _dopasowania:
+        _dopasowania.move_to_end(klucz)
+        return _dopasowania[klucz]
+
+    B_siatka = np.linspace(B_min, B_max, siatka[0])
+    A_siatka = np.geomspace(A_min, A_max, siatka[1])
+    model = szyszkowski_model(c[None, None, :], B_siatka[:, None, None], A_siatka[None, :, None], y0)
+    sse = np.sum((model - y) ** 2, axis=-1)
+    najlepsze = np.argsort(sse, axis=None)[:starty]
+
+    wynik = None
+    for iB, iA in zip(*np.unravel_index(najlepsze, sse.shape)):
+        rozw = least_squares(
+            lambda p: szyszkowski_model(c, p[0], p[1], y0) - y,
+            x0=[B_siatka[iB], A_siatka[iA]],
+            jac=lambda p: jakobian_szyszkowskiego(c, p[0], p[1], y0),
+            bounds=([B_min, A_min], [B_max, A_max]),
+            x_scale="jac",
+        )
+        if wynik is None or 2 * rozw.cost < wynik[1]:
+            wynik = (rozw, 2 * rozw.cost)
+
+    rozw, sse_min = wynik
+    B_sz, A_sz = rozw.x
+    ss_tot = np.sum((y - np.mean(y)) ** 2)
+    r2 = 1 - sse_min / ss_tot if ss_tot > 0 else np.nan
+    try:
+        s2 = sse_min / max(len(y) - 2, 1)
+        kowariancja = np.linalg.inv(rozw.jac.T @ rozw.jac) * s2
+    except np.linalg.LinAlgError:
+        kowariancja = np.full((2, 2), np.nan)
+
+    wynik = WynikDopasowania(float(B_sz), float(A_sz), float(sse_min), float(r2), kowariancja)
+    _dopasowania[klucz] = wynik
+    if len(_dopasowania) > _MAKS_DOPASOWAN:
+        _dopasowania.popitem(last=False)
+    return wynik
+
+
+def parametry_izotermy(B_sz, A_sz, y0=72.0, T=T_DOMYSLNA, alpha=None):
+    """CMC [mol/L], Γ przy CMC i Γ_max [mol/m²] oraz ΔGm [kJ/mol] z parametrów modelu.
+
+    Argumenty mogą być tablicami (np. wyniki bootstrapu); `alpha` podaje się
+    dla surfaktantów jonowych.
+    """
+    cmc = A_sz * (np.exp(1/B_sz) - 1) * 0.001  # mmol/L
+    gamma = (y0 * B_sz * cmc) / (R * T * (A_sz + cmc))  # mol/m²
+    gamma_max = (y0 * B_sz) / (R * T)  # mol/m²
+    if alpha is not None:
+        delta_gm = R * T * (1 + alpha) * np.log(cmc) / 1000
+    else:
+        delta_gm = R * T * np.log(cmc) / 1000
+    return {"B_sz": B_sz, "A_sz": A_sz, "CMC": cmc, "Gamma (CMC)": gamma,
+            "Gamma_max": gamma_max, "DeltaGm": delta_gm}
+
+
+@profil.mierzony("dopasowanie")
+def dopasuj_wsadowo(c, Y, p0, y0=72.0, granice=GRANICE_DOMYSLNE, iteracje=60):
+    """Dopasowuje model jednocześnie do wielu serii Y (k, n) wektorowym Levenbergiem-Marquardtem.
+
+    `c` ma kształt (n,) (wspólne stężenia) albo (k, n) — brakujące punkty
+    serii o różnej długości oznacza się NaN. `p0` to jeden start (B, A) albo
+    tablica (k, 2), a `y0` liczba lub tablica (k,). Parametr A jest
+    optymalizowany w skali logarytmicznej, a kroki są rzutowane na granice.
+    Zwraca tablicę (k, 2) z parametrami (B, A).
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    c = np.broadcast_to(np.asarray(c, dtype=np.float64), Y.shape)
+    y0 = np.asarray(y0, dtype=np.float64).reshape(-1, 1)
+    w = np.isfinite(c) & np.isfinite(Y)
+    c, Y = np.where(w, c, 1.0), np.where(w, Y, 0.0)
+    dolne = np.array([granice[0][0], np.log(granice[0][1])])
+    gorne = np.array([granice[1][0], np.log(granice[1][1])])
+    p0 = np.broadcast_to(np.asarray(p0, dtype=np.float64), (len(Y), 2))
+    P = np.column_stack([p0[:, 0], np.log(p0[:, 1])])
+    lam = np.full(len(Y), 1e-3)
+
+    def reszty(P):
+        return np.where(w, szyszkowski_model(c, P[:, :1], np.exp(P[:, 1:]), y0) - Y, 0.0)
+
+    S = np.sum(reszty(P) ** 2, axis=1)
+    safe_c = np.maximum(c, 1e-12)
+    for _ in range(iteracje):
+        B, A = P[:, :1], np.exp(P[:, 1:])
+        r = reszty(P)
+        dB = np.where(w, -y0 * np.log(safe_c/A + 1), 0.0)
+        dq = np.where(w, y0 * B * safe_c / (safe_c + A), 0.0)  # pochodna po ln A
+        a, b, d = (dB * dB).sum(1), (dB * dq).sum(1), (dq * dq).sum(1)
+        g1, g2 = (dB * r).sum(1), (dq * r).sum(1)
+        a_l, d_l = a * (1 + lam), d * (1 + lam)
+        det = a_l * d_l - b * b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            krok = np.column_stack([-(d_l * g1 - b * g2) / det, -(a_l * g2 - b * g1) / det])
+        P_nowe = np.clip(P + np.nan_to_num(krok), dolne, gorne)
+        S_nowe = np.sum(reszty(P_nowe) ** 2, axis=1)
+        lepsze = S_nowe < S
+        P[lepsze], S[lepsze] = P_nowe[lepsze], S_nowe[lepsze]
+        lam = np.where(lepsze, lam / 3, lam * 4)
+    return np.column_stack([P[:, 0], np.exp(P[:, 1])])
+
+
+def starty_z_siatki(c, Y, y0=72.0, granice=GRANICE_DOMYSLNE, siatka=(40, 40)):
+    """Najlepszy węzeł siatki (B, A) osobno dla każdej serii Y (k, n), jednym rzutowaniem numpy."""
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    c = np.broadcast_to(np.asarray(c, dtype=np.float64), Y.shape)
+    y0 = np.asarray(y0, dtype=np.float64).reshape(-1, 1, 1, 1)
+    (B_min, A_min), (B_max, A_max) = granice
+    B_siatka = np.linspace(B_min, B_max, siatka[0])
+    A_siatka = np.geomspace(A_min, A_max, siatka[1])
+    model = szyszkowski_model(c[:, None, None, :], B_siatka[None, :, None, None], A_siatka[None, None, :, None], y0)
+    sse = np.nansum((model - Y[:, None, None, :]) ** 2, axis=-1)
+    iB, iA = np.unravel_index(sse.reshape(len(Y), -1).argmin(axis=1), sse.shape[1:])
+    return np.column_stack([B_siatka[iB], A_siatka[iA]])
+
+
+def _bootstrap_paczka(zadanie):
+    # Jedna paczka prób bootstrapu reszt liczona wektorowo po KROK_TERMINU prób;
+    # po terminie (time.time()) zwraca tylko próby dopasowane do tej chwili
+    c, y_model, reszty, p0, y0, granice, liczba, ziarno, termin = zadanie
+    rng = np.random.default_rng(ziarno)
+    Y = y_model + reszty[rng.integers(0, len(reszty), (liczba, len(reszty)))]
+    wyniki = []
+    for start in range(0, liczba, KROK_TERMINU):
+        if termin is not None and time.time() > termin:
+            break
+        wyniki.append(dopasuj_wsadowo(c, Y[start:start + KROK_TERMINU], p0, y0, granice))
+    return np.vstack(wyniki) if wyniki else np.empty((0, 2))
+
+
+def paczki_bootstrapu(c, y, y0=72.0, granice=GRANICE_DOMYSLNE, proby=2000, ziarno=0, paczka=None,
+                      limit_czasu=None):
+    """Dopasowanie punktowe i zadania `_bootstrap_paczka` po `paczka` prób (zob. bootstrap_szyszkowski).
+
+    Bez `paczka` rozmiar paczki maleje z liczbą punktów (najwyżej 250 prób,
+    PUNKTY_PACZKI prób × punktów), by jedna paczka trwała ułamek sekundy.
+    Z `limit_czasu` zadania niosą termin liczony od tej chwili, po którym
+    paczki przestają dopasowywać kolejne próby także w trakcie liczenia.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    fit = dopasuj_szyszkowski(c, y, y0, granice)
+    y_model = szyszkowski_model(c, fit.B, fit.A, y0)
+    reszty = y - y_model
+
+    if paczka is None:
+        paczka = max(1, min(250, PUNKTY_PACZKI // max(len(y), 1)))
+    liczby = [paczka] * (proby // paczka) + ([proby % paczka] if proby % paczka else [])
+    ziarna = np.random.SeedSequence(ziarno).spawn(len(liczby))
+    termin = None if limit_czasu is None else time.time() + limit_czasu
+    return fit, [(c, y_model, reszty, (fit.B, fit.A), y0, granice, n, z, termin) for n, z in zip(liczby, ziarna)]
+
+
+def przedzialy_bootstrapu(B_sz, A_sz, y0, T, alpha, poziom, wyniki):
+    """(DataFrame: Parametr, Wartosc, CI_dolny, CI_gorny; liczba prób) z wyników paczek bootstrapu."""
+    punktowe = parametry_izotermy(B_sz, A_sz, y0, T, alpha)
+    P = np.vstack(wyniki) if wyniki else np.empty((0, 2))
+    if not len(P):
+        return pd.DataFrame({"Parametr": list(punktowe), "Wartosc": list(punktowe.values()),
+                             "CI_dolny": np.nan, "CI_gorny": np.nan}), 0
+    probki = parametry_izotermy(P[:, 0], P[:, 1], y0, T, alpha)
+    q = [(1 - poziom) / 2 * 100, (1 + poziom) / 2 * 100]
+    przedzialy = {k: np.nanpercentile(v, q) for k, v in probki.items()}
+    tabela = pd.DataFrame({
+        "Parametr": list(punktowe),
+        "Wartosc": list(punktowe.values()),
+        "CI_dolny": [przedzialy[k][0] for k in punktowe],
+        "CI_gorny": [przedzialy[k][1] for k in punktowe],
+    })
+    return tabela, len(P)
+
+
+def zglos_bootstrap(pula, uzytkownik, c, y, y0=72.0, granice=GRANICE_DOMYSLNE, T=T_DOMYSLNA, alpha=None,
+                    proby=2000, poziom=0.95, limit_czasu=None, ziarno=0, paczka=None):
+    """Zgłasza bootstrap do puli obliczeń (obliczenia.zadania); wynik zadania jak z bootstrap_szyszkowski.
+
+    Wspólnej puli nie można przerwać bez szkody dla zadań innych sesji, więc
+    termin sprawdzają same paczki: po `limit_czasu` liczone paczki kończą
+    się po najwyżej KROK_TERMINU próbach, a niezaczęte są porzucane.
+    """
+    fit, zadania = paczki_bootstrapu(c, y, y0, granice, proby, ziarno, paczka, limit_czasu)
+    zloz = functools.partial(przedzialy_bootstrapu, fit.B, fit.A, y0, T, alpha, poziom)
+    return pula.zglos(uzytkownik, _bootstrap_paczka, zadania, zloz, limit_czasu)
+
+
+def bootstrap_szyszkowski(c, y, y0=72.0, granice=GRANICE_DOMYSLNE, T=T_DOMYSLNA, alpha=None,
+                          proby=2000, poziom=0.95, procesy=None, limit_czasu=None, postep=None,
+                          ziarno=0, paczka=None):
+    """Percentylowe przedziały ufności parametrów izotermy z bootstrapu reszt.
+
+    Próby są dzielone na paczki (zob. paczki_bootstrapu) liczone w puli
+    procesów; po `limit_czasu` sekundach pula jest przerywana, a wynik
+    obejmuje paczki ukończone do tej chwili. Zwraca
+    (DataFrame: Parametr, Wartosc, CI_dolny, CI_gorny; liczba wykonanych prób).
+    """
+    fit, zadania = paczki_bootstrapu(c, y, y0, granice, proby, ziarno, paczka, limit_czasu)
+    wyniki = mapuj_z_limitem(_bootstrap_paczka, zadania, procesy, limit_czasu, postep)
+    return przedzialy_bootstrapu(fit.B, fit.A, y0, T, alpha, poziom, wyniki)
+
+
+def temperatura_z_ramki(df):
+    """Średnia temperatura [K] z kolumny `temp`/`temperatura` (°C) albo None."""
+    kolumna = next((col for col in KOLUMNY_TEMPERATURY if col in df.columns), None)
+    if kolumna is None:
+        return None
+    temp = pd.to_numeric(df[kolumna], errors="coerce").to_numpy(np.float64)
+    temp = temp[np.isfinite(temp)]
+    return float(temp.mean()) + 273.15 if len(temp) else None
+
+
+def serie_z_ramki(df, nazwa):
+    """Dzieli tabelę na serie {nazwa: (c, γ, T)}; T [K] z kolumny temperatury albo None.
+
+    Obsługiwane układy: kolumna serii (`seria`, `probka` lub `surfaktant`)
+    z `stezenie` i `napiecie` w wierszach, kolumny `napiecie_<nazwa>` obok
+    wspólnego `stezenie` albo pojedyncza seria nazwana jak plik.
+    """
+    if "stezenie" not in df.columns:
+        raise ValueError("Brak kolumny 'stezenie'.")
+    kolumna_serii = next((col for col in KOLUMNY_SERII if col in df.columns), None)
+    if kolumna_serii is not None and "napiecie" in df.columns:
+        return {f"{nazwa}: {seria}" if nazwa else str(seria): (grupa["stezenie"].to_numpy(np.float64),
+                                                              grupa["napiecie"].to_numpy(np.float64),
+                                                              temperatura_z_ramki(grupa))
+                for seria, grupa in df.groupby(kolumna_serii, sort=False)}
+    T = temperatura_z_ramki(df)
+    szerokie = [col for col in df.columns if col.startswith("napiecie_")]
+    if szerokie:
+        c = df["stezenie"].to_numpy(np.float64)
+        return {f"{nazwa}: {col[len('napiecie_'):]}" if nazwa else col[len("napiecie_"):]:
+                (c, df[col].to_numpy(np.float64), T) for col in szerokie}
+    if "napiecie" in df.columns:
+        return {nazwa: (df["stezenie"].to_numpy(np.float64), df["napiecie"].to_numpy(np.float64), T)}
+    raise ValueError("Brak kolumny 'napiecie' (lub 'napiecie_<seria>').")
+
+
+def wczytaj_serie(plik, nazwa=None):
+    """Wczytuje wszystkie serie stężeń z jednego pliku CSV (zob. serie_z_ramki)."""
+    nazwa = os.path.splitext(os.path.basename(nazwa or getattr(plik, "name", str(plik))))[0]
+    return serie_z_ramki(wczytaj_plik(plik), nazwa)
+
+
+def ramka_serii(serie):
+    """Tabela serii {nazwa: (c, γ, T)} w układzie z kolumną `seria` (odwrotność serie_z_ramki(df, ""))."""
+    ramki = [pd.DataFrame({"seria": str(nazwa), "stezenie": c, "napiecie": y,
+                           "temp": np.nan if T is None else T - 273.15})
+             for nazwa, (c, y, T) in serie.items()]
+    if not ramki:
+        return pd.DataFrame(columns=["seria", "stezenie", "napiecie", "temp"])
+    return pd.concat(ramki, ignore_index=True)
+
+
+def _dopasuj_serie(zadanie):
+    # Błąd jednej serii nie może przerwać całej partii
+    nazwa, c, y, y0, T, alpha, granice = zadanie
+    ok = np.isfinite(c) & np.isfinite(y)
+    wynik = {"seria": nazwa, "punkty": int(ok.sum()), "T": T, "blad": ""}
+    try:
+        if ok.sum() < 3:
+            raise ValueError("Za mało punktów do dopasowania.")
+        fit = dopasuj_szyszkowski(c[ok], y[ok], y0, granice)
+        wynik.update(parametry_izotermy(fit.B, fit.A, y0, T, alpha), R2=fit.r2)
+    except Exception as e:
+        wynik["blad"] = f"{type(e).__name__}: {e}"
+    return wynik
+
+
+def zadania_serii(serie, y0=72.0, T=T_DOMYSLNA, alpha=None, granice=GRANICE_DOMYSLNE):
+    """Zadania dopasowania dla `_dopasuj_serie`, po jednym na serię (zob. dopasuj_serie)."""
+    return [(nazwa, np.asarray(c, dtype=np.float64), np.asarray(y, dtype=np.float64), y0,
+             T if T_serii is None else T_serii, alpha, granice)
+            for nazwa, (c, y, T_serii) in serie.items()]
+
+
+def ranking_serii(wyniki):
+    """Tabela KOLUMNY_WYNIKOW z wyników `_dopasuj_serie`, posortowana wg rosnącego CMC."""
+    wyniki = pd.DataFrame(wyniki, columns=KOLUMNY_WYNIKOW[1:])
+    wyniki = wyniki.sort_values("CMC", na_position="last", kind="stable").reset_index(drop=True)
+    pozycje = pd.Series(np.arange(1, len(wyniki) + 1), dtype="Int64")
+    wyniki.insert(0, "pozycja", pozycje.where(wyniki["blad"] == ""))
+    return wyniki
+
+
+def zglos_dopasowanie_serii(pula, uzytkownik, serie, y0=72.0, T=T_DOMYSLNA, alpha=None,
+                            granice=GRANICE_DOMYSLNE):
+    """Zgłasza dopasowanie serii do puli obliczeń (obliczenia.zadania); wynikiem zadania jest ranking_serii."""
+    return pula.zglos(uzytkownik, _dopasuj_serie, zadania_serii(serie, y0, T, alpha, granice), ranking_serii)
+
+
+def dopasuj_serie(serie, y0=72.0, T=T_DOMYSLNA, alpha=None, granice=GRANICE_DOMYSLNE, procesy=None):
+    """Dopasowuje model do wielu serii równolegle i zwraca ranking wg rosnącego CMC.
+
+    `serie` to słownik {nazwa: (c, γ, T_serii)}; γ₀ i α są wspólne, a `T`
+    jest używane dla serii bez zmierzonej temperatury (T_serii = None).
+    Serie z błędem trafiają na koniec tabeli bez pozycji.
+    """
+    zadania = zadania_serii(serie, y0, T, alpha, granice)
+    return ranking_serii(mapuj_rownolegle(_dopasuj_serie, zadania, procesy))
+
+
+def termodynamika_micelizacji(serie, y0=72.0, alpha=None, granice=GRANICE_DOMYSLNE):
+    """Wspólne dopasowanie izoterm w kilku temperaturach i ΔHm, ΔSm z nachylenia ΔGm(T).
+
+    `serie` to lista (T [K], c, γ). Serie o różnej długości są dopełniane
+    NaN i dopasowywane jednym wektorowym rozwiązaniem (start z siatki dla
+    każdej serii osobno). Z ΔGm = ΔHm − T·ΔSm: ΔSm = −nachylenie, ΔHm =
+    wyraz wolny. Zwraca (DataFrame: T, B_sz, A_sz, CMC, DeltaGm; WynikTermodynamiki).
+    """
+    T = np.array([t for t, _, _ in serie], dtype=np.float64)
+    dlugosc = max(len(c) for _, c, _ in serie)
+    C = np.full((len(serie), dlugosc), np.nan)
+    Y = np.full((len(serie), dlugosc), np.nan)
+    for i, (_, c, y) in enumerate(serie):
+        C[i, :len(c)], Y[i, :len(y)] = c, y
+
+    P = dopasuj_wsadowo(C, Y, starty_z_siatki(C, Y, y0, granice), y0, granice)
+    parametry = parametry_izotermy(P[:, 0], P[:, 1], y0, T, alpha)
+    tabela = pd.DataFrame({"T": T, "B_sz": P[:, 0], "A_sz": P[:, 1], "CMC": parametry["CMC"],
+                           "DeltaGm": parametry["DeltaGm"]}).sort_values("T", ignore_index=True)
+
+    prosta = regresja_liniowa(tabela["T"], tabela["DeltaGm"])
+    wynik = WynikTermodynamiki(DeltaHm=prosta.b, DeltaSm=-prosta.a * 1000, se_H=prosta.se_b,
+                               se_S=prosta.se_a * 1000, r2=prosta.r2, n=prosta.n)
+    return tabela, wynik
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowe dopasowanie izoterm Szyszkowskiego i ranking CMC.")
+    parser.add_argument("wzorce", nargs="+", help="Pliki, archiwa .zip, katalogi lub wzorce glob, np. 'dane/*.csv'")
+    parser.add_argument("-o", "--wyjscie", default="wyniki_izoterm.csv",
+                        help="Plik CSV z wynikami albo pakiet .zip/katalog z wynikami i seriami")
+    parser.add_argument("--y0", type=float, default=72.0, help="Napięcie powierzchniowe wody γ₀ [mN/m]")
+    parser.add_argument("--temp-k", type=float, default=T_DOMYSLNA,
+                        help="Temperatura [K] dla serii bez kolumny temp/temperatura")
+    parser.add_argument("-a", "--alpha", type=float, default=None, help="Stopień dysocjacji miceli (jonowe)")
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args(argv)
+    bez_zapisu()  # jednorazowe pliki analizy wsadowej nie wypierają wpisów aplikacji
+
+    pliki, _ = rozpakuj(rozwin_wzorce(args.wzorce), IZOTERMA)
+    if not pliki:
+        print("Nie znaleziono plików pasujących do podanych wzorców.", file=sys.stderr)
+        return 1
+
+    serie = {}
+    for plik in pliki:
+        nazwa, zrodlo = (plik[0], io.BytesIO(plik[1])) if isinstance(plik, tuple) else (plik, plik)
+        try:
+            serie.update(wczytaj_serie(zrodlo, nazwa))
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            print(f"Pominięto {nazwa}: {e}", file=sys.stderr)
+    wyniki = dopasuj_serie(serie, args.y0, args.temp_k, args.alpha, procesy=args.procesy)
+    zapisz_wyniki_wsadowe(args.wyjscie, "izoterma", wyniki, [ramka_serii(serie)],
+                          {"y0": args.y0, "T": args.temp_k, "alpha": args.alpha})
+
+    bledy = int((wyniki["blad"] != "").sum())
+    print(f"Dopasowano {len(wyniki) - bledy}/{len(wyniki)} serii -> {args.wyjscie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Kinetyka adsorpcji: wczytywanie plików tensjometru, dopasowania i wyznaczanie D oraz k₂.
+
+Moduł można uruchomić wsadowo dla wielu plików:
+
+    python -m obliczenia.kinetyka "data/Kinetyka adsorpcji/*.txt" -o wyniki.csv
+
+Z `-o wyniki.zip` (lub katalogiem) zapisywany jest pakiet analizy z surowymi
+danymi wszystkich plików (zob. obliczenia.eksport). Archiwa .zip z pomiarami
+czytane są bez rozpakowywania (zob. obliczenia.archiwum).
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from obliczenia.archiwum import KINETYKA, rozpakuj
+from obliczenia.eksport import zapisz_wyniki_wsadowe
+from obliczenia.pamiec import bez_zapisu, z_pamiecia
+from obliczenia.regresja import regresja_liniowa
+from obliczenia.tensjometr import wczytaj_tensjometr
+from obliczenia.wsadowe import mapuj_rownolegle, rozwin_wzorce
+
+R = 8.314  # Stała gazowa [J/mol·K]
+KOLUMNY_WYNIKOW = [
+    "plik", "punkty", "a_sqrt_tlife", "b_sqrt_tlife", "a_inv_tlife", "b_inv_tlife",
+    "D_premicelarny", "D_micelarny", "k2", "temp_srednia", "T", "blad",
+]
+T_DOMYSLNA = 296.25  # [K], gdy plik nie ma kolumny Temp
+
+
+@z_pamiecia(wersja=1)
+def wczytaj_plik(plik):
+    """Wczytuje eksport tensjometru i dodaje przekształcone osie √Tlife oraz 1/Tlife."""
+    df = pd.DataFrame(wczytaj_tensjometr(plik))
+    df["sqrt_tlife"] = np.sqrt(df["tlife"])
+    df["inv_tlife"] = 1 / df["tlife"]
+    return df
+
+
+def dopasuj_prosta(x, y):
+    """Zwraca (współczynnik kierunkowy, wyraz wolny) prostej y = a·x + b."""
+    wynik = regresja_liniowa(x, y)
+    return wynik.a, wynik.b
+
+
+def na_kelwiny(wartosc, skala):
+    """Przelicza temperaturę ze skali "Celsjusz", "Farenheit" lub "Kelvin" na K."""
+    if skala == "Celsjusz":
+        return wartosc + 273.15
+    if skala == "Farenheit":
+        return (wartosc - 32) * 5 / 9 + 273.15
+    return wartosc
+
+
+def wspolczynnik_dyfuzji(a, n, T, c):
+    """Współczynnik dyfuzji D [m²/s] z nachylenia a [mN/m], T [K] i stężenia c [mol/L]."""
+    a_SI = a / 1000  # mN/m -> N/m
+    c_m3 = c * 1000  # mol/L -> mol/m³
+    return ((a_SI / (-2 * n * R * T * c_m3)) ** 2) * np.pi
+
+
+def stala_k2(a_mice, a_premi):
+    """Stała k₂ [ms] = 4/π · (a_micelarny / a_premicelarny)²."""
+    return (4 / np.pi) * ((a_mice / a_premi) ** 2)
+
+
+def temperatura_pliku(df):
+    """Średnia temperatura [K] z kolumny Temp (°C) ramki lub słownika tablic albo None, gdy brak pomiarów."""
+    temp = np.asarray(df["temp"], dtype=np.float64)
+    temp = temp[np.isfinite(temp)]
+    return float(temp.mean()) + 273.15 if len(temp) else None
+
+
+def analizuj_plik(plik, n=1, T=None, c=1e-3, nazwa=None):
+    """Dopasowuje σ od √Tlife i 1/Tlife dla jednego pliku i liczy D oraz k₂.
+
+    Bez podanego `T` [K] używana jest średnia z kolumny Temp pliku.
+    """
+    df = wczytaj_plik(plik)
+    if T is None:
+        T = temperatura_pliku(df) or T_DOMYSLNA
+    a_sqrt, b_sqrt = dopasuj_prosta(df["sqrt_tlife"], df["sigma"])
+    a_inv, b_inv = dopasuj_prosta(df["inv_tlife"], df["sigma"])
+    return {
+        "plik": os.path.basename(nazwa or str(plik)),
+        "punkty": len(df),
+        "a_sqrt_tlife": a_sqrt,
+        "b_sqrt_tlife": b_sqrt,
+        "a_inv_tlife": a_inv,
+        "b_inv_tlife": b_inv,
+        "D_premicelarny": wspolczynnik_dyfuzji(a_sqrt, n, T, c),
+        "D_micelarny": wspolczynnik_dyfuzji(a_inv, n, T, c),
+        "k2": stala_k2(a_inv, a_sqrt),
+        "temp_srednia": df["temp"].mean(),
+        "T": T,
+        "blad": "",
+    }
+
+
+def _zrodlo(plik):
+    # Ścieżka albo para (nazwa, bajty), np. plik z archiwum .zip
+    if isinstance(plik, tuple):
+        return os.path.basename(plik[0]), io.BytesIO(plik[1])
+    return os.path.basename(str(plik)), plik
+
+
+def _analizuj_bezpiecznie(zadanie):
+    # Błąd jednego pliku nie może przerwać całej partii
+    plik, n, T, c = zadanie
+    nazwa, zrodlo = _zrodlo(plik)
+    try:
+        return analizuj_plik(zrodlo, n, T, c, nazwa)
+    except Exception as e:
+        return {"plik": nazwa, "blad": f"{type(e).__name__}: {e}"}
+
+
+def analizuj_pliki(pliki, n=1, T=None, c=1e-3, procesy=None):
+    """Analizuje wiele plików (ścieżki lub pary (nazwa, bajty)) równolegle i zwraca jedną tabelę wyników."""
+    zadania = [(plik, n, T, c) for plik in pliki]
+    wyniki = mapuj_rownolegle(_analizuj_bezpiecznie, zadania, procesy)
+    # Wiersze błędów nie mają liczby punktów – Int64 zamiast zamiany kolumny na float
+    return pd.DataFrame(wyniki, columns=KOLUMNY_WYNIKOW).astype({"punkty": "Int64"})
+
+
+def dane_plikow(pliki, wyniki):
+    """Surowe dane poprawnie przeanalizowanych plików z kolumną `plik`, wczytywane po jednym."""
+    for plik, blad in zip(pliki, wyniki["blad"]):
+        if blad == "":
+            nazwa, zrodlo = _zrodlo(plik)
+            df = wczytaj_plik(zrodlo)
+            df.insert(0, "plik", nazwa)
+            yield df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowa analiza kinetyki adsorpcji (σ od √Tlife i 1/Tlife).")
+    parser.add_argument("wzorce", nargs="+", help="Pliki, archiwa .zip, katalogi lub wzorce glob, np. 'dane/*.txt'")
+    parser.add_argument("-o", "--wyjscie", default="wyniki_kinetyki.csv",
+                        help="Plik CSV z wynikami albo pakiet .zip/katalog z wynikami i danymi")
+    parser.add_argument("-n", type=int, default=1, help="1 = niejonowy, 2 = jonowy")
+    parser.add_argument("--temp-c", type=float, default=None,
+                        help="Temperatura [°C] (domyślnie średnia z kolumny Temp każdego pliku)")
+    parser.add_argument("-c", "--stezenie", type=float, default=1e-3, help="Stężenie surfaktantu [mol/L]")
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args(argv)
+    bez_zapisu()  # jednorazowe pliki analizy wsadowej nie wypierają wpisów aplikacji
+
+    pliki, _ = rozpakuj(rozwin_wzorce(args.wzorce), KINETYKA)
+    if not pliki:
+        print("Nie znaleziono plików pasujących do podanych wzorców.", file=sys.stderr)
+        return 1
+
+    T = None if args.temp_c is None else na_kelwiny(args.temp_c, "Celsjusz")
+    wyniki = analizuj_pliki(pliki, args.n, T, args.stezenie, args.procesy)
+    zapisz_wyniki_wsadowe(args.wyjscie, "kinetyka", wyniki, dane_plikow(pliki, wyniki),
+                          {"n": args.n, "T": T, "c": args.stezenie})
+
+    bledy = int((wyniki["blad"] != "").sum())
+    print(f"Przeanalizowano {len(wyniki) - bledy}/{len(wyniki)} plików -> {args.wyjscie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
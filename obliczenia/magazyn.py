@@ -0,0 +1,211 @@
+"""Trwały magazyn punktów pomiarowych energii powierzchniowej (SQLite).
+
+Dla każdej próbki przechowywane są sumy potrzebne do regresji Zismana i OWRK
+(n, Σx, Σy, Σx², Σxy, Σy²), aktualizowane w tej samej transakcji co dodanie
+lub usunięcie punktu, więc wyniki nie wymagają ponownego przeliczania
+wszystkich punktów. Ścieżkę bazy można zmienić zmienną CHEMISTAPP_POMIARY.
+"""
+import contextlib
+import datetime
+import math
+import os
+import sqlite3
+
+import pandas as pd
+
+from obliczenia.eksport import wczytaj_pakiet
+from obliczenia.energia import CIECZE, owrk_z_regresji, zisman_z_regresji
+from obliczenia.regresja import regresja_z_sum
+from obliczenia.wykrywanie import wczytaj_tabele
+
+SCIEZKA_DOMYSLNA = os.path.join(os.path.expanduser("~"), ".chemistapp", "pomiary.sqlite")
+KOLUMNY_PUNKTU = ["id", "probka", "ciecz", "gamma", "gamma_d", "gamma_p", "theta", "cos_theta", "data"]
+_KOLUMNY_LICZBOWE = ("gamma", "gamma_d", "gamma_p", "theta", "cos_theta")
+
+_SCHEMAT = """
+CREATE TABLE IF NOT EXISTS punkty (
+    id INTEGER PRIMARY KEY,
+    probka TEXT NOT NULL,
+    ciecz TEXT NOT NULL,
+    gamma REAL NOT NULL,
+    gamma_d REAL,
+    gamma_p REAL,
+    theta REAL NOT NULL,
+    cos_theta REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_punkty_probka ON punkty (probka);
+CREATE INDEX IF NOT EXISTS ix_punkty_ciecz ON punkty (ciecz);
+CREATE INDEX IF NOT EXISTS ix_punkty_data ON punkty (data);
+CREATE TABLE IF NOT EXISTS sumy (
+    probka TEXT NOT NULL,
+    metoda TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    sx REAL NOT NULL DEFAULT 0,
+    sy REAL NOT NULL DEFAULT 0,
+    sxx REAL NOT NULL DEFAULT 0,
+    sxy REAL NOT NULL DEFAULT 0,
+    syy REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (probka, metoda)
+);
+"""
+
+
+def _wspolrzedne(punkt):
+    # Współrzędne (x, y) punktu w regresji Zismana i – jeśli są składniki γ – OWRK
+    wsp = {"zisman": (punkt["gamma"], punkt["cos_theta"])}
+    gamma_d, gamma_p = punkt.get("gamma_d"), punkt.get("gamma_p")
+    if gamma_d is not None and gamma_p is not None and gamma_d > 0:
+        wsp["owrk"] = (math.sqrt(gamma_p) / math.sqrt(gamma_d),
+                       punkt["gamma"] * (punkt["cos_theta"] + 1) / (2 * math.sqrt(gamma_d)))
+    return wsp
+
+
+class MagazynPomiarow:
+    """Punkty pomiarowe (ciecz, γ, θ) pogrupowane w próbki."""
+
+    def __init__(self, sciezka=None):
+        self.sciezka = sciezka or os.environ.get("CHEMISTAPP_POMIARY", SCIEZKA_DOMYSLNA)
+        if self.sciezka != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.sciezka)), exist_ok=True)
+        self._pamiec = sqlite3.connect(":memory:", check_same_thread=False) if self.sciezka == ":memory:" else None
+        with self._polaczenie() as db:
+            db.executescript(_SCHEMAT)
+
+    @contextlib.contextmanager
+    def _polaczenie(self):
+        # Osobne połączenie na operację – bezpieczne dla wielu sesji Streamlit w różnych wątkach
+        db = self._pamiec or sqlite3.connect(self.sciezka, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            if db is not self._pamiec:
+                db.close()
+
+    @staticmethod
+    def _aktualizuj_sumy(db, probka, punkt, znak):
+        for metoda, (x, y) in _wspolrzedne(punkt).items():
+            db.execute("INSERT OR IGNORE INTO sumy (probka, metoda) VALUES (?, ?)", (probka, metoda))
+            db.execute(
+                "UPDATE sumy SET n = n + ?, sx = sx + ?, sy = sy + ?, sxx = sxx + ?, sxy = sxy + ?, syy = syy + ? "
+                "WHERE probka = ? AND metoda = ?",
+                (znak, znak * x, znak * y, znak * x * x, znak * x * y, znak * y * y, probka, metoda),
+            )
+
+    def dodaj(self, probka, ciecz, theta, gamma=None, gamma_d=None, gamma_p=None, data=None):
+        """Dodaje punkt i zwraca jego id; brakujące γ uzupełniane są z tabeli CIECZE."""
+        return self.dodaj_wiele([dict(probka=probka, ciecz=ciecz, theta=theta, gamma=gamma,
+                                      gamma_d=gamma_d, gamma_p=gamma_p, data=data)])[0]
+
+    def dodaj_wiele(self, punkty):
+        """Dodaje wiele punktów (słowniki lub DataFrame) w jednej transakcji i zwraca ich id."""
+        if isinstance(punkty, pd.DataFrame):
+            punkty = punkty.to_dict(orient="records")
+        teraz = datetime.datetime.now().isoformat(timespec="seconds")
+        ids = []
+        with self._polaczenie() as db:
+            for p in punkty:
+                p = _uzupelnij(p, teraz)
+                kursor = db.execute(
+                    "INSERT INTO punkty (probka, ciecz, gamma, gamma_d, gamma_p, theta, cos_theta, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (p["probka"], p["ciecz"], p["gamma"], p["gamma_d"], p["gamma_p"],
+                     p["theta"], p["cos_theta"], p["data"]),
+                )
+                self._aktualizuj_sumy(db, p["probka"], p, +1)
+                ids.append(kursor.lastrowid)
+        return ids
+
+    def usun(self, id_punktu):
+        """Usuwa punkt po id (klucz główny) i odejmuje go od sum próbki."""
+        with self._polaczenie() as db:
+            db.row_factory = sqlite3.Row
+            wiersz = db.execute("SELECT * FROM punkty WHERE id = ?", (id_punktu,)).fetchone()
+            if wiersz is None:
+                return False
+            db.execute("DELETE FROM punkty WHERE id = ?", (id_punktu,))
+            self._aktualizuj_sumy(db, wiersz["probka"], dict(wiersz), -1)
+        return True
+
+    def probki(self):
+        with self._polaczenie() as db:
+            return [r[0] for r in db.execute("SELECT DISTINCT probka FROM punkty ORDER BY probka")]
+
+    def punkty(self, probka=None, ciecz=None):
+        """Punkty jako DataFrame, opcjonalnie zawężone do próbki i/lub cieczy."""
+        warunki, argumenty = [], []
+        if probka is not None:
+            warunki.append("probka = ?")
+            argumenty.append(probka)
+        if ciecz is not None:
+            warunki.append("ciecz = ?")
+            argumenty.append(ciecz)
+        zapytanie = "SELECT * FROM punkty" + (" WHERE " + " AND ".join(warunki) if warunki else "") + " ORDER BY id"
+        with self._polaczenie() as db:
+            return pd.read_sql_query(zapytanie, db, params=argumenty)
+
+    def regresja(self, probka, metoda):
+        """Wynik regresji ('zisman' lub 'owrk') z zapisanych sum próbki."""
+        with self._polaczenie() as db:
+            wiersz = db.execute("SELECT n, sx, sy, sxx, sxy, syy FROM sumy WHERE probka = ? AND metoda = ?",
+                                (probka, metoda)).fetchone()
+        return regresja_z_sum(*(wiersz or (0, 0, 0, 0, 0, 0)))
+
+    def zisman(self, probka):
+        """(nachylenie, wyraz wolny, γ_c) dla próbki."""
+        return zisman_z_regresji(self.regresja(probka, "zisman"))
+
+    def owrk(self, probka):
+        """WynikOWRK dla wszystkich punktów próbki ze znanymi γᵈ i γᵖ."""
+        return owrk_z_regresji(self.regresja(probka, "owrk"))
+
+    def wyniki(self, probka):
+        """Tabela Parametr/Wartosc/Jednostka z wynikami Zismana i OWRK próbki (do eksportu)."""
+        slope, intercept, gamma_c = self.zisman(probka)
+        owrk = self.owrk(probka)
+        return pd.DataFrame({
+            "Parametr": ["zisman_a", "zisman_b", "gamma_c", "gamma_S_p", "gamma_S_d", "gamma_S", "se_p", "se_d",
+                         "owrk_a", "owrk_b", "owrk_r2", "owrk_n"],
+            "Wartosc": [slope, intercept, gamma_c, owrk.gamma_S_p, owrk.gamma_S_d, owrk.gamma_S, owrk.se_p,
+                        owrk.se_d, owrk.a, owrk.b, owrk.r2, owrk.n],
+            "Jednostka": ["1/(mN/m)", "-", "mN/m", "mN/m", "mN/m", "mN/m", "mN/m", "mN/m", "-", "-", "-", "-"],
+        })
+
+
+def _uzupelnij(p, teraz):
+    # Uzupełnia γ z tabeli cieczy (bez względu na wielkość liter) oraz cos θ i datę
+    p = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in p.items()}
+    znane = {nazwa.lower(): dane for nazwa, dane in CIECZE.items()}.get(str(p["ciecz"]).lower(), {})
+    for klucz in ("gamma", "gamma_d", "gamma_p"):
+        if p.get(klucz) is None:
+            p[klucz] = znane.get(klucz)
+    if p["gamma"] is None:
+        raise ValueError(f"Nieznane napięcie powierzchniowe cieczy '{p['ciecz']}'.")
+    p["theta"] = float(p["theta"])
+    p["cos_theta"] = math.cos(math.radians(p["theta"]))
+    p["probka"] = p.get("probka") or "próbka"
+    p["data"] = p.get("data") or teraz
+    return p
+
+
+def wczytaj_punkty(plik):
+    """Wczytuje punkty z CSV (kolumny: ciecz, theta, opcjonalnie probka, gamma, gamma_d, gamma_p, data).
+
+    Pasuje też do wyników wsadowej analizy zwilżania (kolumny ciecz i theta)
+    oraz do pakietów .zip: energii (tabela punkty) i zwilżania (tabela wyniki).
+    """
+    if str(getattr(plik, "name", plik)).lower().endswith(".zip"):
+        tabele = wczytaj_pakiet(plik, tabele=("punkty", "wyniki")).tabele
+        df = tabele.get("punkty", tabele.get("wyniki"))
+        if df is None:
+            raise ValueError("Pakiet nie zawiera tabeli punktów ani wyników zwilżania.")
+    else:
+        df = wczytaj_tabele(plik, typy=lambda col: "float64" if col.lower() in _KOLUMNY_LICZBOWE else None)
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    if "ciecz" not in df.columns or "theta" not in df.columns:
+        raise ValueError("Plik musi zawierać kolumny 'ciecz' i 'theta'.")
+    if "blad" in df.columns:
+        df = df[df["blad"].fillna("") == ""]
+    df = df.dropna(subset=["ciecz", "theta"])
+    return df[[k for k in KOLUMNY_PUNKTU if k in df.columns and k not in ("id", "cos_theta")]]
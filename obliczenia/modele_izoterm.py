@@ -0,0 +1,289 @@
+"""Biblioteka modeli izotermy napięcia powierzchniowego i ich porównanie kryteriami informacyjnymi.
+
+Każdy model w rejestrze MODELE opisuje funkcja γ(c, *parametry, y0, T)
+rzutowalna po numpy (parametry mogą być tablicami o dowolnym kształcie),
+granice parametrów i ich skala (liniowa albo logarytmiczna). Dopasowanie
+liczy model jednym rzutowaniem na siatce wszystkich parametrów, a kilka
+najlepszych węzłów doprecyzowuje metodą najmniejszych kwadratów. Modele
+są dopasowywane równolegle do tych samych danych i porządkowane wg AIC,
+AICc albo BIC; nowy model wystarczy dopisać do MODELE.
+
+    python -m obliczenia.modele_izoterm dane.csv --kryterium BIC
+"""
+import argparse
+import functools
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from obliczenia import profil
+from obliczenia.izoterma import R, T_DOMYSLNA, parametry_izotermy, szyszkowski_model, wczytaj_serie
+from obliczenia.pamiec import bez_zapisu
+from obliczenia.wsadowe import mapuj_rownolegle
+
+ModelIzotermy = namedtuple("ModelIzotermy", ["opis", "parametry", "funkcja", "granice", "skale", "wezly", "cmc"])
+ModelIzotermy.__doc__ = ("Wzór modelu, nazwy parametrów, funkcja γ(c, *p, y0, T) [mN/m], granice(c, y, y0) -> "
+                         "(dolne, górne), skale ('lin'/'log'), liczby węzłów siatki albo funkcja(c, y, y0) -> "
+                         "tablica (m, k) kandydatów startu i CMC(p, y0, T) [mol/L] albo None.")
+
+KRYTERIA = ("AIC", "AICc", "BIC")
+KOLUMNY_RANKINGU = ["pozycja", "model", "punkty", "k", "SSE", "R2", "AIC", "AICc", "BIC", "delta", "waga", "CMC",
+                    "parametry", "blad"]
+_ITERACJE_FRUMKINA = 60
+
+
+def _szyszkowski(c, B_sz, A_sz, y0, T):
+    return szyszkowski_model(c, B_sz, A_sz, y0)
+
+
+def langmuir_szyszkowski_model(c, gamma_max, K, gamma0, y0=72.0, T=T_DOMYSLNA):
+    """γ = γ₀ − RT·Γ_max·ln(1 + K·c) z dopasowywanym γ₀ (`y0` nieużywane)."""
+    safe_c = np.maximum(c, 1e-12)
+    return gamma0 - 1000 * R * T * gamma_max * np.log1p(K * safe_c)
+
+
+def frumkin_model(c, gamma_max, K, a, y0=72.0, T=T_DOMYSLNA):
+    """Równanie stanu Frumkina γ = γ₀ + RT·Γ_max·(ln(1 − θ) + a·θ²).
+
+    Pokrycie θ wynika z izotermy K·c = θ/(1 − θ)·exp(−2aθ), rozwiązywanej
+    wektorowo bisekcją po u = ln(θ/(1 − θ)): u − 2a·θ(u) = ln(K·c) ma
+    jedno rozwiązanie między ln(K·c) a ln(K·c) + 2a, gdy a < 2.
+    """
+    ln_Kc = np.log(K) + np.log(np.maximum(c, 1e-12))
+    a = np.asarray(a, dtype=np.float64)
+    dolna = ln_Kc + 2 * np.minimum(a, 0.0)
+    gorna = ln_Kc + 2 * np.maximum(a, 0.0)
+    for _ in range(_ITERACJE_FRUMKINA):
+        u = (dolna + gorna) / 2
+        za_duze = u - 2 * a / (1 + np.exp(-u)) > ln_Kc
+        dolna = np.where(za_duze, dolna, u)
+        gorna = np.where(za_duze, u, gorna)
+    u = (dolna + gorna) / 2
+    theta = 1 / (1 + np.exp(-u))
+    return y0 + 1000 * R * T * gamma_max * (-np.logaddexp(0.0, u) + a * theta ** 2)
+
+
+def dwa_zakresy_model(c, cmc, gamma_cmc, s1, s2, y0=72.0, T=T_DOMYSLNA):
+    """Dwie proste w ln c złączone w CMC: nachylenie s1 poniżej i s2 powyżej CMC [mN/m na jednostkę ln c]."""
+    x = np.log(np.maximum(c, 1e-12)) - np.log(cmc)
+    return gamma_cmc + s1 * np.minimum(x, 0.0) + s2 * np.maximum(x, 0.0)
+
+
+def _granice_szyszkowskiego(c, y, y0):
+    return (0.001, 1e-7), (1.0, 1.0)
+
+
+def _granice_langmuira(c, y, y0):
+    return (1e-8, 1e-1, y0 - 10), (5e-5, 1e8, y0 + 10)
+
+
+def _granice_frumkina(c, y, y0):
+    return (1e-8, 1e-1, -5.0), (5e-5, 1e8, 1.9)
+
+
+def _granice_dwoch_zakresow(c, y, y0):
+    dodatnie = c[c > 0]
+    return (dodatnie.min(), y.min() - 5, -100.0, -20.0), (dodatnie.max(), y.max() + 5, 5.0, 20.0)
+
+
+def _starty_dwoch_zakresow(c, y, y0, zalamania=48):
+    # Przy ustalonym CMC model jest liniowy w (γ_CMC, s1, s2): równania normalne dla wszystkich załamań naraz
+    dodatnie = c[c > 0]
+    cmc = np.geomspace(dodatnie.min(), dodatnie.max(), zalamania)
+    x = np.log(np.maximum(c, 1e-12))[None, :] - np.log(cmc)[:, None]
+    X = np.stack([np.ones_like(x), np.minimum(x, 0.0), np.maximum(x, 0.0)], axis=-1)
+    XtX = X.transpose(0, 2, 1) @ X + 1e-12 * np.eye(3)
+    wsp = np.linalg.solve(XtX, (X.transpose(0, 2, 1) @ y)[..., None])[..., 0]
+    return np.column_stack([cmc, wsp])
+
+
+def _cmc_szyszkowskiego(p, y0, T):
+    return parametry_izotermy(p[0], p[1], y0)["CMC"]
+
+
+def _cmc_dwoch_zakresow(p, y0, T):
+    return p[0]
+
+
+def _cmc_langmuira(p, y0, T):
+    # Ta sama izoterma w zmiennych Szyszkowskiego: B = RT·Γ_max/γ₀, A = 1/K
+    gamma_max, K, gamma0 = p
+    return parametry_izotermy(1000 * R * T * gamma_max / gamma0, 1 / K, gamma0)["CMC"]
+
+
+MODELE = {
+    "Szyszkowski": ModelIzotermy(
+        "γ = γ₀·(1 − B·ln(c/A + 1))", ("B_sz", "A_sz"), _szyszkowski,
+        _granice_szyszkowskiego, ("lin", "log"), (40, 40), _cmc_szyszkowskiego),
+    "Langmuir–Szyszkowski": ModelIzotermy(
+        "γ = γ₀ − RT·Γ_max·ln(1 + K·c), γ₀ dopasowywane", ("Gamma_max", "K", "gamma0"),
+        langmuir_szyszkowski_model, _granice_langmuira, ("log", "log", "lin"), (24, 24, 12), _cmc_langmuira),
+    "Frumkin": ModelIzotermy(
+        "γ = γ₀ + RT·Γ_max·(ln(1 − θ) + a·θ²), K·c = θ/(1 − θ)·exp(−2aθ)", ("Gamma_max", "K", "a"),
+        frumkin_model, _granice_frumkina, ("log", "log", "lin"), (20, 24, 12), None),
+    "Dwa zakresy": ModelIzotermy(
+        "γ = γ_CMC + s1·min(ln c/CMC, 0) + s2·max(ln c/CMC, 0)", ("CMC", "gamma_cmc", "s1", "s2"),
+        dwa_zakresy_model, _granice_dwoch_zakresow, ("log", "lin", "lin", "lin"), _starty_dwoch_zakresow,
+        _cmc_dwoch_zakresow),
+}
+
+
+def krzywa_modelu(nazwa, c, parametry, y0=72.0, T=T_DOMYSLNA):
+    """γ(c) modelu `nazwa` z rejestru dla słownika parametrów zwróconego przez dopasuj_model."""
+    model = MODELE[nazwa]
+    return model.funkcja(np.asarray(c, dtype=np.float64), *(parametry[p] for p in model.parametry), y0=y0, T=T)
+
+
+def kryteria(sse, n, k):
+    """AIC, AICc i BIC dopasowania najmniejszych kwadratów z `k` parametrami (wariancja reszt to parametr k + 1)."""
+    k = k + 1
+    log_l = n * np.log(max(sse, 1e-300) / n)
+    aicc = log_l + 2 * k + (2 * k * (k + 1) / (n - k - 1) if n - k - 1 > 0 else np.inf)
+    return {"AIC": float(log_l + 2 * k), "AICc": float(aicc), "BIC": float(log_l + k * np.log(n))}
+
+
+@profil.mierzony("dopasowanie")
+def dopasuj_model(nazwa, c, y, y0=72.0, T=T_DOMYSLNA, starty=3):
+    """Dopasowuje model `nazwa` z rejestru MODELE do punktów (c, γ).
+
+    Siatka wszystkich parametrów (albo kandydaci startu podani przez model)
+    liczona jest jednym rzutowaniem numpy; `starty` najlepszych węzłów jest
+    doprecyzowywanych metodą najmniejszych kwadratów (parametry w skali
+    logarytmicznej optymalizowane jako ln p).
+    Zwraca słownik: model, punkty, k, parametry, SSE, R2, AIC, AICc, BIC, CMC.
+    """
+    from scipy.optimize import least_squares  # import scipy trwa długo, a potrzebny jest tylko tutaj
+
+    model = MODELE[nazwa]
+    c = np.asarray(c, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dolne, gorne = (np.asarray(g, dtype=np.float64) for g in model.granice(c, y, y0))
+    logarytm = np.array([skala == "log" for skala in model.skale])
+    wymiar = len(model.parametry)
+
+    def parametry(q):
+        return np.where(logarytm, np.exp(q), q)
+
+    def skala_optymalizacji(p):
+        return np.where(logarytm, np.log(np.where(logarytm, p, 1.0)), p)
+
+    q_dolne, q_gorne = skala_optymalizacji(dolne), skala_optymalizacji(gorne)
+
+    if callable(model.wezly):
+        # Kandydaci (m, k) z funkcji modelu; parametr i to kolumna i, punkty danych na ostatniej osi
+        kandydaci = np.clip(np.asarray(model.wezly(c, y, y0), dtype=np.float64), dolne, gorne)
+        osie = [kandydaci[:, i, None] for i in range(wymiar)]
+    else:
+        # Węzły parametru i leżą na osi i, punkty danych na ostatniej osi
+        wezly = [np.linspace(d, g, w) for d, g, w in zip(q_dolne, q_gorne, model.wezly)]
+        osie = [(np.exp(w) if log else w).reshape([-1 if os_ == i else 1 for os_ in range(wymiar + 1)])
+                for i, (w, log) in enumerate(zip(wezly, logarytm))]
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        sse = np.sum((model.funkcja(c, *osie, y0=y0, T=T) - y) ** 2, axis=-1)
+    sse = np.where(np.isfinite(sse), sse, np.inf)
+
+    siatka = [np.broadcast_to(os_, sse.shape + (1,))[..., 0] for os_ in osie]
+    najlepszy = None
+    for indeksy in zip(*np.unravel_index(np.argsort(sse, axis=None)[:starty], sse.shape)):
+        q0 = skala_optymalizacji(np.array([p[indeksy] for p in siatka]))
+        rozw = least_squares(lambda q: model.funkcja(c, *parametry(q), y0=y0, T=T) - y, q0,
+                             bounds=(q_dolne, q_gorne), x_scale="jac")
+        if najlepszy is None or rozw.cost < najlepszy.cost:
+            najlepszy = rozw
+
+    p = parametry(najlepszy.x)
+    sse_min = 2 * float(najlepszy.cost)
+    ss_tot = np.sum((y - np.mean(y)) ** 2)
+    return {"model": nazwa, "punkty": len(y), "k": wymiar,
+            "parametry": {n: float(v) for n, v in zip(model.parametry, p)},
+            "SSE": sse_min, "R2": float(1 - sse_min / ss_tot) if ss_tot > 0 else np.nan,
+            **kryteria(sse_min, len(y), wymiar),
+            "CMC": float(model.cmc(p, y0, T)) if model.cmc else np.nan}
+
+
+def _dopasuj_model(zadanie):
+    # Błąd jednego modelu nie może przerwać porównania
+    nazwa, c, y, y0, T = zadanie
+    try:
+        return {**dopasuj_model(nazwa, c, y, y0, T), "blad": ""}
+    except Exception as e:
+        return {"model": nazwa, "punkty": len(y), "k": len(MODELE[nazwa].parametry), "parametry": {},
+                "blad": f"{type(e).__name__}: {e}"}
+
+
+def zadania_modeli(c, y, y0=72.0, T=T_DOMYSLNA, modele=None):
+    """Zadania dla `_dopasuj_model`, po jednym na model (domyślnie wszystkie z MODELE)."""
+    c = np.asarray(c, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(c) & np.isfinite(y)
+    if ok.sum() < 3:
+        raise ValueError("Za mało punktów do dopasowania.")
+    return [(nazwa, c[ok], y[ok], y0, T) for nazwa in (modele or MODELE)]
+
+
+def ranking_modeli(wyniki, kryterium="AICc"):
+    """Tabela KOLUMNY_RANKINGU posortowana wg `kryterium`; delta i waga Akaike liczone względem najlepszego."""
+    if kryterium not in KRYTERIA:
+        raise ValueError(f"Nieznane kryterium {kryterium!r}, dostępne: {', '.join(KRYTERIA)}.")
+    wyniki = pd.DataFrame(wyniki, columns=KOLUMNY_RANKINGU[1:])
+    wyniki = wyniki.sort_values(kryterium, na_position="last", kind="stable").reset_index(drop=True)
+    wartosci = pd.to_numeric(wyniki[kryterium], errors="coerce").to_numpy(np.float64)
+    wyniki["delta"] = wartosci - np.nanmin(wartosci) if np.isfinite(wartosci).any() else np.nan
+    wzgledne = np.exp(-0.5 * wyniki["delta"].to_numpy(np.float64))
+    wyniki["waga"] = wzgledne / np.nansum(wzgledne) if np.nansum(wzgledne) > 0 else np.nan
+    pozycje = pd.Series(np.arange(1, len(wyniki) + 1), dtype="Int64")
+    wyniki.insert(0, "pozycja", pozycje.where(wyniki["blad"] == ""))
+    return wyniki
+
+
+def zglos_porownanie_modeli(pula, uzytkownik, c, y, y0=72.0, T=T_DOMYSLNA, modele=None, kryterium="AICc"):
+    """Zgłasza dopasowanie modeli do puli obliczeń (obliczenia.zadania); wynikiem zadania jest ranking_modeli."""
+    zloz = functools.partial(ranking_modeli, kryterium=kryterium)
+    return pula.zglos(uzytkownik, _dopasuj_model, zadania_modeli(c, y, y0, T, modele), zloz)
+
+
+def porownaj_modele(c, y, y0=72.0, T=T_DOMYSLNA, modele=None, kryterium="AICc", procesy=None):
+    """Dopasowuje modele z rejestru równolegle do tych samych danych i zwraca ranking wg `kryterium`.
+
+    AICc (AIC z poprawką na małą liczbę punktów) jest domyślny, bo izotermy
+    mają zwykle kilkanaście punktów; modele z błędem trafiają na koniec tabeli.
+    """
+    return ranking_modeli(mapuj_rownolegle(_dopasuj_model, zadania_modeli(c, y, y0, T, modele), procesy), kryterium)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Porównanie modeli izotermy kryteriami informacyjnymi.")
+    parser.add_argument("plik", help="CSV z kolumnami 'stezenie' i 'napiecie'")
+    parser.add_argument("--y0", type=float, default=72.0, help="Napięcie powierzchniowe wody γ₀ [mN/m]")
+    parser.add_argument("--temp-k", type=float, default=T_DOMYSLNA,
+                        help="Temperatura [K] dla serii bez kolumny temp/temperatura")
+    parser.add_argument("-k", "--kryterium", choices=KRYTERIA, default="AICc")
+    parser.add_argument("-m", "--model", action="append", choices=list(MODELE), help="Tylko wybrane modele")
+    parser.add_argument("-o", "--wyjscie", help="Plik CSV z rankingiem")
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args(argv)
+    bez_zapisu()  # jednorazowe pliki analizy wsadowej nie wypierają wpisów aplikacji
+
+    try:
+        serie = wczytaj_serie(args.plik)
+    except (OSError, ValueError, pd.errors.ParserError) as e:
+        print(f"Nie można wczytać {args.plik}: {e}", file=sys.stderr)
+        return 1
+    rankingi = []
+    for nazwa, (c, y, T_serii) in serie.items():
+        wyniki = porownaj_modele(c, y, args.y0, T_serii or args.temp_k, args.model, args.kryterium,
+                                 args.procesy)
+        wyniki.insert(1, "seria", nazwa)
+        rankingi.append(wyniki)
+    wyniki = pd.concat(rankingi, ignore_index=True)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(wyniki.drop(columns=["parametry"]).to_string(index=False))
+    if args.wyjscie:
+        wyniki.to_csv(args.wyjscie, sep=";", index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
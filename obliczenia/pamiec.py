@@ -0,0 +1,176 @@
+"""Trwała pamięć podręczna wczytanych plików na dysku (format Feather).
+
+Wpisy są kluczowane skrótem zawartości pliku, nazwą i wersją parsera oraz
+argumentami wywołania, więc są wspólne dla wszystkich stron i przetrwają
+restart aplikacji. Po przekroczeniu limitu rozmiaru usuwane są najdawniej
+używane wpisy (LRU). Katalog i limit można zmienić zmiennymi środowiskowymi
+CHEMISTAPP_PAMIEC (pusta wartość wyłącza pamięć) i CHEMISTAPP_PAMIEC_MB.
+
+Analizy wsadowe (procesy puli i wiersz poleceń) tylko czytają pamięć
+(`bez_zapisu`), by tysiące jednorazowych plików nie wypierały wpisów
+używanych interaktywnie.
+"""
+import functools
+import hashlib
+import io
+import os
+import tempfile
+
+import pandas as pd
+
+from obliczenia import profil
+
+KATALOG_DOMYSLNY = os.path.join(os.path.expanduser("~"), ".cache", "chemistapp")
+LIMIT_DOMYSLNY_MB = 512
+PRZYTNIJ_CO = 64  # zapisów między pełnymi przeglądami katalogu (zapisy innych procesów)
+ZAPAS = 0.9  # przycinanie do tej części limitu, by kolejne zapisy nie przeglądały katalogu od razu
+
+_zapis = True
+
+
+class PamiecDyskowa:
+    """Katalog plików .feather z limitem rozmiaru i usuwaniem wg ostatniego użycia."""
+
+    def __init__(self, katalog=KATALOG_DOMYSLNY, limit_bajtow=LIMIT_DOMYSLNY_MB * 2**20):
+        self.katalog = katalog
+        self.limit_bajtow = limit_bajtow
+        os.makedirs(katalog, exist_ok=True)
+        self._rozmiar = None  # szacowany łączny rozmiar wpisów, None przed pierwszym przeglądem
+        self._zapisy = 0
+
+    @staticmethod
+    def klucz(dane, *czesci):
+        h = hashlib.blake2b(dane, digest_size=20)
+        for czesc in czesci:
+            h.update(b"\0" + repr(czesc).encode())
+        return h.hexdigest()
+
+    def _sciezka(self, klucz):
+        return os.path.join(self.katalog, f"{klucz}.feather")
+
+    def pobierz(self, klucz):
+        """Zwraca zapisaną ramkę albo None; trafienie odświeża czas ostatniego użycia."""
+        sciezka = self._sciezka(klucz)
+        try:
+            df = pd.read_feather(sciezka)
+            os.utime(sciezka)
+            return df
+        except (OSError, ValueError):
+            return None
+
+    def zapisz(self, klucz, df):
+        df = df.reset_index(drop=True)
+        df.columns = [str(col) for col in df.columns]
+        # Zapis do pliku tymczasowego i podmiana, by równoległe sesje nie czytały połowy pliku
+        fd, tymczasowy = tempfile.mkstemp(dir=self.katalog, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_feather(tymczasowy)
+            wielkosc = os.path.getsize(tymczasowy)
+            os.replace(tymczasowy, self._sciezka(klucz))
+        except Exception:
+            os.remove(tymczasowy)
+            raise
+        # Pełny przegląd katalogu tylko po przekroczeniu limitu przez licznik albo co PRZYTNIJ_CO zapisów
+        self._zapisy += 1
+        if self._rozmiar is not None:
+            self._rozmiar += wielkosc
+        if self._rozmiar is None or self._rozmiar > self.limit_bajtow or self._zapisy >= PRZYTNIJ_CO:
+            self.przytnij()
+
+    def przytnij(self):
+        """Usuwa najdawniej używane wpisy, gdy łączny rozmiar przekracza limit (do ZAPAS limitu)."""
+        wpisy = []
+        for wpis in os.scandir(self.katalog):
+            if wpis.name.endswith(".feather"):
+                stat = wpis.stat()
+                wpisy.append((stat.st_mtime, stat.st_size, wpis.path))
+        rozmiar = sum(w[1] for w in wpisy)
+        cel = self.limit_bajtow * ZAPAS if rozmiar > self.limit_bajtow else rozmiar
+        for _, wielkosc, sciezka in sorted(wpisy):
+            if rozmiar <= cel:
+                break
+            try:
+                os.remove(sciezka)
+                rozmiar -= wielkosc
+            except OSError:
+                pass
+        self._rozmiar = rozmiar
+        self._zapisy = 0
+
+    def wyczysc(self):
+        for wpis in os.scandir(self.katalog):
+            if wpis.name.endswith(".feather"):
+                os.remove(wpis.path)
+
+
+def bez_zapisu():
+    """Wyłącza zapis nowych wpisów w bieżącym procesie; odczyt zapisanych działa dalej.
+
+    Używane jako inicjalizator procesów puli i w analizach z wiersza poleceń.
+    """
+    global _zapis
+    _zapis = False
+
+
+@functools.lru_cache(maxsize=1)
+def domyslna_pamiec():
+    """Pamięć wg zmiennych środowiskowych lub None, gdy jest wyłączona albo niedostępna."""
+    katalog = os.environ.get("CHEMISTAPP_PAMIEC", KATALOG_DOMYSLNY)
+    if not katalog:
+        return None
+    limit_mb = float(os.environ.get("CHEMISTAPP_PAMIEC_MB", LIMIT_DOMYSLNY_MB))
+    try:
+        return PamiecDyskowa(katalog, int(limit_mb * 2**20))
+    except OSError:
+        return None
+
+
+def _odczytaj_bajty(plik):
+    # Ścieżka, UploadedFile ze Streamlit lub dowolny obiekt plikowy
+    if isinstance(plik, (str, os.PathLike)):
+        with open(plik, "rb") as f:
+            return f.read(), os.path.basename(plik)
+    if hasattr(plik, "getvalue"):
+        dane = plik.getvalue()
+    else:
+        dane = plik.read()
+        if hasattr(plik, "seek"):
+            plik.seek(0)
+    return dane, getattr(plik, "name", "")
+
+
+def z_pamiecia(wersja):
+    """Dekorator parsera `funkcja(plik, ...)` zwracającego DataFrame.
+
+    Zmiana `wersja` unieważnia wpisy zapisane przez poprzednią wersję parsera.
+    """
+    def dekorator(funkcja):
+        parser = f"{funkcja.__module__}.{funkcja.__qualname__}"
+
+        @functools.wraps(funkcja)
+        @profil.mierzony("wczytywanie", parser.removeprefix("obliczenia."))
+        def opakowanie(plik, *args, **kwargs):
+            pamiec = domyslna_pamiec()
+            if pamiec is None:
+                return funkcja(plik, *args, **kwargs)
+
+            dane, nazwa = _odczytaj_bajty(plik)
+            klucz = pamiec.klucz(dane, parser, wersja, os.path.splitext(nazwa)[1], args, sorted(kwargs.items()))
+            df = pamiec.pobierz(klucz)
+            profil.trafienie(df is not None)
+            if df is None:
+                zrodlo = io.BytesIO(dane)
+                zrodlo.name = nazwa
+                df = funkcja(zrodlo, *args, **kwargs)
+                if not _zapis:
+                    return df
+                try:
+                    pamiec.zapisz(klucz, df)
+                except Exception:
+                    pass  # brak zapisu do pamięci nie może blokować analizy
+            return df
+
+        return opakowanie
+
+    return dekorator
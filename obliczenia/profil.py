@@ -0,0 +1,228 @@
+"""Pomiar czasu i pamięci etapów obliczeń (wczytywanie, dopasowanie, rysowanie).
+
+Etapy oznaczane są dekoratorem `mierzony` albo menedżerem kontekstu
+`etap`. Każdy pomiar (czas, przyrost szczytowej pamięci śledzonej przez
+tracemalloc, trafienie pamięci podręcznej, sesja) trafia jako jeden wiersz
+JSON do pliku dziennika i do ograniczonej listy w procesie, z której
+`percentyle` liczy podsumowanie dla panelu strony. Pomiar włącza zmienna
+środowiskowa CHEMISTAPP_PROFIL (ścieżka dziennika albo "1" dla ścieżki
+domyślnej), a CHEMISTAPP_PROFIL_PAMIEC=0 wyłącza tracemalloc, który
+spowalnia alokacje. Wyłączony pomiar kosztuje jedno sprawdzenie zmiennej
+globalnej na wywołanie.
+
+Pamięć szczytowa jest wspólna dla procesu, więc przy równoległych sesjach
+obejmuje też ich alokacje z tego samego czasu.
+
+    python -m obliczenia.profil ~/.cache/chemistapp/profil.jsonl
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+SCIEZKA_DOMYSLNA = os.path.join(os.path.expanduser("~"), ".cache", "chemistapp", "profil.jsonl")
+ZAPISY_W_PAMIECI = 10000  # ostatnie pomiary dostępne dla panelu
+PERCENTYLE = (0.5, 0.9, 0.99)
+
+_dziennik = None  # otwarty plik albo None, gdy pomiar jest wyłączony
+_sledz_pamiec = False
+_zapisy = deque(maxlen=ZAPISY_W_PAMIECI)
+_blokada = threading.Lock()
+_watek = threading.local()  # sesja i stos otwartych etapów bieżącego wątku
+_NIC = contextlib.nullcontext()
+
+
+def wlaczony():
+    return _dziennik is not None
+
+
+def wlacz(sciezka=SCIEZKA_DOMYSLNA, pamiec=True):
+    """Włącza pomiar z dopisywaniem do dziennika `sciezka` (os.devnull = tylko w pamięci)."""
+    global _dziennik, _sledz_pamiec
+    wylacz()
+    katalog = os.path.dirname(sciezka)
+    if katalog:
+        os.makedirs(katalog, exist_ok=True)
+    _dziennik = open(sciezka, "a", encoding="utf-8")
+    _sledz_pamiec = pamiec
+    if pamiec and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def wylacz():
+    global _dziennik, _sledz_pamiec
+    if _dziennik is not None:
+        _dziennik.close()
+        _dziennik = None
+    if _sledz_pamiec and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _sledz_pamiec = False
+
+
+def ustaw_sesje(sesja):
+    """Identyfikator sesji dopisywany do pomiarów z bieżącego wątku (skryptu Streamlit)."""
+    _watek.sesja = sesja
+
+
+def _stos():
+    stos = getattr(_watek, "stos", None)
+    if stos is None:
+        stos = _watek.stos = []
+    return stos
+
+
+class _Etap:
+    def __init__(self, etap, nazwa):
+        self.zapis = {"etap": etap, "nazwa": nazwa, "sesja": getattr(_watek, "sesja", None), "trafienie": None}
+        self.szczyt = 0
+
+    def __enter__(self):
+        stos = _stos()
+        if _sledz_pamiec:
+            obecna, szczyt = tracemalloc.get_traced_memory()
+            # Szczyt sprzed wejścia należy do etapu nadrzędnego; licznik zaczyna od nowa
+            if stos:
+                stos[-1].szczyt = max(stos[-1].szczyt, szczyt)
+            tracemalloc.reset_peak()
+            self.pamiec_start = obecna
+        stos.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *blad):
+        czas = time.perf_counter() - self.start
+        stos = _stos()
+        stos.pop()
+        zapis = self.zapis
+        zapis["czas"] = time.time()
+        zapis["ms"] = round(czas * 1000, 3)
+        zapis["pid"] = os.getpid()
+        if _sledz_pamiec:
+            szczyt = max(self.szczyt, tracemalloc.get_traced_memory()[1])
+            zapis["pamiec_kb"] = round(max(szczyt - self.pamiec_start, 0) / 1024, 1)
+            if stos:
+                stos[-1].szczyt = max(stos[-1].szczyt, szczyt)
+        if blad[0] is not None:
+            zapis["blad"] = blad[0].__name__
+        _zapisz(zapis)
+        return False
+
+
+def _zapisz(zapis):
+    wiersz = json.dumps(zapis, ensure_ascii=False)
+    with _blokada:
+        _zapisy.append(zapis)
+        dziennik = _dziennik
+        if dziennik is not None:
+            dziennik.write(wiersz + "\n")
+            dziennik.flush()
+
+
+def etap(etap, nazwa=""):
+    """Menedżer kontekstu mierzący blok kodu; bez włączonego pomiaru nic nie robi."""
+    if _dziennik is None:
+        return _NIC
+    return _Etap(etap, nazwa)
+
+
+def trafienie(trafiono):
+    """Oznacza najbardziej wewnętrzny otwarty etap jako trafienie (albo chybienie) pamięci podręcznej."""
+    if _dziennik is None:
+        return
+    stos = _stos()
+    if stos:
+        stos[-1].zapis["trafienie"] = bool(trafiono)
+
+
+def mierzony(etap_, nazwa=None):
+    """Dekorator mierzący każde wywołanie funkcji jako `etap_` (nazwa domyślnie z funkcji)."""
+    def dekorator(funkcja):
+        opis = nazwa or f"{funkcja.__module__.rsplit('.', 1)[-1]}.{funkcja.__qualname__}"
+
+        @functools.wraps(funkcja)
+        def opakowanie(*args, **kwargs):
+            if _dziennik is None:
+                return funkcja(*args, **kwargs)
+            with _Etap(etap_, opis):
+                return funkcja(*args, **kwargs)
+
+        return opakowanie
+
+    return dekorator
+
+
+def percentyle(zapisy=None, sesja=None):
+    """DataFrame z liczbą pomiarów, percentylami czasu [ms], maksymalną pamięcią i udziałem trafień.
+
+    Bez `zapisy` używane są pomiary z bieżącego procesu; `sesja` zawęża je do jednej sesji.
+    """
+    import pandas as pd
+
+    if zapisy is None:
+        with _blokada:
+            zapisy = list(_zapisy)
+    df = pd.DataFrame(zapisy, columns=["etap", "nazwa", "sesja", "ms", "pamiec_kb", "trafienie"])
+    if sesja is not None:
+        df = df[df["sesja"] == sesja]
+    # Trafienie: 1/0, brak dla etapów bez pamięci podręcznej
+    liczby = df[["ms", "pamiec_kb", "trafienie"]].apply(pd.to_numeric, errors="coerce").astype(float)
+    grupy = liczby.groupby([df["etap"], df["nazwa"]], sort=True)
+    kolumny_percentyli = [f"p{round(p * 100)}_ms" for p in PERCENTYLE]
+    wynik = pd.DataFrame({"liczba": grupy.size()})
+    for kolumna, p in zip(kolumny_percentyli, PERCENTYLE):
+        wynik[kolumna] = grupy["ms"].quantile(p)
+    wynik["max_ms"] = grupy["ms"].max()
+    wynik["pamiec_max_kb"] = grupy["pamiec_kb"].max()
+    wynik["trafienia"] = grupy["trafienie"].mean()
+    return wynik
+
+
+def wczytaj_dziennik(sciezka):
+    """Lista pomiarów z pliku JSON-lines (uszkodzone wiersze są pomijane)."""
+    zapisy = []
+    with open(sciezka, encoding="utf-8") as f:
+        for wiersz in f:
+            try:
+                zapisy.append(json.loads(wiersz))
+            except ValueError:
+                continue
+    return zapisy
+
+
+def _po_rozwidleniu():
+    # Proces puli utworzony przez fork dziedziczy blokadę, którą mógł trzymać inny wątek
+    global _blokada
+    _blokada = threading.Lock()
+    _watek.__dict__.clear()
+
+
+os.register_at_fork(after_in_child=_po_rozwidleniu)
+
+_z_srodowiska = os.environ.get("CHEMISTAPP_PROFIL", "")
+if _z_srodowiska:
+    try:
+        wlacz(SCIEZKA_DOMYSLNA if _z_srodowiska == "1" else _z_srodowiska,
+              os.environ.get("CHEMISTAPP_PROFIL_PAMIEC", "1") != "0")
+    except OSError:
+        pass  # brak dziennika nie może blokować aplikacji
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Percentyle czasów etapów z dziennika pomiarów.")
+    parser.add_argument("dziennik", nargs="?", default=SCIEZKA_DOMYSLNA)
+    parser.add_argument("--sesja", help="Tylko pomiary jednej sesji")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    with pd.option_context("display.width", 200, "display.max_rows", None, "display.max_columns", None):
+        print(percentyle(wczytaj_dziennik(args.dziennik), args.sesja).round(2))
+
+
+if __name__ == "__main__":
+    main()
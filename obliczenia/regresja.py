@@ -0,0 +1,178 @@
+"""Regresja liniowa metodą najmniejszych kwadratów w postaci zamkniętej (tylko numpy)."""
+from collections import namedtuple
+
+import numpy as np
+
+from obliczenia import profil
+
+WynikRegresji = namedtuple("WynikRegresji", ["a", "b", "r2", "se_a", "se_b", "n"])
+WynikRegresji.__doc__ = "Nachylenie a, wyraz wolny b, R², błędy standardowe a i b oraz liczba punktów."
+
+
+@profil.mierzony("dopasowanie")
+def regresja_liniowa(x, y, maski=None, wagi=None):
+    """Dopasowuje y = a·x + b dla jednego lub wielu podzbiorów punktów naraz.
+
+    `x` i `y` mają kształt (n,) albo (k, n) (np. k plików dopełnionych NaN),
+    `maski` to tablica wag 0/1 o kształcie (n,) lub (k, n) — każdy wiersz
+    wybiera osobny podzbiór punktów. Opcjonalne `wagi` (np. 1/σ²) dają
+    ważoną metodę najmniejszych kwadratów. Wynik ma kształt zgodny z liczbą
+    masek; dla podzbiorów z mniej niż dwoma punktami zwracane są NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if maski is None:
+        maski = np.isfinite(x) & np.isfinite(y)
+    w = np.asarray(maski, dtype=bool)
+    w = w & np.isfinite(x) & np.isfinite(y)
+    wagi = np.ones(1) if wagi is None else np.asarray(wagi, dtype=np.float64)
+    x, y, w, wagi = np.broadcast_arrays(x, y, w, wagi)
+
+    # Przesunięcie każdego wiersza o jego średnią ogranicza utratę cyfr znaczących w sumach kwadratów
+    # (wiersze mogą mieć zupełnie różne skale x i y)
+    ile = np.maximum(w.sum(axis=-1, keepdims=True), 1)
+    x0 = np.where(w, x, 0.0).sum(axis=-1, keepdims=True) / ile
+    y0 = np.where(w, y, 0.0).sum(axis=-1, keepdims=True) / ile
+    v = np.where(w, wagi, 0.0)
+    dx = np.where(w, x - x0, 0.0)
+    dy = np.where(w, y - y0, 0.0)
+    x0, y0 = x0[..., 0], y0[..., 0]
+
+    n = w.sum(axis=-1)
+    sw = v.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = (v * dx).sum(axis=-1) / sw
+        my = (v * dy).sum(axis=-1) / sw
+        sxx = (v * dx * dx).sum(axis=-1) - sw * mx * mx
+        syy = (v * dy * dy).sum(axis=-1) - sw * my * my
+        sxy = (v * dx * dy).sum(axis=-1) - sw * mx * my
+
+        a = sxy / sxx
+        b = (my + y0) - a * (mx + x0)
+        ss_res = np.maximum(syy - a * sxy, 0.0)
+        r2 = np.where(syy > 0, 1 - ss_res / syy, np.nan)
+        s2 = np.where(n > 2, ss_res / (n - 2), np.nan)
+        se_a = np.sqrt(s2 / sxx)
+        se_b = np.sqrt(s2 * (1 / sw + (mx + x0) ** 2 / sxx))
+
+    za_malo = n < 2
+    a, b, r2, se_a, se_b = (np.where(za_malo, np.nan, wart) for wart in (a, b, r2, se_a, se_b))
+    if a.ndim == 0:
+        return WynikRegresji(float(a), float(b), float(r2), float(se_a), float(se_b), int(n))
+    return WynikRegresji(a, b, r2, se_a, se_b, n)
+
+
+def regresja_z_sum(n, sx, sy, sxx, sxy, syy):
+    """Wynik regresji z sum n, Σx, Σy, Σx², Σxy, Σy² (aktualizowanych przyrostowo)."""
+    n, sx, sy, sxx, sxy, syy = (np.asarray(v, dtype=np.float64) for v in (n, sx, sy, sxx, sxy, syy))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx, my = sx / n, sy / n
+        cxx = sxx - sx * mx
+        cxy = sxy - sx * my
+        cyy = syy - sy * my
+        a = cxy / cxx
+        b = my - a * mx
+        ss_res = np.maximum(cyy - a * cxy, 0.0)
+        r2 = np.where(cyy > 0, 1 - ss_res / cyy, np.nan)
+        s2 = np.where(n > 2, ss_res / (n - 2), np.nan)
+        se_a = np.sqrt(s2 / cxx)
+        se_b = np.sqrt(s2 * (1 / n + mx * mx / cxx))
+
+    za_malo = n < 2
+    a, b, r2, se_a, se_b = (np.where(za_malo, np.nan, wart) for wart in (a, b, r2, se_a, se_b))
+    if a.ndim == 0:
+        return WynikRegresji(float(a), float(b), float(r2), float(se_a), float(se_b), int(n))
+    return WynikRegresji(a, b, r2, se_a, se_b, n.astype(int))
+
+
+class SumyRegresji:
+    """Sumy n, Σx, Σy, Σx², Σxy, Σy² liczone względem stałego punktu odniesienia.
+
+    Punkty można dodawać i odejmować (bufor pomiaru na żywo, przełączanie
+    punktów w tabeli) bez ponownego przechodzenia po wszystkich danych.
+    """
+
+    def __init__(self):
+        self.x0 = self.y0 = None
+        self.sumy = np.zeros(6)
+
+    def zmien(self, x, y, znak=1.0):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ok = np.isfinite(x) & np.isfinite(y)
+        x, y = x[ok], y[ok]
+        if not len(x):
+            return
+        if self.x0 is None:
+            # Przesunięcie o pierwsze punkty ogranicza utratę cyfr przy długim pomiarze
+            self.x0, self.y0 = float(x[0]), float(y[0])
+        dx, dy = x - self.x0, y - self.y0
+        self.sumy += znak * np.array([len(dx), dx.sum(), dy.sum(), dx @ dx, dx @ dy, dy @ dy])
+        if self.sumy[0] <= 0:
+            # Po usunięciu wszystkich punktów zerujemy sumy, by nie przenosić błędów zaokrągleń
+            self.sumy[:] = 0.0
+
+    def przelacz(self, x, y, stara_maska, nowa_maska):
+        """Dodaje punkty zaznaczone i odejmuje odznaczone między dwiema maskami."""
+        stara_maska = np.asarray(stara_maska, dtype=bool)
+        nowa_maska = np.asarray(nowa_maska, dtype=bool)
+        dodane = nowa_maska & ~stara_maska
+        usuniete = stara_maska & ~nowa_maska
+        if dodane.any():
+            self.zmien(np.asarray(x)[dodane], np.asarray(y)[dodane], 1.0)
+        if usuniete.any():
+            self.zmien(np.asarray(x)[usuniete], np.asarray(y)[usuniete], -1.0)
+
+    @profil.mierzony("dopasowanie")
+    def wynik(self):
+        wynik = regresja_z_sum(*self.sumy)
+        if not np.isfinite(wynik.a):
+            return wynik
+        # Powrót z układu przesuniętego: wyraz wolny i jego niepewność zależą od położenia osi
+        n, sx, _, sxx = self.sumy[:4]
+        mx = sx / n
+        se_b = wynik.se_a * np.sqrt((sxx - sx * mx) / n + (mx + self.x0) ** 2)
+        return wynik._replace(b=wynik.b + self.y0 - wynik.a * self.x0, se_b=float(se_b))
+
+
+def wplyw_punktow(x, y, maska=None):
+    """Odległość Cooka i reszty studentyzowane z pominięciem punktu (leave-one-out).
+
+    Wszystkie n dopasowań bez i-tego punktu wynikają z dźwigni h_i i reszt
+    jednego dopasowania, więc liczone są jednym wektorowym przebiegiem.
+    Zwraca (cook, t) o kształcie x; punkty spoza maski mają NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    w = np.isfinite(x) & np.isfinite(y)
+    if maska is not None:
+        w &= np.asarray(maska, dtype=bool)
+    cook = np.full(x.shape, np.nan)
+    t = np.full(x.shape, np.nan)
+    n = int(w.sum())
+    if n < 4:
+        return cook, t
+
+    xw, yw = x[w], y[w]
+    dx = xw - xw.mean()
+    sxx = dx @ dx
+    if sxx <= 0:
+        return cook, t
+    a = (dx @ (yw - yw.mean())) / sxx
+    e = yw - yw.mean() - a * dx
+    h = 1.0 / n + dx * dx / sxx
+    s2 = (e @ e) / (n - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cook[w] = e * e * h / (2 * s2 * (1 - h) ** 2)
+        s2_bez = np.maximum(((n - 2) * s2 - e * e / (1 - h)) / (n - 3), 0.0)
+        t[w] = e / np.sqrt(s2_bez * (1 - h))
+    return cook, t
+
+
+def punkty_odstajace(x, y, maska=None, prog_cooka=None, prog_t=3.0):
+    """Maska punktów o odległości Cooka > 4/n albo |t| > prog_t (sugestia do odrzucenia)."""
+    cook, t = wplyw_punktow(x, y, maska)
+    n = np.isfinite(cook).sum()
+    prog_cooka = 4.0 / max(n, 1) if prog_cooka is None else prog_cooka
+    with np.errstate(invalid="ignore"):
+        return (cook > prog_cooka) | (np.abs(t) > prog_t)
@@ -0,0 +1,186 @@
+"""Śledzenie pomiaru tensjometru na żywo: rosnący plik tekstowy albo lokalne gniazdo TCP.
+
+Nowe wiersze trafiają do bufora pierścieniowego o stałej pojemności, a
+regresje sigma od √Tlife i od 1/Tlife są aktualizowane przyrostowo z sum
+(punkt wypadający z bufora jest od sum odejmowany), więc koszt odświeżenia
+zależy tylko od liczby nowych wierszy, a nie od długości pomiaru.
+"""
+import os
+import socket
+
+import numpy as np
+
+from obliczenia.regresja import SumyRegresji
+from obliczenia.tensjometr import KOLUMNY
+from obliczenia.wykrywanie import SEPARATORY, wykryj_format
+
+
+def parsuj_wiersze(linie, indeksy, separator="\t"):
+    """Tablica (k, len(KOLUMNY)) z wierszy rozdzielanych separatorem; błędne wiersze są pomijane."""
+    wiersze = []
+    for linia in linie:
+        pola = linia.rstrip("\r\n").split(separator)
+        try:
+            wiersze.append([float(pola[i].replace(",", ".")) for i in indeksy])
+        except (IndexError, ValueError):
+            continue
+    return np.array(wiersze, dtype=np.float64).reshape(-1, len(indeksy))
+
+
+class _CzytnikWierszy:
+    """Składa kompletne linie z kolejnych porcji bajtów i rozpoznaje nagłówek kolumn.
+
+    Kodowanie wykrywane jest z bajtów odebranych do nagłówka włącznie, a
+    separator z samego nagłówka (zob. obliczenia.wykrywanie).
+    """
+
+    def __init__(self):
+        self._reszta = b""
+        self._poczatek = b""
+        self.indeksy = None
+        self.kodowanie = None
+        self.separator = "\t"
+
+    def _szukaj_naglowka(self, linie):
+        # Zwraca numer linii nagłówka albo None; ustala kodowanie i separator
+        self._poczatek += b"\n".join(linie) + b"\n"
+        kodowanie = wykryj_format(self._poczatek).kodowanie
+        for nr, linia in enumerate(linie):
+            tekst = linia.decode(kodowanie, errors="replace")
+            for separator in SEPARATORY:
+                nazwy = [pole.strip().lower() for pole in tekst.split(separator)]
+                if all(col in nazwy for col in KOLUMNY):
+                    self.indeksy = [nazwy.index(col) for col in KOLUMNY]
+                    self.kodowanie, self.separator = kodowanie, separator
+                    self._poczatek = b""
+                    return nr
+        return None
+
+    def dodaj(self, bajty):
+        dane = self._reszta + bajty
+        *linie, self._reszta = dane.split(b"\n")
+        if self.indeksy is None:
+            nr = self._szukaj_naglowka(linie)
+            if nr is None:
+                return parsuj_wiersze([], range(len(KOLUMNY)))
+            linie = linie[nr + 1:]
+        tekst = [linia.decode(self.kodowanie, errors="replace") for linia in linie]
+        return parsuj_wiersze(tekst, self.indeksy, self.separator)
+
+
+class OgonPliku:
+    """Czyta z pliku tylko bajty dopisane od poprzedniego wywołania (jak `tail -f`)."""
+
+    zamkniete = False  # plik może jeszcze rosnąć, więc źródło nie kończy się samo
+
+    def __init__(self, sciezka):
+        self.sciezka = sciezka
+        self._pozycja = 0
+        self._czytnik = _CzytnikWierszy()
+
+    def pobierz(self):
+        if os.path.getsize(self.sciezka) < self._pozycja:
+            # Plik nadpisany od nowa – nowy pomiar
+            self._pozycja = 0
+            self._czytnik = _CzytnikWierszy()
+        with open(self.sciezka, "rb") as f:
+            f.seek(self._pozycja)
+            bajty = f.read()
+        self._pozycja += len(bajty)
+        return self._czytnik.dodaj(bajty)
+
+    def zamknij(self):
+        pass
+
+
+class GniazdoLokalne:
+    """Odbiera wiersze tensjometru wysyłane strumieniem TCP (np. przez program akwizycji).
+
+    Gdy nadawca zamknie połączenie, `zamkniete` przyjmuje wartość True
+    (wiersze odebrane wcześniej są jeszcze zwracane).
+    """
+
+    def __init__(self, host="127.0.0.1", port=5555, limit_czasu=2.0):
+        self._gniazdo = socket.create_connection((host, port), timeout=limit_czasu)
+        self._gniazdo.setblocking(False)
+        self._czytnik = _CzytnikWierszy()
+        self.zamkniete = False
+
+    def pobierz(self):
+        porcje = []
+        while not self.zamkniete:
+            try:
+                porcja = self._gniazdo.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionError:
+                porcja = b""
+            if not porcja:
+                # recv zwraca b"" dopiero po zamknięciu połączenia przez nadawcę
+                self.zamkniete = True
+                break
+            porcje.append(porcja)
+        return self._czytnik.dodaj(b"".join(porcje))
+
+    def zamknij(self):
+        self._gniazdo.close()
+
+
+def otworz_zrodlo(opis):
+    """Ścieżka do pliku .dat/.txt albo adres `host:port` lokalnego gniazda."""
+    if os.path.exists(opis):
+        return OgonPliku(opis)
+    host, _, port = opis.rpartition(":")
+    if port.isdigit():
+        return GniazdoLokalne(host or "127.0.0.1", int(port))
+    raise ValueError(f"Nie znaleziono pliku ani adresu host:port: {opis}")
+
+
+class KinetykaNaZywo:
+    """Bufor pierścieniowy ostatnich punktów i przyrostowe regresje obu reżimów kinetyki."""
+
+    def __init__(self, pojemnosc=10000):
+        self.pojemnosc = pojemnosc
+        self._dane = np.full((pojemnosc, len(KOLUMNY)), np.nan)
+        self._zapisane = 0
+        self.sumy = {"sqrt_tlife": SumyRegresji(), "inv_tlife": SumyRegresji()}
+
+    @staticmethod
+    def _x(tlife):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"sqrt_tlife": np.sqrt(tlife), "inv_tlife": 1 / tlife}
+
+    def _zmien_sumy(self, wiersze, znak):
+        iks = self._x(wiersze[:, KOLUMNY.index("tlife")])
+        sigma = wiersze[:, KOLUMNY.index("sigma")]
+        for nazwa, sumy in self.sumy.items():
+            sumy.zmien(iks[nazwa], sigma, znak)
+
+    def dodaj(self, wiersze):
+        """Dopisuje wiersze (k, len(KOLUMNY)); najstarsze punkty ponad pojemność są usuwane z sum."""
+        wiersze = np.asarray(wiersze, dtype=np.float64)[-self.pojemnosc:]
+        k = len(wiersze)
+        if not k:
+            return
+        pozycje = (self._zapisane + np.arange(k)) % self.pojemnosc
+        if self._zapisane + k > self.pojemnosc:
+            stare = self._dane[pozycje]
+            self._zmien_sumy(stare[np.isfinite(stare[:, 0])], -1.0)
+        self._dane[pozycje] = wiersze
+        self._zapisane += k
+        self._zmien_sumy(wiersze, 1.0)
+
+    def dane(self):
+        """Słownik tablic z punktami w buforze w kolejności pomiaru (z kolumnami sqrt_tlife i inv_tlife)."""
+        if self._zapisane <= self.pojemnosc:
+            blok = self._dane[:self._zapisane]
+        else:
+            start = self._zapisane % self.pojemnosc
+            blok = np.concatenate([self._dane[start:], self._dane[:start]])
+        dane = {col: blok[:, i] for i, col in enumerate(KOLUMNY)}
+        dane.update(self._x(dane["tlife"]))
+        return dane
+
+    def regresja(self, x_kolumna):
+        """Wynik regresji sigma od `sqrt_tlife` albo `inv_tlife` dla punktów w buforze."""
+        return self.sumy[x_kolumna].wynik()
@@ -0,0 +1,21 @@
+"""Szybki czytnik eksportu tensjometru pęcherzykowego (#, sigma, f, Tlife, Temp, Date/Time, TMeas)."""
+import numpy as np
+
+from obliczenia.wykrywanie import wczytaj_tabele
+
+KOLUMNY = ("sigma", "f", "tlife", "temp")
+
+
+def wczytaj_tensjometr(plik):
+    """Zwraca słownik tablic float64 {sigma, f, tlife, temp} z eksportu tensjometru.
+
+    Separator, znak dziesiętny i kodowanie wykrywane są z początku pliku
+    (zob. obliczenia.wykrywanie), przecinki dziesiętne parsuje silnik C, a
+    kolumny z datą i czasem pomiaru są pomijane już na etapie czytania.
+    """
+    df = wczytaj_tabele(plik, kolumny=lambda col: col.lower() in KOLUMNY, typy=np.float64)
+    df.columns = [col.strip().lower() for col in df.columns]
+    brakujace = [col for col in KOLUMNY if col not in df.columns]
+    if brakujace:
+        raise ValueError(f"Brak kolumn w pliku tensjometru: {', '.join(brakujace)}")
+    return {col: df[col].to_numpy(dtype=np.float64) for col in KOLUMNY}
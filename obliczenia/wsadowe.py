@@ -0,0 +1,73 @@
+"""Narzędzia analiz wsadowych: wyszukiwanie plików i wspólna pula procesów."""
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from obliczenia.pamiec import bez_zapisu
+
+
+def mapuj_rownolegle(funkcja, zadania, procesy=None):
+    """Wykonuje `funkcja(zadanie)` dla każdego zadania w puli procesów, zachowując kolejność.
+
+    Przy jednym procesie lub jednym zadaniu liczy w bieżącym procesie, bez
+    narzutu uruchamiania puli. `funkcja` musi być zdefiniowana na poziomie
+    modułu. Procesy puli nie zapisują do pamięci dyskowej (zob. obliczenia.pamiec).
+    """
+    zadania = list(zadania)
+    if procesy == 1 or len(zadania) < 2:
+        return [funkcja(z) for z in zadania]
+    procesy = min(procesy or os.cpu_count() or 1, len(zadania))
+    # Większe paczki ograniczają narzut komunikacji przy tysiącach małych zadań
+    chunksize = max(1, len(zadania) // (procesy * 4))
+    with ProcessPoolExecutor(max_workers=procesy, initializer=bez_zapisu) as pula:
+        return list(pula.map(funkcja, zadania, chunksize=chunksize))
+
+
+def mapuj_z_limitem(funkcja, zadania, procesy=None, limit_czasu=None, postep=None):
+    """Jak `mapuj_rownolegle`, ale przerywa po `limit_czasu` sekundach.
+
+    Zwraca wyniki zadań ukończonych przed upływem limitu (w kolejności
+    ukończenia). Po limicie procesy puli są zabijane, także w trakcie
+    liczenia zadania, więc limit jest twardy; w jednym procesie przerwanie
+    następuje dopiero po bieżącym zadaniu. `postep(gotowe, wszystkie)` jest
+    wywoływane po każdym ukończonym zadaniu.
+    """
+    zadania = list(zadania)
+    termin = None if limit_czasu is None else time.monotonic() + limit_czasu
+    wyniki = []
+
+    if procesy == 1 or len(zadania) < 2:
+        for zadanie in zadania:
+            if termin is not None and time.monotonic() > termin:
+                break
+            wyniki.append(funkcja(zadanie))
+            if postep:
+                postep(len(wyniki), len(zadania))
+        return wyniki
+
+    # multiprocessing.Pool, bo w odróżnieniu od ProcessPoolExecutor potrafi zakończyć trwające zadania
+    with multiprocessing.Pool(min(procesy or os.cpu_count() or 1, len(zadania)), bez_zapisu) as pula:  # terminate()
+        gotowe = pula.imap_unordered(funkcja, zadania)
+        for _ in zadania:
+            pozostalo = None if termin is None else termin - time.monotonic()
+            if pozostalo is not None and pozostalo <= 0:
+                break
+            try:
+                wyniki.append(gotowe.next(timeout=pozostalo))
+            except multiprocessing.TimeoutError:
+                break  # minął limit czasu
+            if postep:
+                postep(len(wyniki), len(zadania))
+    return wyniki
+
+
+def rozwin_wzorce(wzorce):
+    """Rozwija wzorce glob (i katalogi) do posortowanej listy plików bez powtórzeń."""
+    pliki = []
+    for wzorzec in wzorce:
+        if os.path.isdir(wzorzec):
+            wzorzec = os.path.join(wzorzec, "*")
+        pliki.extend(p for p in glob.glob(wzorzec) if os.path.isfile(p))
+    return sorted(set(pliki))
@@ -0,0 +1,233 @@
+"""Renderowanie wykresów matplotlib do gotowych obrazów z pamięcią LRU w procesie serwera.
+
+Obraz jest kluczowany skrótem danych, parametrów dopasowania, stylu i kodu
+funkcji rysującej, więc ponowne uruchomienie skryptu Streamlit z niezmienionymi
+danymi zwraca zapisane bajty bez budowania figury. Figury tworzone są bez
+pyplot (brak globalnego rejestru) i czyszczone zaraz po zapisie obrazu.
+Limit pamięci ustawia zmienna środowiskowa CHEMISTAPP_WYKRESY_MB.
+
+Długie serie (10⁵–10⁶ punktów) przed rysowaniem są przerzedzane
+(`przerzedz`) do budżetu punktów rzędu szerokości obrazu w pikselach;
+dopasowania liczone są zawsze na pełnych danych.
+"""
+import functools
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from obliczenia import profil
+
+LIMIT_DOMYSLNY_MB = 64
+STYL_DOMYSLNY = {"figsize": (6.4, 4.8), "dpi": 200, "format": "png"}
+BUDZET_PUNKTOW = 2000  # ~1,5 punktu na piksel szerokości domyślnej figury
+BUDZET_ZACHOWANYCH = 2000  # osobny budżet okna `zachowaj` w przerzedz (np. zakresu regresji)
+
+
+class PamiecWykresow:
+    """Ograniczona rozmiarem pamięć LRU obrazów (bajty PNG/SVG) z licznikami trafień."""
+
+    def __init__(self, limit_bajtow=LIMIT_DOMYSLNY_MB * 2**20):
+        self.limit_bajtow = limit_bajtow
+        self._wpisy = OrderedDict()
+        self._bajty = 0
+        self.trafienia = 0
+        self.chybienia = 0
+        # Sesje Streamlit działają w osobnych wątkach i współdzielą jedną pamięć
+        self._blokada = threading.Lock()
+
+    def pobierz(self, klucz):
+        with self._blokada:
+            obraz = self._wpisy.get(klucz)
+            if obraz is None:
+                self.chybienia += 1
+                return None
+            self._wpisy.move_to_end(klucz)
+            self.trafienia += 1
+            return obraz
+
+    def zapisz(self, klucz, obraz):
+        if len(obraz) > self.limit_bajtow:
+            return
+        with self._blokada:
+            poprzedni = self._wpisy.pop(klucz, None)
+            if poprzedni is not None:
+                self._bajty -= len(poprzedni)
+            self._wpisy[klucz] = obraz
+            self._bajty += len(obraz)
+            while self._bajty > self.limit_bajtow:
+                _, usuniety = self._wpisy.popitem(last=False)
+                self._bajty -= len(usuniety)
+
+    def statystyki(self):
+        """Liczba wpisów, zajęta pamięć i skuteczność pamięci od startu procesu."""
+        with self._blokada:
+            zapytania = self.trafienia + self.chybienia
+            return {
+                "wpisy": len(self._wpisy),
+                "bajty": self._bajty,
+                "limit_bajtow": self.limit_bajtow,
+                "trafienia": self.trafienia,
+                "chybienia": self.chybienia,
+                "wspolczynnik_trafien": self.trafienia / zapytania if zapytania else float("nan"),
+            }
+
+    def wyczysc(self):
+        with self._blokada:
+            self._wpisy.clear()
+            self._bajty = 0
+            self.trafienia = self.chybienia = 0
+
+
+@functools.lru_cache(maxsize=None)
+def domyslna_pamiec():
+    """Pamięć wspólna dla wszystkich sesji w procesie."""
+    limit_mb = float(os.environ.get("CHEMISTAPP_WYKRESY_MB", LIMIT_DOMYSLNY_MB))
+    return PamiecWykresow(int(limit_mb * 2**20))
+
+
+def _dodaj_do_skrotu(h, wartosc):
+    if hasattr(wartosc, "to_numpy"):
+        wartosc = wartosc.to_numpy()
+    if isinstance(wartosc, np.ndarray):
+        wartosc = np.ascontiguousarray(wartosc)
+        h.update(f"{wartosc.dtype.str}{wartosc.shape}".encode())
+        if wartosc.dtype.hasobject:
+            h.update(repr(wartosc.tolist()).encode())
+        else:
+            h.update(wartosc.data)
+    elif isinstance(wartosc, (list, tuple)):
+        h.update(f"[{len(wartosc)}".encode())
+        for element in wartosc:
+            _dodaj_do_skrotu(h, element)
+    else:
+        h.update(repr(wartosc).encode())
+    h.update(b"\0")
+
+
+def klucz_wykresu(rysuj, dane, parametry, styl):
+    """Skrót danych, parametrów, stylu i kodu funkcji rysującej."""
+    h = hashlib.blake2b(digest_size=20)
+    kod = rysuj.__code__
+    # Kod bajtowy zmienia się po edycji funkcji, więc stare obrazy nie są używane
+    h.update(f"{rysuj.__module__}.{rysuj.__qualname__}".encode())
+    h.update(kod.co_code)
+    h.update(repr(kod.co_consts).encode())
+    for wartosc in dane:
+        _dodaj_do_skrotu(h, wartosc)
+    for nazwa in sorted(parametry):
+        h.update(nazwa.encode())
+        _dodaj_do_skrotu(h, parametry[nazwa])
+    _dodaj_do_skrotu(h, sorted(styl.items()))
+    return h.hexdigest()
+
+
+def renderuj(rysuj, *dane, styl=None, pamiec=None, **parametry):
+    """Zwraca bajty obrazu wykresu rysowanego przez rysuj(ax, *dane, **parametry).
+
+    Funkcja rysująca wywoływana jest tylko wtedy, gdy obrazu nie ma w pamięci;
+    styl to słownik z kluczami figsize, dpi i format ("png" albo "svg").
+    """
+    with profil.etap("rysowanie", rysuj.__qualname__):
+        styl = {**STYL_DOMYSLNY, **(styl or {})}
+        pamiec = domyslna_pamiec() if pamiec is None else pamiec
+        klucz = klucz_wykresu(rysuj, dane, parametry, styl)
+        obraz = pamiec.pobierz(klucz)
+        profil.trafienie(obraz is not None)
+        if obraz is not None:
+            return obraz
+
+        from matplotlib.figure import Figure  # import matplotlib dopiero przy pierwszym rysowaniu
+
+        fig = Figure(figsize=styl["figsize"], dpi=styl["dpi"])
+        try:
+            ax = fig.subplots()
+            rysuj(ax, *dane, **parametry)
+            bufor = io.BytesIO()
+            fig.savefig(bufor, format=styl["format"], bbox_inches="tight")
+        finally:
+            fig.clear()
+        obraz = bufor.getvalue()
+        pamiec.zapisz(klucz, obraz)
+        return obraz
+
+
+def lttb(x, y, prog):
+    """Indeksy `prog` punktów wybranych algorytmem Largest-Triangle-Three-Buckets (x rosnące).
+
+    Pierwszy i ostatni punkt są zawsze zachowane, a z każdego kubełka
+    wybierany jest punkt tworzący największy trójkąt z punktem wybranym w
+    poprzednim kubełku i średnią następnego, więc kształt krzywej (także
+    pojedyncze piki) jest zachowany.
+    """
+    n = len(x)
+    if prog >= n or prog < 3:
+        return np.arange(n)
+    krawedzie = np.linspace(1, n - 1, prog - 1).astype(np.int64)
+    # Średnie kubełków z sum prefiksowych; ostatnim "następnym kubełkiem" jest ostatni punkt
+    sx = np.concatenate([[0.0], np.cumsum(x)])
+    sy = np.concatenate([[0.0], np.cumsum(y)])
+    poczatki = krawedzie[1:]
+    konce = np.append(krawedzie[2:], n)
+    srednie_x = (sx[konce] - sx[poczatki]) / (konce - poczatki)
+    srednie_y = (sy[konce] - sy[poczatki]) / (konce - poczatki)
+
+    wybrane = np.empty(prog, dtype=np.int64)
+    wybrane[0], wybrane[-1] = 0, n - 1
+    a = 0
+    for i in range(prog - 2):
+        od, do = krawedzie[i], krawedzie[i + 1]
+        xa, ya = x[a], y[a]
+        pole = np.abs((xa - srednie_x[i]) * (y[od:do] - ya) - (xa - x[od:do]) * (srednie_y[i] - ya))
+        a = od + int(np.argmax(pole))
+        wybrane[i + 1] = a
+    return wybrane
+
+
+def obwiednia_min_max(y, prog):
+    """Indeksy minimum i maksimum y w każdym z `prog // 2` kubełków kolejnych punktów (x rosnące)."""
+    n = len(y)
+    if prog >= n or prog < 2:
+        return np.arange(n)
+    rozmiar = -(-n // (prog // 2))
+    kubelki = -(-n // rozmiar)
+    Y = np.full(kubelki * rozmiar, np.nan)
+    Y[:n] = y
+    Y = Y.reshape(kubelki, rozmiar)
+    przesuniecia = np.arange(kubelki) * rozmiar
+    return np.unique(np.concatenate([przesuniecia + np.nanargmin(Y, axis=1),
+                                     przesuniecia + np.nanargmax(Y, axis=1)]))
+
+
+def przerzedz(x, y, prog=BUDZET_PUNKTOW, metoda="lttb", zachowaj=None, prog_zachowanych=BUDZET_ZACHOWANYCH):
+    """Indeksy punktów do narysowania (w kolejności rosnącego x) po przerzedzeniu do `prog` punktów.
+
+    `metoda` to "lttb" albo "min_max" (obwiednia, dla gęstych szumów).
+    Punkty z maską `zachowaj` (np. okno regresji) mają osobny budżet
+    `prog_zachowanych`: krótkie okno jest rysowane w pełnej rozdzielczości,
+    a dłuższe przerzedzane niezależnie od reszty, więc żadna część nie
+    przekracza swojego budżetu. Punkty z NaN są pomijane.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    kolejnosc = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if np.any(np.diff(x[kolejnosc]) < 0):
+        kolejnosc = kolejnosc[np.argsort(x[kolejnosc], kind="stable")]
+    if len(kolejnosc) <= prog:
+        return kolejnosc
+    if metoda not in ("lttb", "min_max"):
+        raise ValueError(f"Nieznana metoda przerzedzania: {metoda}")
+
+    def wybierz(indeksy, budzet):
+        if metoda == "lttb":
+            return indeksy[lttb(x[indeksy], y[indeksy], budzet)]
+        return indeksy[obwiednia_min_max(y[indeksy], budzet)]
+
+    if zachowaj is None:
+        return wybierz(kolejnosc, prog)
+    w_oknie = np.asarray(zachowaj, dtype=bool)[kolejnosc]
+    indeksy = np.concatenate([wybierz(kolejnosc[w_oknie], prog_zachowanych), wybierz(kolejnosc[~w_oknie], prog)])
+    return indeksy[np.argsort(x[indeksy], kind="stable")]
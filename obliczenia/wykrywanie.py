@@ -0,0 +1,145 @@
+"""Wykrywanie formatu plików tekstowych (CSV/TXT) i wczytywanie ich silnikiem C pandas.
+
+Kodowanie (z BOM), separator, znak dziesiętny i nagłówek ustalane są z
+pierwszych ROZMIAR_PROBKI bajtów, a nie z całego pliku jak przy
+`sep=None, engine="python"`. Plik czytany jest potem jednym wywołaniem
+`read_csv(engine="c")` z jawnymi typami kolumn, więc liczby z przecinkiem
+dziesiętnym nie wymagają zamiany tekstu po wczytaniu, a puste kolumny bez
+nagłówka (końcowe `;;;;` eksportów wagi) są pomijane już przy czytaniu.
+"""
+import codecs
+import csv
+import os
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+from obliczenia import profil
+
+ROZMIAR_PROBKI = 64 * 1024
+WIERSZE_PROBKI = 50
+SEPARATORY = ("\t", ";", "|", ",")  # kolejność rozstrzyga remisy
+KODOWANIE_ZASTEPCZE = "cp1250"  # eksporty przyrządów z polskiego Windows
+_BOM = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+_LICZBA_KROPKA = re.compile(r"[+-]?(\d+\.\d*|\.\d+)([eE][+-]?\d+)?")
+_LICZBA_PRZECINEK = re.compile(r"[+-]?(\d+,\d*|,\d+)([eE][+-]?\d+)?")
+_LICZBA = re.compile(r"[+-]?(\d+([.,]\d*)?|[.,]\d+)([eE][+-]?\d+)?|[+-]?(nan|inf)", re.IGNORECASE)
+# Komunikaty read_csv o wartościach niezgodnych z zadanym dtype (inne ValueError są przekazywane dalej)
+_BLAD_TYPU = re.compile(r"could not convert|Unable to parse|cannot safely convert|column has NA values")
+
+FormatPliku = namedtuple("FormatPliku", ["kodowanie", "separator", "dziesietny", "naglowek", "kolumny"])
+FormatPliku.__doc__ = ("Kodowanie (nazwa dla pandas), separator, znak dziesiętny, czy pierwszy wiersz "
+                       "jest nagłówkiem oraz nazwy kolumn z nagłówka.")
+
+
+def _dekoduj(probka):
+    # Zwraca (kodowanie, tekst próbki); próbka może kończyć się w połowie znaku UTF-8
+    for bom, kodowanie in _BOM:
+        if probka.startswith(bom):
+            return kodowanie, probka.decode(kodowanie, errors="ignore")
+    try:
+        return "utf-8", probka.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start >= len(probka) - 3 and e.reason == "unexpected end of data":
+            return "utf-8", probka[:e.start].decode("utf-8")
+    return KODOWANIE_ZASTEPCZE, probka.decode(KODOWANIE_ZASTEPCZE, errors="replace")
+
+
+def _separator(linie):
+    # Separator z najbardziej stałą (i największą) liczbą wystąpień w wierszach
+    najlepszy, ocena_najlepsza = ",", (0.0, 0)
+    for separator in SEPARATORY:
+        liczby = [linia.count(separator) for linia in linie]
+        moda = max(set(liczby), key=liczby.count)
+        if moda == 0:
+            continue
+        ocena = (liczby.count(moda) / len(liczby), moda)
+        if ocena > ocena_najlepsza:
+            najlepszy, ocena_najlepsza = separator, ocena
+    return najlepszy
+
+
+def wykryj_format(probka):
+    """FormatPliku na podstawie początkowych bajtów pliku (wystarczy kilka KB)."""
+    kodowanie, tekst = _dekoduj(probka)
+    linie = tekst.splitlines()
+    if len(probka) >= ROZMIAR_PROBKI and len(linie) > 1:
+        linie = linie[:-1]  # ostatni wiersz próbki może być ucięty
+    linie = [linia for linia in linie if linia.strip()][:WIERSZE_PROBKI]
+    if not linie:
+        return FormatPliku(kodowanie, ",", ".", False, [])
+
+    separator = _separator(linie)
+    wiersze = list(csv.reader(linie, delimiter=separator))
+    naglowek = not all(_LICZBA.fullmatch(pole.strip()) or not pole.strip() for pole in wiersze[0])
+
+    dziesietny = "."
+    if separator != ",":
+        pola = [pole.strip() for wiersz in wiersze[int(naglowek):] for pole in wiersz]
+        przecinki = sum(bool(_LICZBA_PRZECINEK.fullmatch(pole)) for pole in pola)
+        kropki = sum(bool(_LICZBA_KROPKA.fullmatch(pole)) for pole in pola)
+        if przecinki > kropki:
+            dziesietny = ","
+    return FormatPliku(kodowanie, separator, dziesietny, naglowek, wiersze[0] if naglowek else [])
+
+
+def _probka(plik):
+    if isinstance(plik, (str, os.PathLike)):
+        with open(plik, "rb") as f:
+            return f.read(ROZMIAR_PROBKI)
+    pozycja = plik.tell()
+    probka = plik.read(ROZMIAR_PROBKI)
+    plik.seek(pozycja)
+    return probka
+
+
+def _funkcja(typy):
+    # Typy (float, np.float64) też są wywoływalne – funkcją jest tylko to, co nie jest typem
+    return callable(typy) and not isinstance(typy, type)
+
+
+def _typ(typy, nazwa):
+    if isinstance(typy, dict):
+        return typy.get(nazwa)
+    return typy(nazwa) if _funkcja(typy) else typy
+
+
+@profil.mierzony("wczytywanie")
+def wczytaj_tabele(plik, kolumny=None, typy=None):
+    """Wczytuje plik tekstowy (ścieżka lub obiekt plikowy w trybie binarnym) z wykrytym formatem.
+
+    `kolumny` to funkcja nazwa -> bool wybierająca kolumny; bez niej
+    pomijane są tylko kolumny bez nazwy. `typy` to typ dla wszystkich
+    wybranych kolumn, słownik {nazwa: typ} albo funkcja nazwa -> typ
+    (brak typu = wnioskowany przez pandas). Gdy kolumna z typem
+    liczbowym zawiera tekst, plik jest czytany ponownie z typami
+    wnioskowanymi. Niepoprawne bajty zastępowane są znakiem U+FFFD tylko
+    przy kodowaniu zastępczym; w UTF-8 zgłaszany jest UnicodeDecodeError.
+    Nazwy kolumn zwracane są bez otaczających spacji.
+    """
+    fmt = wykryj_format(_probka(plik))
+    uzyte, dtype = None, None
+    if fmt.naglowek:
+        uzyte = [nazwa for nazwa in fmt.kolumny if nazwa.strip() and (kolumny is None or kolumny(nazwa.strip()))]
+        if typy is not None:
+            dtype = {nazwa: _typ(typy, nazwa.strip()) for nazwa in uzyte}
+            dtype = {nazwa: typ for nazwa, typ in dtype.items() if typ is not None}
+    elif typy is not None and not isinstance(typy, dict) and not _funkcja(typy):
+        dtype = typy
+
+    parametry = dict(sep=fmt.separator, decimal=fmt.dziesietny, encoding=fmt.kodowanie,
+                     encoding_errors="replace" if fmt.kodowanie == KODOWANIE_ZASTEPCZE else "strict",
+                     header=0 if fmt.naglowek else None, usecols=uzyte, engine="c")
+    if hasattr(plik, "seek"):
+        pozycja = plik.tell()
+    try:
+        df = pd.read_csv(plik, dtype=dtype, **parametry)
+    except ValueError as e:
+        if not dtype or not _BLAD_TYPU.search(str(e)):
+            raise
+        if hasattr(plik, "seek"):
+            plik.seek(pozycja)
+        df = pd.read_csv(plik, **parametry)
+    df.columns = [str(col).strip() for col in df.columns]
+    return df
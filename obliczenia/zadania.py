@@ -0,0 +1,255 @@
+"""Wspólna pula procesów dla długich obliczeń zlecanych przez sesje Streamlit.
+
+Strona zgłasza zadanie (funkcję i listę jej wywołań) i od razu wraca, a
+potem odpytuje jego stan. Obliczenia trwają w puli procesów wspólnej dla
+całego serwera, więc nie blokują wątku skryptu ani nie rywalizują o GIL z
+innymi sesjami. Identyczne zadania (skrót funkcji i danych) są liczone raz:
+kolejne zgłoszenia dołączają do trwającego albo dostają gotowy wynik.
+Każdy użytkownik ma w puli naraz co najwyżej `na_uzytkownika` wywołań
+(domyślnie połowę procesów), a reszta czeka w jego kolejce, dzięki czemu
+duża partia jednej osoby nie zajmuje wszystkich rdzeni. Rozmiar puli i ten limit ustawiają zmienne
+środowiskowe CHEMISTAPP_PROCESY i CHEMISTAPP_PROCESY_NA_UZYTKOWNIKA.
+"""
+import functools
+import hashlib
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from obliczenia.pamiec import bez_zapisu
+
+ZADANIA_NA_UZYTKOWNIKA = 4  # niezakończone zadania jednego użytkownika
+PAMIETANE_WYNIKI = 32  # ukończone zadania trzymane do ponownego użycia
+
+StanZadania = namedtuple("StanZadania", ["stan", "gotowe", "wszystkie", "wynik", "blad"])
+StanZadania.__doc__ = ("Stan zadania: 'czeka', 'trwa', 'gotowe' albo 'blad'; liczba ukończonych i wszystkich "
+                       "wywołań, wynik (po ukończeniu) i opis błędu.")
+
+
+class LimitZadan(RuntimeError):
+    """Użytkownik ma już ZADANIA_NA_UZYTKOWNIKA niezakończonych zadań."""
+
+
+class _Zadanie:
+    def __init__(self, uzytkownik, funkcja, wywolania, zloz, limit_czasu):
+        self.uzytkownik = uzytkownik
+        self.funkcja = funkcja
+        self.zloz = zloz
+        self.wyniki = [None] * len(wywolania)
+        self.ukonczone = [False] * len(wywolania)
+        self.wszystkie = len(wywolania)
+        self.gotowe = 0
+        self.w_puli = {}  # indeks -> Future
+        self.termin = None if limit_czasu is None else time.monotonic() + limit_czasu
+        self.zakonczone = False
+        self.koniec = threading.Event()
+        self.wynik = None
+        self.blad = ""
+
+
+class PulaZadan:
+    """Pula procesów z deduplikacją zadań i limitem równoległych wywołań na użytkownika.
+
+    Użytkownikiem jest dowolny hashowalny identyfikator (np. identyfikator
+    sesji Streamlit).
+    """
+
+    def __init__(self, procesy=None, na_uzytkownika=None):
+        self.procesy = procesy or os.cpu_count() or 1
+        self.na_uzytkownika = na_uzytkownika or max(1, self.procesy // 2)
+        self._wykonawca = None
+        self._zadania = OrderedDict()  # klucz -> _Zadanie
+        self._kolejki = {}  # uzytkownik -> deque[(klucz, indeks, wywołanie)]
+        self._w_toku = {}  # uzytkownik -> liczba wywołań w puli
+        self._do_zlozenia = []  # (zadanie, wyniki) czekające na funkcję składającą
+        # Sesje Streamlit i wątek zwrotny puli korzystają z jednego stanu
+        self._blokada = threading.RLock()
+
+    @staticmethod
+    def klucz(funkcja, wywolania, zloz=None, limit_czasu=None):
+        """Skrót funkcji, danych wszystkich wywołań, funkcji składającej i limitu czasu."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{funkcja.__module__}.{funkcja.__qualname__}".encode())
+        h.update(pickle.dumps((wywolania, zloz, limit_czasu), protocol=pickle.HIGHEST_PROTOCOL))
+        return h.hexdigest()
+
+    def zglos(self, uzytkownik, funkcja, wywolania, zloz=None, limit_czasu=None):
+        """Zgłasza `funkcja(w)` dla każdego `w` z `wywolania` i zwraca klucz zadania.
+
+        Po ukończeniu wszystkich wywołań wynikiem jest `zloz(lista wyników)`
+        (bez `zloz` sama lista). Po `limit_czasu` sekundach niezaczęte
+        wywołania są porzucane, a `zloz` dostaje wyniki ukończonych. `funkcja`
+        i `zloz` muszą być zdefiniowane na poziomie modułu (albo być
+        functools.partial takich funkcji). Zadanie identyczne z trwającym lub
+        niedawno ukończonym nie jest liczone ponownie; nowe zadanie ponad
+        limit niezakończonych zadań użytkownika zgłasza LimitZadan.
+        """
+        wywolania = list(wywolania)
+        klucz = self.klucz(funkcja, wywolania, zloz, limit_czasu)
+        with self._blokada:
+            istniejace = self._zadania.get(klucz)
+            if istniejace is not None and not istniejace.blad:
+                self._zadania.move_to_end(klucz)
+                return klucz
+            trwajace = sum(1 for z in self._zadania.values() if z.uzytkownik == uzytkownik and not z.zakonczone)
+            if trwajace >= ZADANIA_NA_UZYTKOWNIKA:
+                raise LimitZadan(f"Trwa już {trwajace} zadań tego użytkownika – poczekaj na ich zakończenie.")
+
+            self._zadania[klucz] = _Zadanie(uzytkownik, funkcja, wywolania, zloz, limit_czasu)
+            kolejka = self._kolejki.setdefault(uzytkownik, deque())
+            kolejka.extend((klucz, i, w) for i, w in enumerate(wywolania))
+            if not wywolania:
+                self._zakoncz(klucz)
+            self._uruchom(uzytkownik)
+            self._przytnij()
+        self._zloz()
+        return klucz
+
+    def stan(self, klucz):
+        """StanZadania dla klucza albo None, gdy zadanie jest nieznane (np. usunięte z pamięci)."""
+        with self._blokada:
+            zadanie = self._zadania.get(klucz)
+            if zadanie is None:
+                return None
+            if not zadanie.zakonczone and zadanie.termin is not None and time.monotonic() > zadanie.termin:
+                self._zakoncz(klucz)
+        self._zloz()
+        with self._blokada:
+            if zadanie.blad:
+                stan = "blad"
+            elif zadanie.koniec.is_set():
+                stan = "gotowe"
+            else:
+                stan = "trwa" if zadanie.w_puli or zadanie.gotowe else "czeka"
+            return StanZadania(stan, zadanie.gotowe, zadanie.wszystkie, zadanie.wynik, zadanie.blad)
+
+    def czekaj(self, klucz, limit_czasu):
+        """Czeka najwyżej `limit_czasu` sekund na zakończenie zadania i zwraca jego stan.
+
+        Krótkie zadania kończą się w tym czasie, więc strona nie musi ich odpytywać.
+        """
+        with self._blokada:
+            zadanie = self._zadania.get(klucz)
+        if zadanie is not None:
+            if zadanie.termin is not None:
+                limit_czasu = min(limit_czasu, max(zadanie.termin - time.monotonic(), 0))
+            zadanie.koniec.wait(limit_czasu)
+        return self.stan(klucz)
+
+    def anuluj(self, klucz):
+        """Porzuca niezaczęte wywołania zadania i usuwa je z pamięci."""
+        with self._blokada:
+            zadanie = self._zadania.pop(klucz, None)
+            if zadanie is not None and not zadanie.zakonczone:
+                self._porzuc(klucz, zadanie)
+                zadanie.koniec.set()
+
+    def _pula(self):
+        if self._wykonawca is None:
+            # Serwer Streamlit jest wielowątkowy: procesy z fork dziedziczyłyby zajęte blokady
+            metoda = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            # Zadania puli to analizy wsadowe: czytają pamięć dyskową, ale jej nie zapełniają
+            self._wykonawca = ProcessPoolExecutor(max_workers=self.procesy, initializer=bez_zapisu,
+                                                  mp_context=multiprocessing.get_context(metoda))
+        return self._wykonawca
+
+    def _porzuc_pule(self):
+        # Zepsuta pula jest zamykana (bez czekania), a kolejne zadania dostaną nową
+        if self._wykonawca is not None:
+            self._wykonawca.shutdown(wait=False, cancel_futures=True)
+            self._wykonawca = None
+
+    def _uruchom(self, uzytkownik):
+        # Przekazuje do puli kolejne wywołania użytkownika, dopóki nie osiągnie limitu
+        kolejka = self._kolejki.get(uzytkownik)
+        while kolejka and self._w_toku.get(uzytkownik, 0) < self.na_uzytkownika:
+            klucz, indeks, wywolanie = kolejka.popleft()
+            zadanie = self._zadania.get(klucz)
+            if zadanie is None or zadanie.zakonczone:
+                continue
+            try:
+                przyszly = self._pula().submit(zadanie.funkcja, wywolanie)
+            except (BrokenProcessPool, RuntimeError):
+                # Proces puli zginął (np. brak pamięci) albo serwer się zamyka – nowa pula dla kolejnych zadań
+                self._porzuc_pule()
+                zadanie.blad = "Pula procesów została przerwana."
+                self._zakoncz(klucz)
+                continue
+            zadanie.w_puli[indeks] = przyszly
+            self._w_toku[uzytkownik] = self._w_toku.get(uzytkownik, 0) + 1
+            przyszly.add_done_callback(functools.partial(self._ukonczono, klucz, zadanie, indeks))
+
+    def _ukonczono(self, klucz, zadanie, indeks, przyszly):
+        with self._blokada:
+            zadanie.w_puli.pop(indeks, None)
+            self._w_toku[zadanie.uzytkownik] -= 1
+            if not zadanie.zakonczone and not przyszly.cancelled():
+                blad = przyszly.exception()
+                if blad is not None:
+                    if isinstance(blad, BrokenProcessPool):
+                        self._porzuc_pule()
+                    zadanie.blad = f"{type(blad).__name__}: {blad}"
+                    self._zakoncz(klucz)
+                else:
+                    zadanie.wyniki[indeks] = przyszly.result()
+                    zadanie.ukonczone[indeks] = True
+                    zadanie.gotowe += 1
+                    if zadanie.gotowe == zadanie.wszystkie or (
+                            zadanie.termin is not None and time.monotonic() > zadanie.termin):
+                        self._zakoncz(klucz)
+            self._uruchom(zadanie.uzytkownik)
+        self._zloz()
+
+    def _zakoncz(self, klucz):
+        # Zwalnia resztę kolejki i odkłada wyniki ukończonych wywołań do złożenia poza blokadą
+        zadanie = self._zadania[klucz]
+        self._porzuc(klucz, zadanie)
+        if zadanie.blad:
+            zadanie.koniec.set()
+        else:
+            self._do_zlozenia.append((zadanie, [w for w, ok in zip(zadanie.wyniki, zadanie.ukonczone) if ok]))
+        zadanie.wyniki = zadanie.ukonczone = None
+
+    def _zloz(self):
+        # Funkcja składająca może liczyć długo, więc nie zatrzymuje na ten czas innych sesji ani wątku puli
+        with self._blokada:
+            do_zlozenia, self._do_zlozenia = self._do_zlozenia, []
+        for zadanie, wyniki in do_zlozenia:
+            try:
+                wynik, blad = (zadanie.zloz(wyniki) if zadanie.zloz else wyniki), ""
+            except Exception as e:
+                wynik, blad = None, f"{type(e).__name__}: {e}"
+            with self._blokada:
+                zadanie.wynik, zadanie.blad = wynik, blad
+            zadanie.koniec.set()
+
+    def _porzuc(self, klucz, zadanie):
+        zadanie.zakonczone = True
+        for przyszly in list(zadanie.w_puli.values()):
+            przyszly.cancel()
+        kolejka = self._kolejki.get(zadanie.uzytkownik)
+        if kolejka:
+            self._kolejki[zadanie.uzytkownik] = deque(w for w in kolejka if w[0] != klucz)
+
+    def _przytnij(self):
+        # Usuwa najdawniej używane ukończone zadania ponad PAMIETANE_WYNIKI
+        ukonczone = [k for k, z in self._zadania.items() if z.zakonczone]
+        for klucz in ukonczone[:max(len(ukonczone) - PAMIETANE_WYNIKI, 0)]:
+            del self._zadania[klucz]
+
+    def zamknij(self):
+        with self._blokada:
+            self._porzuc_pule()
+
+
+@functools.lru_cache(maxsize=None)
+def domyslna_pula():
+    """Pula wspólna dla wszystkich sesji w procesie serwera."""
+    procesy = int(os.environ.get("CHEMISTAPP_PROCESY", 0)) or None
+    na_uzytkownika = int(os.environ.get("CHEMISTAPP_PROCESY_NA_UZYTKOWNIKA", 0)) or None
+    return PulaZadan(procesy, na_uzytkownika)
@@ -0,0 +1,293 @@
+"""Kąt zwilżania metodą Washburna: dopasowanie masa² od czasu i wyznaczanie θ.
+
+Moduł można uruchomić wsadowo dla katalogu pomiarów:
+
+    python -m obliczenia.zwilzanie data/katy_zwilzania -B 0.000001 -o katy.csv
+
+Z `-o katy.zip` (lub katalogiem) zapisywany jest pakiet analizy z surowymi
+danymi wszystkich plików (zob. obliczenia.eksport). Archiwa .zip z pomiarami
+czytane są bez rozpakowywania (zob. obliczenia.archiwum).
+"""
+import argparse
+import io
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from obliczenia import profil
+from obliczenia.archiwum import ZWILZANIE, rozpakuj
+from obliczenia.eksport import zapisz_wyniki_wsadowe
+from obliczenia.pamiec import bez_zapisu, z_pamiecia
+from obliczenia.wsadowe import mapuj_rownolegle, rozwin_wzorce
+from obliczenia.wykrywanie import wczytaj_tabele
+
+# Parametry cieczy w 20–25 °C: η [mPa·s], ρ [g/cm³], γ [mN/m]
+PRESETY_CIECZY = {
+    "woda": {"eta": 1.0, "rho": 0.998, "gamma": 72.8},
+    "dijodometan": {"eta": 2.76, "rho": 3.325, "gamma": 50.8},
+    "formamid": {"eta": 3.34, "rho": 1.133, "gamma": 58.2},
+    "glicerol": {"eta": 1412.0, "rho": 1.261, "gamma": 63.4},
+    "etanodiol": {"eta": 16.1, "rho": 1.113, "gamma": 48.3},
+    "etanol": {"eta": 1.07, "rho": 0.789, "gamma": 22.4},
+    "heksan": {"eta": 0.30, "rho": 0.655, "gamma": 18.4},
+}
+# Nazwy cieczy spotykane w nazwach plików (także z literówkami) -> klucz presetu
+ALIASY_CIECZY = {
+    "diodometan": "dijodometan",
+    "dijodometan": "dijodometan",
+    "formamid": "formamid",
+    "glicerol": "glicerol",
+    "woda": "woda",
+    "etanodiol": "etanodiol",
+    "glikol": "etanodiol",
+    "etanol": "etanol",
+    "heksan": "heksan",
+}
+KOLUMNY = {
+    'Time [s]': 'time',
+    'Mass [g]': 'mass',
+    'Mass² [g²]': 'masa^2',
+    'CA mean [°]': 'kat',
+}
+KOLUMNY_DANYCH = ["time", "mass", "masa^2", "kat"]
+KOLUMNY_WYNIKOW = ["plik", "ciecz", "metoda", "punkty", "slope", "A", "cos_theta", "theta", "blad"]
+
+
+def kat_zwilzania(slope, eta, rho, gamma, B):
+    """Zwraca (A, cos θ, θ [°]) dla nachylenia masa² od czasu; η [Pa·s], γ [N/m]."""
+    A = 1 / slope if slope != 0 else np.nan
+    denominator = B * (rho**2) * gamma * A
+    cos_theta = eta / denominator if denominator != 0 else np.nan
+    cos_theta = float(np.clip(cos_theta, -1, 1))
+    theta = math.degrees(math.acos(cos_theta)) if not np.isnan(cos_theta) else np.nan
+    return A, cos_theta, theta
+
+
+@profil.mierzony("dopasowanie")
+def okna_liniowe(x, y, min_punktow=5, max_granic=400, waga_dlugosci=0.25):
+    """Dopasowuje prostą do wszystkich ciągłych okien danych posortowanych wg x.
+
+    Sumy x, y, xy, x², y² liczone są raz jako sumy prefiksowe, więc każde okno
+    kosztuje O(1). Dla długich serii granice okien są rozrzedzane do
+    `max_granic` równomiernie rozłożonych indeksów. Kolumna `ocena` = R²·(n/N)^waga
+    równoważy jakość dopasowania z długością okna.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x) & np.isfinite(y)
+    kolejnosc = np.argsort(x[ok], kind="stable")
+    x, y = x[ok][kolejnosc], y[ok][kolejnosc]
+    N = len(x)
+
+    # Centrowanie ogranicza utratę precyzji przy odejmowaniu sum prefiksowych
+    dx, dy = x - x.mean(), y - y.mean()
+    S = np.zeros((5, N + 1))
+    np.cumsum(np.vstack([dx, dy, dx * dx, dx * dy, dy * dy]), axis=1, out=S[:, 1:])
+
+    granice = np.unique(np.linspace(0, N, min(N, max_granic) + 1).round().astype(int))
+    i, j = np.meshgrid(granice, granice, indexing="ij")
+    poprawne = (j - i) >= max(min_punktow, 2)
+    i, j = i[poprawne], j[poprawne]
+
+    n = (j - i).astype(np.float64)
+    sx, sy, sxx, sxy, syy = (S[:, j] - S[:, i])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cxx = sxx - sx * sx / n
+        cxy = sxy - sx * sy / n
+        cyy = syy - sy * sy / n
+        a = cxy / cxx
+        b = (sy / n + y.mean()) - a * (sx / n + x.mean())
+        r2 = np.where(cyy > 0, cxy * cxy / (cxx * cyy), np.nan)
+    ocena = r2 * (n / N) ** waga_dlugosci
+
+    return pd.DataFrame({
+        "od": i,
+        "do": j,
+        "t_od": x[i],
+        "t_do": x[j - 1],
+        "punkty": j - i,
+        "a": a,
+        "b": b,
+        "r2": r2,
+        "ocena": ocena,
+    })
+
+
+def najlepsze_okno(x, y, **kwargs):
+    """Zwraca (tabela wszystkich okien, wiersz okna o najwyższej ocenie lub None)."""
+    tabela = okna_liniowe(x, y, **kwargs)
+    if tabela.empty or tabela["ocena"].isna().all():
+        return tabela, None
+    return tabela, tabela.loc[tabela["ocena"].idxmax()]
+
+
+def rozpoznaj_ciecz(nazwa_pliku):
+    """Zwraca klucz presetu cieczy rozpoznany w nazwie pliku lub None."""
+    nazwa = os.path.basename(str(nazwa_pliku)).lower()
+    for alias in sorted(ALIASY_CIECZY, key=len, reverse=True):
+        if alias in nazwa:
+            return ALIASY_CIECZY[alias]
+    return None
+
+
+@z_pamiecia(wersja=2)
+def wczytaj_plik(plik, nazwa=None):
+    """Wczytuje plik XLS/XLSX lub CSV z pomiarem zwilżania.
+
+    Format CSV (BOM, separator, przecinek dziesiętny) wykrywany jest z
+    początku pliku, a znane kolumny pomiarowe czytane od razu jako liczby.
+    """
+    nazwa = nazwa or getattr(plik, "name", str(plik))
+    if nazwa.endswith(('.xls', '.xlsx')):
+        return pd.read_excel(plik)
+    if nazwa.endswith('.csv'):
+        return wczytaj_tabele(plik, typy=dict.fromkeys(KOLUMNY, np.float64))
+    raise ValueError("Nieobsługiwany format pliku. Proszę załadować plik CSV lub XLS.")
+
+
+def przygotuj_dane(df):
+    """Ujednolica nazwy kolumn (time, mass, masa^2, kat) i zamienia je na liczby.
+
+    Kolumny wczytane już jako liczby (CSV przez wczytaj_plik) nie są
+    przepisywane; tekst z przecinkami poprawiany jest tylko w pozostałych
+    (np. arkusze XLS z czasem zapisanym jako tekst).
+    """
+    df = df.copy()
+    df.columns = [str(col).strip() for col in df.columns]
+    df.rename(columns={k: v for k, v in KOLUMNY.items() if k in df.columns}, inplace=True)
+    for col in KOLUMNY_DANYCH:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '.'), errors='coerce')
+    if 'masa^2' not in df.columns and 'mass' in df.columns:
+        df['masa^2'] = df['mass'] ** 2
+    return df
+
+
+def analizuj_plik(plik, B, parametry=None, nazwa=None):
+    """Wyznacza θ dla jednego pliku.
+
+    Pliki z masą w czasie liczone są metodą Washburna na najlepszym oknie
+    liniowym z parametrami cieczy z `parametry` (domyślnie PRESETY_CIECZY),
+    a pliki goniometru z kolumną 'CA mean [°]' dają średni zmierzony kąt.
+    `nazwa` (np. "archiwum.zip/plik.xls") trafia do wyniku bez zmian.
+    """
+    nazwa = nazwa or os.path.basename(str(plik))
+    ciecz = rozpoznaj_ciecz(nazwa)
+    df = przygotuj_dane(wczytaj_plik(plik, nazwa))
+    wynik = {"plik": nazwa, "ciecz": ciecz, "blad": ""}
+
+    if 'kat' in df.columns:
+        katy = df['kat'].dropna()
+        if katy.empty:
+            raise ValueError("Plik nie zawiera zmierzonych kątów.")
+        theta = float(katy.mean())
+        wynik.update(metoda="goniometr", punkty=len(katy), theta=theta,
+                     cos_theta=math.cos(math.radians(theta)))
+        return wynik
+
+    if 'time' not in df.columns or 'masa^2' not in df.columns:
+        raise ValueError("Brak kolumn 'time' i 'masa^2' (lub 'mass').")
+    parametry = parametry or PRESETY_CIECZY
+    if ciecz not in parametry:
+        raise ValueError(f"Nie rozpoznano cieczy w nazwie pliku '{nazwa}'.")
+    p = parametry[ciecz]
+
+    _, okno = najlepsze_okno(df['time'], df['masa^2'])
+    if okno is None:
+        raise ValueError("Za mało punktów do regresji.")
+    A, cos_theta, theta = kat_zwilzania(okno['a'], p["eta"] / 1000, p["rho"], p["gamma"] / 1000, B)
+    wynik.update(metoda="Washburn", punkty=int(okno['punkty']), slope=okno['a'], A=A,
+                 cos_theta=cos_theta, theta=theta)
+    return wynik
+
+
+def _analizuj_bezpiecznie(zadanie):
+    # Błąd jednego pliku nie może przerwać całej partii
+    nazwa, zrodlo, B, parametry = zadanie
+    try:
+        plik = io.BytesIO(zrodlo) if isinstance(zrodlo, bytes) else zrodlo
+        return analizuj_plik(plik, B, parametry, nazwa)
+    except Exception as e:
+        return {"plik": nazwa, "ciecz": rozpoznaj_ciecz(nazwa), "blad": f"{type(e).__name__}: {e}"}
+
+
+def zadania_plikow(pliki, B, parametry=None):
+    """Zadania dla `_analizuj_bezpiecznie`, po jednym na plik (ścieżkę lub parę (nazwa, bajty))."""
+    zadania = []
+    for plik in pliki:
+        nazwa, zrodlo = plik if isinstance(plik, tuple) else (os.path.basename(plik), plik)
+        zadania.append((nazwa, zrodlo, B, parametry))
+    return zadania
+
+
+def tabela_wynikow(wyniki):
+    """Tabela KOLUMNY_WYNIKOW z wyników `_analizuj_bezpiecznie`."""
+    # Wiersze błędów nie mają liczby punktów – Int64 zamiast zamiany kolumny na float
+    return pd.DataFrame(wyniki, columns=KOLUMNY_WYNIKOW).astype({"punkty": "Int64"})
+
+
+def zglos_analize_plikow(pula, uzytkownik, pliki, B, parametry=None):
+    """Zgłasza analizę plików do puli obliczeń (obliczenia.zadania); wynikiem zadania jest tabela_wynikow."""
+    return pula.zglos(uzytkownik, _analizuj_bezpiecznie, zadania_plikow(pliki, B, parametry), tabela_wynikow)
+
+
+def analizuj_pliki(pliki, B, parametry=None, procesy=None):
+    """Analizuje pliki (ścieżki lub pary (nazwa, bajty)) równolegle w puli procesów."""
+    return tabela_wynikow(mapuj_rownolegle(_analizuj_bezpiecznie, zadania_plikow(pliki, B, parametry), procesy))
+
+
+def podsumuj(wyniki):
+    """Średni kąt θ ± odchylenie standardowe i liczba plików dla każdej cieczy."""
+    poprawne = wyniki[wyniki["blad"] == ""]
+    return (poprawne.groupby("ciecz", dropna=False)["theta"]
+            .agg(theta_srednia="mean", theta_odchylenie="std", pliki="count")
+            .reset_index())
+
+
+def punkty_energii(wyniki):
+    """Punkty dla energii powierzchniowej (ciecz, theta, gamma): średni θ każdej rozpoznanej cieczy."""
+    srednie = podsumuj(wyniki).dropna(subset=["ciecz", "theta_srednia"])
+    return pd.DataFrame({
+        "ciecz": srednie["ciecz"].str.capitalize(),  # pisownia tabeli CIECZE, z której uzupełniane są γᵈ i γᵖ
+        "theta": srednie["theta_srednia"],
+        "gamma": [PRESETY_CIECZY[ciecz]["gamma"] for ciecz in srednie["ciecz"]],
+    })
+
+
+def dane_plikow(pliki, wyniki):
+    """Ujednolicone surowe dane (KOLUMNY_DANYCH) poprawnie przeanalizowanych plików, wczytywane po jednym."""
+    for plik, blad in zip(pliki, wyniki["blad"]):
+        if blad == "":
+            nazwa, zrodlo = plik if isinstance(plik, tuple) else (os.path.basename(plik), plik)
+            zrodlo = io.BytesIO(zrodlo) if isinstance(zrodlo, bytes) else zrodlo
+            df = przygotuj_dane(wczytaj_plik(zrodlo, nazwa)).reindex(columns=KOLUMNY_DANYCH)
+            df.insert(0, "plik", nazwa)
+            yield df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowe wyznaczanie kąta zwilżania dla katalogu pomiarów.")
+    parser.add_argument("wzorce", nargs="+", help="Pliki, archiwa .zip, katalogi lub wzorce glob, np. 'dane/*.xls'")
+    parser.add_argument("-B", type=float, default=0.000001, help="Stała materiałowa B")
+    parser.add_argument("-o", "--wyjscie", default="wyniki_zwilzania.csv",
+                        help="Plik CSV z wynikami albo pakiet .zip/katalog z wynikami i danymi")
+    parser.add_argument("-p", "--procesy", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args(argv)
+    bez_zapisu()  # jednorazowe pliki analizy wsadowej nie wypierają wpisów aplikacji
+
+    pliki, _ = rozpakuj(rozwin_wzorce(args.wzorce), ZWILZANIE)
+    if not pliki:
+        print("Nie znaleziono plików pasujących do podanych wzorców.", file=sys.stderr)
+        return 1
+
+    wyniki = analizuj_pliki(pliki, args.B, procesy=args.procesy)
+    zapisz_wyniki_wsadowe(args.wyjscie, "zwilzanie", wyniki, dane_plikow(pliki, wyniki), {"B": args.B})
+    print(podsumuj(wyniki).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,150 +1,397 @@
 import streamlit as st
 
+from interfejs import panel_wydajnosci, pomoc_pakietu, uzytkownik
+
 @st.cache_data
 def load_data(file):
-    import pandas as pd
-    import numpy as np
+    from obliczenia.kinetyka import wczytaj_plik
+
+    return wczytaj_plik(file)
+
+@st.cache_data(show_spinner="Wczytywanie archiwum…")
+def wczytaj_archiwum(dane):
+    """Pliki tensjometru z archiwum .zip (bez rozpakowywania), parsowane równolegle we wspólnej puli procesów."""
+    from obliczenia.archiwum import KINETYKA, zglos_wczytanie_archiwum
+    from obliczenia.zadania import domyslna_pula
+
+    pula = domyslna_pula()
+    stan = pula.czekaj(zglos_wczytanie_archiwum(pula, uzytkownik(), dane, {KINETYKA}), 120)
+    if stan is None or stan.stan != "gotowe":
+        raise RuntimeError(stan.blad if stan is not None and stan.blad else "przekroczono czas wczytywania")
+    return stan.wynik
+
+def pliki_z_archiwum():
+    """Wybór plików premicelarnego i micelarnego z archiwum; zwraca ((nazwa, dane) albo None) dla obu reżimów."""
+    archiwum = st.file_uploader("📦 Wczytaj archiwum pomiarów (.zip)", type="zip", key="archiwum_kinetyki")
+    if not archiwum:
+        return None, None
+    try:
+        czlonkowie = wczytaj_archiwum(archiwum.getvalue())
+    except Exception as e:
+        st.error(f"Nie można wczytać archiwum: {e}")
+        return None, None
+    for c in czlonkowie:
+        if c.blad:
+            st.warning(f"Pominięto {c.nazwa}: {c.blad}")
+    dane = {c.nazwa: c.dane for c in czlonkowie if not c.blad}
+    if not dane:
+        st.warning("Archiwum nie zawiera plików tensjometru (kolumny sigma i Tlife).")
+        return None, None
+    nazwy = list(dane)
+    col1, col2 = st.columns(2)
+    with col1:
+        premi = st.selectbox("Plik *premicelarny*", nazwy, index=0, key="archiwum_premicel")
+    with col2:
+        mice = st.selectbox("Plik *micelarny*", nazwy, index=min(1, len(nazwy) - 1), key="archiwum_micel")
+    return (premi, dane[premi]), (mice, dane[mice])
+
+def rysuj_regresje(ax, x, y, y_pred, tryb_label, x_label):
+    ax.set_title(f"{tryb_label}", fontsize=10, fontweight='bold')
+    ax.tick_params(axis='both', labelsize=10)
+    ax.plot(x, y, "o", color="#1f77b4", markersize=5.5, label="Wybrane punkty")
+    ax.plot(x, y_pred, color="#d62728", linewidth=2, label="Dopasowana prosta")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.set_xlabel(x_label, fontsize=8)
+    ax.set_ylabel("Sigma [mN/m]", fontsize=8)
+    ax.legend(loc="best", fontsize=8, frameon=True)
+
+def obraz_regresji(x, y, a, b, tryb_label, x_label):
+    """Wykres punktów i prostej y = a·x + b; długie serie (np. pomiar na żywo) są przerzedzane przed rysowaniem."""
+    from obliczenia.wykresy import przerzedz, renderuj
+
+    rysowane = przerzedz(x, y)
+    x, y = x[rysowane], y[rysowane]
+    return renderuj(rysuj_regresje, x, y, a * x + b, tryb_label, x_label, styl={"figsize": (6, 4), "dpi": 150})
+
+@st.cache_data
+def sugestie_odrzucenia(x, y):
+    from obliczenia.regresja import punkty_odstajace, wplyw_punktow
 
-    df = pd.read_csv(file, sep="\t", engine="python", encoding='cp1250')
-    for col in df.select_dtypes(include="object").columns:
-        df[col] = df[col].str.replace(",", ".", regex=False)
-    df.columns = [col.strip().lower() for col in df.columns]
-    kolumny_liczbowe = ["sigma", "f", "tlife", "temp"]
-    for col in kolumny_liczbowe:
-        df[col] = df[col].astype(float)
-    df["sqrt_tlife"] = np.sqrt(df["tlife"])
-    df["inv_tlife"] = 1 / df["tlife"]
-    return df
-
-@st.cache_resource(hash_funcs={bytes: lambda _: hash(_)})
-def fit_linear_model_cached(x_bytes, y_bytes):
+    cook, _ = wplyw_punktow(x, y)
+    return cook, punkty_odstajace(x, y)
+
+def dopasowanie_przyrostowe(klucz, x, y, maska):
+    """Regresja zaznaczonych punktów; sumy w stanie sesji są poprawiane tylko o przełączone wiersze."""
+    import hashlib
     import numpy as np
-    from sklearn.linear_model import LinearRegression
+    from obliczenia.regresja import SumyRegresji
 
-    x = np.frombuffer(x_bytes).reshape(-1, 1)
-    y = np.frombuffer(y_bytes)
-    model = LinearRegression()
-    model.fit(x, y)
-    return model
+    odcisk = hashlib.blake2b(x.tobytes() + y.tobytes(), digest_size=16).digest()
+    stan = st.session_state.get(klucz)
+    if stan is None or stan["odcisk"] != odcisk:
+        # Nowy plik – sumy budowane od zera
+        stan = {"odcisk": odcisk, "sumy": SumyRegresji(), "maska": np.zeros(len(x), dtype=bool)}
+        st.session_state[klucz] = stan
+    stan["sumy"].przelacz(x, y, stan["maska"], maska)
+    stan["maska"] = maska.copy()
+    return stan["sumy"].wynik()
 
 def analiza_i_wykres(df, tryb_label, x_column, x_label):
+    """Wybór punktów i regresja; zwraca (WynikRegresji, maska użytych punktów) albo (None, None)."""
     import numpy as np
-    import matplotlib.pyplot as plt
-    import pandas as pd
+
+    x_wszystkie = df[x_column].to_numpy()
+    y_wszystkie = df["sigma"].to_numpy()
+    cook, odstajace = sugestie_odrzucenia(x_wszystkie, y_wszystkie)
+
+    st.markdown(f"### 📄 Podgląd i wybór punktów ({tryb_label})")
+    pomin = st.checkbox(
+        f"Odznacz punkty sugerowane jako odstające ({int(odstajace.sum())})",
+        key=f"pomin_{tryb_label}",
+        help="Odległość Cooka większa niż 4/n albo reszta studentyzowana (bez danego punktu) |t| > 3.",
+    )
 
     # Przygotuj dataframe do edycji
     df_editable = df[["sigma", "tlife", "sqrt_tlife", "inv_tlife"]].copy()
-    df_editable["Użyj"] = True  # domyślnie zaznaczone wszystkie
+    df_editable["Cook"] = cook
+    df_editable["Odstający"] = odstajace
+    df_editable["Użyj"] = ~odstajace if pomin else True  # domyślnie zaznaczone wszystkie
 
-    st.markdown(f"### 📄 Podgląd i wybór punktów ({tryb_label})")
     edited_df = st.data_editor(
         df_editable,
-        column_config={"Użyj": st.column_config.CheckboxColumn("Użyj punktu")},
-        disabled=["sigma", "tlife", "sqrt_tlife", "inv_tlife"],
+        column_config={
+            "Użyj": st.column_config.CheckboxColumn("Użyj punktu"),
+            "Cook": st.column_config.NumberColumn("Odległość Cooka", format="%.3f"),
+            "Odstający": st.column_config.CheckboxColumn("⚠️ Odstający"),
+        },
+        disabled=["sigma", "tlife", "sqrt_tlife", "inv_tlife", "Cook", "Odstający"],
         use_container_width=True,
-        key=tryb_label
+        key=f"{tryb_label}_{int(pomin)}"
     )
 
-    # Filtrowanie tylko zaznaczonych punktów
-    df_filtered = df.copy()
-    df_filtered["Użyj"] = edited_df["Użyj"]
-    df_filtered = df_filtered[df_filtered["Użyj"] == True]
-
-    if df_filtered.empty:
+    # Dopasowanie tylko do zaznaczonych punktów (maska zamiast kopiowania danych)
+    maska = edited_df["Użyj"].to_numpy(dtype=bool)
+    if not maska.any():
         st.warning("❗ Zaznacz przynajmniej jeden punkt do analizy.")
-        return None
+        return None, None
 
-    x = df_filtered[x_column].values.reshape(-1, 1)
-    y = df_filtered["sigma"].values
+    x = x_wszystkie[maska]
+    y = y_wszystkie[maska]
 
-    x_bytes = x.tobytes()
-    y_bytes = y.tobytes()
-    model = fit_linear_model_cached(x_bytes, y_bytes)
-    y_pred = model.predict(x)
-    a, b = model.coef_[0], model.intercept_
+    wynik = dopasowanie_przyrostowe(f"sumy_{tryb_label}", x_wszystkie, y_wszystkie, maska)
+    if np.isnan(wynik.a):
+        st.warning("❗ Do dopasowania prostej potrzebne są co najmniej dwa punkty o różnych wartościach x.")
+        return None, None
+    a, b = wynik.a, wynik.b
 
     st.markdown(f"### 📐 Współczynnik kierunkowy ({tryb_label})")
-    st.write(f"y = **{a:.4f}·x + {b:.4f}**")
+    st.write(f"y = **{a:.4f}·x + {b:.4f}**  (R² = {wynik.r2:.4f}, u(a) = {wynik.se_a:.2e})")
 
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=150)
-    ax.set_title(f"{tryb_label}", fontsize=10, fontweight='bold')
-    ax.tick_params(axis='both', labelsize=10)
-    ax.scatter(x, y, color="#1f77b4", s=30, label="Wybrane punkty")
-    ax.plot(x, y_pred, color="#d62728", linewidth=2, label="Dopasowana prosta")
-    ax.grid(True, linestyle="--", alpha=0.5)
-    ax.set_xlabel(x_label, fontsize=8)
-    ax.set_ylabel("Sigma [mN/m]", fontsize=8)
-    ax.legend(loc="best", fontsize=8, frameon=True)
-    st.pyplot(fig, use_container_width=False)
+    # Obraz z pamięci wykresów, gdy dane i zaznaczenie punktów się nie zmieniły
+    st.image(obraz_regresji(x, y, a, b, tryb_label, x_label), width="content")
 
-    return a
+    return wynik, maska
 
 
-st.title("📉 Analiza kinetyki adsorpcji – tryb podwójny")
+def parametry_dyfuzji():
+    """Zwraca (T [K], n, c); T = None oznacza temperaturę z kolumny Temp danych."""
+    from obliczenia.kinetyka import na_kelwiny
+
+    z_pomiaru = st.checkbox("🌡️ Temperatura z kolumny Temp pomiaru", value=True,
+                            help="Średnia temperatura zapisana przez tensjometr, osobno dla każdego pliku.")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        temp_scale = st.selectbox("Skala temperatury", ["Celsjusz", "Farenheit", "Kelvin"], disabled=z_pomiaru)
+    with col2:
+        temp_input = st.number_input("Temperatura", value=23.1, disabled=z_pomiaru)
+        T = None if z_pomiaru else na_kelwiny(temp_input, temp_scale)
+    with col3:
+        n = st.number_input("n (1 = niejonowy, 2 = jonowy)", value=1)
+    with col4:
+        c = st.number_input("Stężenie surfaktantu [mol/L]", value=1e-3, format="%.5f")
+    return T, n, c
 
-col1, col2 = st.columns(2)
-with col1:
-    premicel_file = st.file_uploader("📁 Wczytaj plik *premicelarny*", type=["txt", "dat"], key="premicel")
-with col2:
-    micel_file = st.file_uploader("📁 Wczytaj plik *micelarny*", type=["txt", "dat"], key="micel")
+REZIMY = {"premicelarny": ("sqrt_tlife", "√Tlife [√ms]"), "micelarny": ("inv_tlife", "1/Tlife [1/ms]")}
 
-a_premi = None
-a_mice = None
+def temperatura_danych(df, T):
+    """Temperatura podana ręcznie albo średnia z kolumny Temp (z opisem źródła)."""
+    from obliczenia.kinetyka import T_DOMYSLNA, temperatura_pliku
 
-if premicel_file:
-    df_premi = load_data(premicel_file)
-    a_premi = analiza_i_wykres(df_premi, "premicelarny", "sqrt_tlife", "√Tlife [√ms]")
+    if T is not None:
+        return T, ""
+    T_pliku = temperatura_pliku(df)
+    if T_pliku is None:
+        return T_DOMYSLNA, f" (brak kolumny Temp, T = {T_DOMYSLNA:.2f} K)"
+    return T_pliku, f" (T = {T_pliku:.2f} K z pomiaru)"
 
-if micel_file:
-    df_mice = load_data(micel_file)
-    a_mice = analiza_i_wykres(df_mice, "micelarny", "inv_tlife", "1/Tlife [1/ms]")
+def uruchom_pomiar():
+    from obliczenia.strumien import KinetykaNaZywo, otworz_zrodlo
 
-if a_premi or a_mice:
-    st.subheader("📊 Wyznaczanie współczynnika dyfuzji")
-    import numpy as np
+    stan = st.session_state
+    zatrzymaj_pomiar()
+    try:
+        zrodlo = otworz_zrodlo(stan.zrodlo_na_zywo.strip())
+    except (OSError, ValueError) as e:
+        stan.blad_na_zywo = f"Nie można otworzyć źródła: {e}"
+        return
+    stan.blad_na_zywo = None
+    stan.pomiar = {"zrodlo": zrodlo, "kinetyka": KinetykaNaZywo(int(stan.bufor_na_zywo)),
+                   "rezim": stan.rezim_na_zywo, "aktywny": True, "zamkniete": False}
 
-    col1, col2, col3, col4 = st.columns(4)
+def zatrzymaj_pomiar():
+    pomiar = st.session_state.get("pomiar")
+    if pomiar and pomiar["aktywny"]:
+        pomiar["zrodlo"].zamknij()
+        pomiar["aktywny"] = False
+
+def pomiar_na_zywo():
+    st.markdown("Śledzenie rosnącego pliku z tensjometru albo strumienia wierszy z lokalnego gniazda TCP. "
+                "Regresja jest aktualizowana przyrostowo dla punktów w buforze.")
+    st.text_input("📁 Plik pomiaru (.txt/.dat) lub adres gniazda host:port", key="zrodlo_na_zywo")
+    col1, col2, col3 = st.columns(3)
     with col1:
-        temp_scale = st.selectbox("Skala temperatury", ["Celsjusz", "Farenheit", "Kelvin"])
+        st.selectbox("Reżim", list(REZIMY), key="rezim_na_zywo")
     with col2:
-        temp_input = st.number_input("Temperatura", value=23.1)
-        if temp_scale == "Celsjusz":
-            T = temp_input + 273.15
-        elif temp_scale == "Farenheit":
-            T = (temp_input - 32) * 5 / 9 + 273.15
-        else:
-            T = temp_input
+        st.number_input("Pojemność bufora [punkty]", min_value=10, value=10000, step=1000, key="bufor_na_zywo")
     with col3:
-        n = st.number_input("n (1 = niejonowy, 2 = jonowy)", value=1)
-    with col4:
-        c = st.number_input("Stężenie surfaktantu [mol/L]", value=1e-3, format="%.5f")
+        odswiezanie = st.number_input("Odświeżanie [s]", min_value=0.5, value=2.0, step=0.5)
+
+    col1, col2 = st.columns(2)
+    col1.button("▶️ Start", on_click=uruchom_pomiar, disabled=not st.session_state.zrodlo_na_zywo.strip())
+    col2.button("⏹️ Stop", on_click=zatrzymaj_pomiar)
+    if st.session_state.get("blad_na_zywo"):
+        st.error(st.session_state.blad_na_zywo)
 
-    c_m3 = c * 1000
-    R = 8.314
+    T, n, c = parametry_dyfuzji()
+    pomiar = st.session_state.get("pomiar")
+    if pomiar is None:
+        st.info("Podaj źródło danych i naciśnij Start.")
+        return
 
-    if a_premi:
+    # Tylko ten fragment jest odświeżany cyklicznie – reszta strony nie jest wykonywana ponownie
+    @st.fragment(run_every=odswiezanie if pomiar["aktywny"] else None)
+    def wyniki_na_zywo():
+        import numpy as np
+        from obliczenia.kinetyka import wspolczynnik_dyfuzji, stala_k2
+
+        if pomiar["aktywny"]:
+            try:
+                pomiar["kinetyka"].dodaj(pomiar["zrodlo"].pobierz())
+            except OSError as e:
+                st.error(f"Błąd odczytu źródła: {e}")
+            if pomiar["zrodlo"].zamkniete:
+                # Nadawca zakończył strumień: koniec odpytywania i pełne odświeżenie wyłącza cykl fragmentu
+                zatrzymaj_pomiar()
+                pomiar["zamkniete"] = True
+                st.rerun()
+
+        rezim = pomiar["rezim"]
+        x_column, x_label = REZIMY[rezim]
+        kinetyka = pomiar["kinetyka"]
+        wynik = kinetyka.regresja(x_column)
+        if pomiar["aktywny"]:
+            stan_opis = "🟢 pomiar trwa"
+        else:
+            stan_opis = "🔌 połączenie zamknięte" if pomiar.get("zamkniete") else "⏸️ zatrzymany"
+        st.markdown(f"### 📡 Reżim {rezim} – {stan_opis}, punktów w buforze: {wynik.n}")
+        if not np.isfinite(wynik.a):
+            st.info("Czekam na co najmniej dwa punkty pomiarowe...")
+            return
+
+        st.write(f"y = **{wynik.a:.4f}·x + {wynik.b:.4f}**  (R² = {wynik.r2:.4f}, u(a) = {wynik.se_a:.2e})")
+        dane = kinetyka.dane()
+        x = dane[x_column]
+        st.image(obraz_regresji(x, dane["sigma"], wynik.a, wynik.b, rezim, x_label), width="content")
+
+        # Nachylenie drugiego reżimu zapamiętane z wcześniejszego pomiaru w tej sesji
+        nachylenia = st.session_state.setdefault("a_na_zywo", {})
+        nachylenia[rezim] = wynik.a
         try:
-            a_SI = a_premi / 1000  # mN/m -> N/m
-            D = ((a_SI / (-2 * n * R * T * c_m3)) ** 2) * np.pi
-            st.write(f"**Współczynnik dyfuzji D (premicelarny)** = {D:.4e} m²/s")
+            T_pomiaru, opis_T = temperatura_danych(dane, T)
+            D = wspolczynnik_dyfuzji(wynik.a, n, T_pomiaru, c)
+            st.write(f"**Współczynnik dyfuzji D ({rezim})** = {D:.4e} m²/s{opis_T}")
         except Exception as e:
-            st.error(f"[Premicelarny] Błąd obliczeń: {e}")
-    if a_mice:
+            st.error(f"Błąd obliczeń: {e}")
+        if len(nachylenia) == 2:
+            k2 = stala_k2(nachylenia["micelarny"], nachylenia["premicelarny"])
+            st.write(f"**Stała k₂** = {k2:.4e}")
+
+    wyniki_na_zywo()
+
+
+def pakiet_dyfuzji(dopasowania, D_rezimow, parametry):
+    import pandas as pd
+    from obliczenia.eksport import zapisz_pakiet
+
+    wyniki, dane = [], []
+    for rezim, (plik, df, wynik, maska) in dopasowania.items():
+        T, D = D_rezimow.get(rezim, (None, None))
+        wyniki.append({"rezim": rezim, "plik": plik, **wynik._asdict(), "T": T, "D": D})
+        dane.append(df.assign(rezim=rezim, uzyty=maska))
+    return zapisz_pakiet("dyfuzja", {"wyniki": pd.DataFrame(wyniki), "dane": dane}, parametry)
+
+def zapisana_analiza():
+    """Wyniki z pakietu analizy: proste i D odtwarzane z zapisanych parametrów, bez ponownej regresji."""
+    import pandas as pd
+    from obliczenia.eksport import wczytaj_pakiet
+
+    plik = st.file_uploader("📂 Pakiet analizy kinetyki (.zip)", type="zip", key="pakiet_dyfuzji")
+    if plik is None:
+        st.info("Wczytaj pakiet zapisany przyciskiem „Pobierz całą analizę” albo poleceniem "
+                "`python -m obliczenia.kinetyka ... -o wyniki.zip`.")
+        return
+    try:
+        pakiet = wczytaj_pakiet(plik)
+    except Exception as e:
+        st.error(f"Nie można wczytać analizy: {e}")
+        return
+    st.caption(f"Analiza zapisana {pakiet.utworzono}")
+
+    if pakiet.analiza == "kinetyka":
+        # Wyniki wsadowe z linii poleceń: jedna prosta na plik dla obu reżimów
+        st.dataframe(pakiet.tabele["wyniki"], hide_index=True)
+        return
+    if pakiet.analiza != "dyfuzja":
+        st.error(f"Pakiet zawiera analizę '{pakiet.analiza}', a nie kinetykę adsorpcji.")
+        return
+
+    dane = pakiet.tabele["dane"]
+    for w in pakiet.tabele["wyniki"].itertuples():
+        x_column, x_label = REZIMY[w.rezim]
+        st.markdown(f"### 📐 Współczynnik kierunkowy ({w.rezim}) – {w.plik}")
+        st.write(f"y = **{w.a:.4f}·x + {w.b:.4f}**  (R² = {w.r2:.4f}, u(a) = {w.se_a:.2e})")
+        uzyte = dane[(dane["rezim"] == w.rezim) & dane["uzyty"]]
+        x = uzyte[x_column].to_numpy()
+        st.image(obraz_regresji(x, uzyte["sigma"].to_numpy(), w.a, w.b, w.rezim, x_label), width="content")
+        if pd.notna(w.D):
+            st.write(f"**Współczynnik dyfuzji D ({w.rezim})** = {w.D:.4e} m²/s (T = {w.T:.2f} K)")
+    if pakiet.parametry.get("k2") is not None:
+        st.write(f"**Stała k₂** = {pakiet.parametry['k2']:.4e}")
+
+
+st.title("📉 Analiza kinetyki adsorpcji – tryb podwójny")
+panel_wydajnosci()
+
+zrodlo_danych = st.radio("Źródło danych", ["Pliki", "Archiwum (.zip)", "Pomiar na żywo", "Zapisana analiza"],
+                         horizontal=True)
+if zrodlo_danych == "Pomiar na żywo":
+    pomiar_na_zywo()
+    st.stop()
+if zrodlo_danych == "Zapisana analiza":
+    zapisana_analiza()
+    st.stop()
+
+if zrodlo_danych == "Archiwum (.zip)":
+    premicel, micel = pliki_z_archiwum()
+else:
+    col1, col2 = st.columns(2)
+    with col1:
+        premicel_file = st.file_uploader("📁 Wczytaj plik *premicelarny*", type=["txt", "dat"], key="premicel")
+    with col2:
+        micel_file = st.file_uploader("📁 Wczytaj plik *micelarny*", type=["txt", "dat"], key="micel")
+    premicel = (premicel_file.name, load_data(premicel_file)) if premicel_file else None
+    micel = (micel_file.name, load_data(micel_file)) if micel_file else None
+
+dopasowania = {}  # reżim -> (plik, dane, WynikRegresji, maska)
+
+if premicel:
+    nazwa_premi, df_premi = premicel
+    wynik, maska = analiza_i_wykres(df_premi, "premicelarny", "sqrt_tlife", "√Tlife [√ms]")
+    if wynik is not None:
+        dopasowania["premicelarny"] = (nazwa_premi, df_premi, wynik, maska)
+
+if micel:
+    nazwa_mice, df_mice = micel
+    wynik, maska = analiza_i_wykres(df_mice, "micelarny", "inv_tlife", "1/Tlife [1/ms]")
+    if wynik is not None:
+        dopasowania["micelarny"] = (nazwa_mice, df_mice, wynik, maska)
+
+D_rezimow = {}
+if dopasowania:
+    st.subheader("📊 Wyznaczanie współczynnika dyfuzji")
+    from obliczenia.kinetyka import wspolczynnik_dyfuzji
+
+    T, n, c = parametry_dyfuzji()
+
+    for rezim, (_, df, wynik, _) in dopasowania.items():
         try:
-            a_SI = a_mice / 1000  # mN/m -> N/m
-            D = ((a_SI / (-2 * n * R * T * c_m3)) ** 2) * np.pi
-            st.write(f"**Współczynnik dyfuzji D (micelarny)** = {D:.4e} m²/s")
+            T_rezimu, opis_T = temperatura_danych(df, T)
+            D = wspolczynnik_dyfuzji(wynik.a, n, T_rezimu, c)
+            D_rezimow[rezim] = (T_rezimu, D)
+            st.write(f"**Współczynnik dyfuzji D ({rezim})** = {D:.4e} m²/s{opis_T}")
         except Exception as e:
-            st.error(f"[Micelarny] Błąd obliczeń: {e}")
+            st.error(f"[{rezim.capitalize()}] Błąd obliczeń: {e}")
 
-if a_premi is not None and a_mice is not None:
+k2 = None
+if len(dopasowania) == 2:
     st.subheader("📈 Obliczanie stałej k₂ ze wzoru")
 
     try:
+        import numpy as np
+        from obliczenia.kinetyka import stala_k2
+
         pi = np.pi
-        alpha = 1
-        k2 = (4 / pi) * ((a_mice / a_premi) ** 2)
+        a_premi, a_mice = dopasowania["premicelarny"][2].a, dopasowania["micelarny"][2].a
+        k2 = stala_k2(a_mice, a_premi)
         st.write(r"$k_2 = \frac{4}{\pi} \cdot \left(\frac{a_{micelarny}}{a_{premicelarny}}\right)^2$")
         st.latex(f"k_2 = \\frac{{4}}{{{pi}}} \\cdot \\left(\\frac{{{a_mice:.4e}}}{{{a_premi:.4e}}}\\right)^2 = {k2:.4e}")
     except Exception as e:
         st.error(f"Nie udało się obliczyć k₂: {e}")
+
+if dopasowania:
+    parametry = {"n": n, "c": c, "T": T, "k2": k2}
+    st.download_button("📦 Pobierz całą analizę (.zip)",
+                       lambda: pakiet_dyfuzji(dopasowania, D_rezimow, parametry),
+                       file_name="analiza_kinetyki.zip", mime="application/zip", on_click="ignore",
+                       help=pomoc_pakietu("Dane z zaznaczeniem użytych punktów, proste, D i k₂",
+                                          "Można je później wczytać w trybie \"Zapisana analiza\"."))
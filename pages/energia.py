@@ -1,24 +1,52 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from scipy.stats import linregress
+from interfejs import panel_wydajnosci, pomoc_pakietu, uzytkownik
+from obliczenia.eksport import zapisz_pakiet
+from obliczenia.energia import CIECZE, owrk_pary, wspolrzedne_owrk
+from obliczenia.magazyn import MagazynPomiarow, wczytaj_punkty
+from obliczenia.wykresy import renderuj
+
+
+@st.cache_resource
+def magazyn():
+    return MagazynPomiarow()
+
+
+def rysuj_zismana(ax, x, y, slope, intercept, gamma_c):
+    ax.scatter(x, y, color="blue", label="Dane")
+    ax.plot(x, slope * x + intercept, color="red", label=f"Regresja: y = {slope:.3f}x + {intercept:.3f}")
+    ax.axhline(1, color="green", linestyle="--", label="cos(θ) = 1")
+    ax.axvline(gamma_c, color="purple", linestyle="--", label=f"γ_c = {gamma_c:.2f} mN/m")
+    ax.set_xlabel("γ cieczy [mN/m]")
+    ax.set_ylabel("cos(θ)")
+    ax.legend()
+
+
+def rysuj_owrk(ax, x_owrk, y_owrk, nazwy, a, b):
+    ax.scatter(x_owrk, y_owrk, color="blue", label="Ciecze")
+    for xi, yi, nazwa in zip(x_owrk, y_owrk, nazwy):
+        ax.annotate(nazwa, (xi, yi), textcoords="offset points", xytext=(4, 4), fontsize=8)
+    x_linii = np.linspace(0, x_owrk.max() * 1.05, 50)
+    ax.plot(x_linii, a * x_linii + b, color="red", label=f"y = {a:.3f}x + {b:.3f}")
+    ax.set_xlabel("√γᵖ / √γᵈ")
+    ax.set_ylabel("γ(1 + cos θ) / (2√γᵈ)")
+    ax.legend()
+
 
 st.title("Wyznaczanie energii powierzchniowej – metoda Zismana")
+panel_wydajnosci()
 
 # Predefined liquids
-predef_ciecze = {
-    "Woda": {"gamma": 72.8, "gamma_d": 21.8, "gamma_p": 51.0},
-    "Glicerol": {"gamma": 63.4, "gamma_d": 37.0, "gamma_p": 26.4},
-    "Etanodiol": {"gamma": 48.3, "gamma_d": 29.3, "gamma_p": 19.0},
-    "Formamid": {"gamma": 58.2, "gamma_d": 39.5, "gamma_p": 18.7},
-    "Etanol": {"gamma": 22.4, "gamma_d": 17.0, "gamma_p": 5.4},
-    "Dijodometan": {"gamma": 50.8, "gamma_d": 50.8, "gamma_p": 0.0},
-    "Inna": None
-}
-
-if "punkty" not in st.session_state:
-    st.session_state.punkty = []
+predef_ciecze = {**CIECZE, "Inna": None}
+
+# Punkty są zapisywane na dysku i grupowane w próbki
+NOWA_PROBKA = "➕ Nowa próbka"
+probki = magazyn().probki()
+wybor_probki = st.selectbox("Próbka", probki + [NOWA_PROBKA], key="wybrana_probka")
+if wybor_probki == NOWA_PROBKA:
+    probka = st.text_input("Nazwa nowej próbki", value=f"Próbka {len(probki) + 1}").strip()
+else:
+    probka = wybor_probki
 
 st.subheader("➕ Dodaj nowy punkt pomiarowy")
 selected_liquid_key = st.selectbox("Wybierz ciecz pomiarową", list(predef_ciecze.keys()), key="selected_liquid")
@@ -43,43 +71,125 @@ else:
 
 input_data["theta"] = st.number_input("Kąt zwilżania θ [°]", min_value=0.0, max_value=180.0, step=0.1)
 
-if st.button("Dodaj punkt"):
-    input_data["cos_theta"] = np.cos(np.radians(input_data["theta"]))
-    st.session_state.punkty.append(input_data)
-    st.success(f"Punkt dodany: {input_data['ciecz']}")
-
-if st.session_state.punkty:
+def dodaj_punkty(punkty):
+    # Wywołanie zwrotne: zapis i przełączenie na próbkę, zanim strona zostanie narysowana ponownie
+    dodane = magazyn().dodaj_wiele(punkty)
+    st.session_state.wybrana_probka = probka
+    st.session_state.komunikat = (f"Punkt dodany: {punkty[0]['ciecz']}" if len(dodane) == 1
+                                  else f"Zaimportowano {len(dodane)} punktów.")
+
+
+st.button("Dodaj punkt", disabled=not probka, on_click=dodaj_punkty, args=([{**input_data, "probka": probka}],))
+if "komunikat" in st.session_state:
+    st.success(st.session_state.pop("komunikat"))
+
+def punkty_z_archiwum(nazwa, dane, B):
+    """Punkty z archiwum .zip i nazwy pominiętych plików.
+
+    Pliki CSV punktów (ciecz, theta) są wczytywane wprost, a pomiary
+    zwilżania analizowane jak w trybie wsadowym strony zwilżania i
+    uśredniane do jednego punktu θ na ciecz. Obie partie liczone są
+    równolegle we wspólnej puli procesów.
+    """
+    import pandas as pd
+    from obliczenia.archiwum import ENERGIA, ZWILZANIE, rozpakuj, zglos_wczytanie_archiwum
+    from obliczenia.zadania import domyslna_pula
+    from obliczenia.zwilzanie import punkty_energii, zglos_analize_plikow
+
+    def czekaj(klucz):
+        stan = pula.czekaj(klucz, 120)
+        if stan is None or stan.stan != "gotowe":
+            raise RuntimeError(stan.blad if stan is not None and stan.blad else "przekroczono czas wczytywania")
+        return stan.wynik
+
+    pula = domyslna_pula()
+    pomiary, _ = rozpakuj([(nazwa, dane)], ZWILZANIE)
+    klucz_punktow = zglos_wczytanie_archiwum(pula, uzytkownik(), dane, {ENERGIA})
+    klucz_pomiarow = zglos_analize_plikow(pula, uzytkownik(), pomiary, B) if pomiary else None
+
+    czlonkowie = czekaj(klucz_punktow)
+    bledy = [f"{c.nazwa}: {c.blad}" for c in czlonkowie if c.blad]
+    if bledy:
+        raise ValueError("; ".join(bledy))
+    tabele = [c.dane for c in czlonkowie]
+    pominiete = []
+    if klucz_pomiarow is not None:
+        wyniki = czekaj(klucz_pomiarow)
+        pominiete = [f"{plik} ({blad})" for plik, blad in zip(wyniki["plik"], wyniki["blad"]) if blad]
+        tabele.append(punkty_energii(wyniki))
+    punkty = pd.concat(tabele, ignore_index=True) if tabele else pd.DataFrame()
+    if punkty.empty:
+        raise ValueError("Archiwum nie zawiera plików punktów (ciecz, theta) ani pomiarów zwilżania "
+                         "z rozpoznaną cieczą.")
+    return punkty, pominiete
+
+
+with st.expander("📥 Import punktów z pliku CSV lub pakietu analizy"):
+    st.caption("Kolumny: ciecz, theta oraz opcjonalnie probka, gamma, gamma_d, gamma_p, data. "
+               "Pasują też wyniki wsadowej analizy zwilżania, zapisane pakiety analiz (.zip) "
+               "oraz archiwa .zip z plikami CSV punktów lub pomiarami zwilżania (.xls, .csv), "
+               "z których liczony jest średni kąt θ każdej cieczy.")
+    plik_punktow = st.file_uploader("Plik CSV lub pakiet .zip z punktami", type=["csv", "zip"],
+                                    key="import_punktow")
+    B_archiwum = st.number_input("Stała materiałowa B (pomiary zwilżania z archiwum)", value=0.000001,
+                                 step=0.000001, format="%.8f")
+
+    def importuj_punkty(plik):
+        from obliczenia.archiwum import jest_archiwum
+
+        try:
+            pominiete = []
+            if jest_archiwum((plik.name, plik.getvalue())):
+                punkty_z_pliku, pominiete = punkty_z_archiwum(plik.name, plik.getvalue(), B_archiwum)
+            else:
+                punkty_z_pliku = wczytaj_punkty(plik)
+            if "probka" not in punkty_z_pliku.columns:
+                punkty_z_pliku["probka"] = probka
+            # Pliki archiwum bez kolumny probka trafiają do bieżącej próbki
+            punkty_z_pliku["probka"] = punkty_z_pliku["probka"].fillna(probka)
+            dodaj_punkty(punkty_z_pliku.to_dict(orient="records"))
+            if pominiete:
+                st.session_state.pominiete_importu = "Pominięto pliki: " + "; ".join(pominiete)
+        except Exception as e:
+            st.session_state.blad_importu = f"Błąd importu: {e}"
+
+    if plik_punktow:
+        st.button("Importuj punkty", disabled=not probka, on_click=importuj_punkty, args=(plik_punktow,))
+    if "blad_importu" in st.session_state:
+        st.error(st.session_state.pop("blad_importu"))
+    if "pominiete_importu" in st.session_state:
+        st.warning(st.session_state.pop("pominiete_importu"))
+
+df = magazyn().punkty(probka)
+
+if not df.empty:
     st.subheader("Dodane punkty")
 
-    for i, pkt in enumerate(st.session_state.punkty):
+    for pkt in df.itertuples():
         cols = st.columns([4, 2, 2, 2, 1])
-        cols[0].markdown(f"**{pkt['ciecz']}**")
-        cols[1].write(f"γ = {pkt['gamma']}")
-        cols[2].write(f"θ = {pkt['theta']}°")
-        cols[3].write(f"cos(θ) = {pkt['cos_theta']:.3f}")
-        if cols[4].button("❌", key=f"del_{i}"):
-            st.session_state.punkty.pop(i)
-            st.rerun()
+        cols[0].markdown(f"**{pkt.ciecz}**")
+        cols[1].write(f"γ = {pkt.gamma}")
+        cols[2].write(f"θ = {pkt.theta}°")
+        cols[3].write(f"cos(θ) = {pkt.cos_theta:.3f}")
+        # usunięcie w wywołaniu zwrotnym – wykonywane przed ponownym rysowaniem strony
+        cols[4].button("❌", key=f"del_{pkt.id}", on_click=magazyn().usun, args=(pkt.id,))
 
     st.subheader("Wykres Zismana")
-    df = pd.DataFrame(st.session_state.punkty)
     x = df["gamma"].to_numpy()
     y = df["cos_theta"].to_numpy()
 
-    slope, intercept, r_value, _, _ = linregress(x, y)
-    gamma_c = (1 - intercept) / slope if slope != 0 else np.nan
-
-    fig, ax = plt.subplots()
-    ax.scatter(x, y, color="blue", label="Dane")
-    ax.plot(x, slope * x + intercept, color="red", label=f"Regresja: y = {slope:.3f}x + {intercept:.3f}")
-    ax.axhline(1, color="green", linestyle="--", label="cos(θ) = 1")
-    ax.axvline(gamma_c, color="purple", linestyle="--", label=f"γ_c = {gamma_c:.2f} mN/m")
-    ax.set_xlabel("γ cieczy [mN/m]")
-    ax.set_ylabel("cos(θ)")
-    ax.legend()
-    st.pyplot(fig)
+    slope, intercept, gamma_c = magazyn().zisman(probka)
+    st.image(renderuj(rysuj_zismana, x, y, slope, intercept, gamma_c), width="stretch")
 
     st.markdown(f"Krytyczna energia powierzchniowa = **{gamma_c:.2f} mN/m**")
+
+    # Punkty próbki z wynikami obu metod; archiwum budowane dopiero po kliknięciu
+    st.download_button("📦 Pobierz całą analizę próbki (.zip)",
+                       lambda: zapisz_pakiet("energia", {"punkty": df, "wyniki": magazyn().wyniki(probka)},
+                                             {"probka": probka}),
+                       file_name=f"energia_{probka}.zip", mime="application/zip", on_click="ignore",
+                       help=pomoc_pakietu("Punkty pomiarowe oraz wyniki Zismana i OWRK",
+                                          "Pakiet można ponownie zaimportować powyżej."))
 else:
     st.info("Dodaj przynajmniej jeden punkt, aby zobaczyć wykres Zismana.")
 
@@ -88,57 +198,40 @@ else:
 
 
 st.title("Wyznaczanie energii powierzchniowej – metoda OWRK")
-df_owrk = pd.DataFrame([
-    p for p in st.session_state.punkty
-    if p["gamma_d"] is not None and p["gamma_p"] is not None
-])
+df_owrk = df[df["gamma_d"].notna() & df["gamma_p"].notna() & (df["gamma_d"] > 0)]
 
 if len(df_owrk) < 2:
     st.info("Aby skorzystać z metody OWRK, dodaj przynajmniej dwa punkty z pełnymi danymi (γ, γᵈ, γᵖ).")
 else:
-    if len(df_owrk) > 2:
-        st.subheader("🔢 Wybierz dwa punkty do obliczeń")
-        labels = [
-            f"{i+1}. {row['ciecz']} – θ={row['theta']}°"
-            for i, row in df_owrk.iterrows()
-        ]
-        selected_labels = st.multiselect("Wybierz dwa punkty:", labels, max_selections=2)
-
-        if len(selected_labels) != 2:
-            st.warning("Musisz wybrać dokładnie dwa punkty.")
-            st.stop()
-
-        selected_indices = [int(label.split(".")[0]) - 1 for label in selected_labels]
-        selected_rows = df_owrk.iloc[selected_indices]
-    else:
-        selected_rows = df_owrk.iloc[:2]
-
-    y_vals, x_vals = [], []
-
-    for _, row in selected_rows.iterrows():
-        gamma_L = row["gamma"]
-        gamma_L_d = row["gamma_d"]
-        gamma_L_p = row["gamma_p"]
-        cos_theta = row["cos_theta"]
-
-        y = gamma_L * (cos_theta + 1) / (2 * np.sqrt(gamma_L_d))
-        x = np.sqrt(gamma_L_p) / np.sqrt(gamma_L_d)
-
-        y_vals.append(y)
-        x_vals.append(x)
-
-    x1, x2 = x_vals
-    y1, y2 = y_vals
-    a = (y2 - y1) / (x2 - x1)
-    b = y1 - a * x1
-
-    gamma_S_p = a ** 2
-    gamma_S_d = b ** 2
-    gamma_S_total = gamma_S_p + gamma_S_d
-
-    st.success("Obliczenia metodą OWRK (dla wybranych dwóch cieczy):")
+    # Wszystkie ciecze naraz: prosta OWRK dopasowana metodą najmniejszych kwadratów
+    wynik = magazyn().owrk(probka)
+
+    if not np.isfinite(wynik.a):
+        st.warning("Nie można wyznaczyć prostej OWRK – wybrane ciecze mają jednakowy stosunek γᵖ/γᵈ.")
+        st.stop()
+
+    def niepewnosc(se):
+        # Dla dwóch cieczy prosta przechodzi dokładnie przez punkty – brak oszacowania błędu
+        return f" ± {se:.2f}" if wynik.n > 2 else ""
+
+    st.success(f"Obliczenia metodą OWRK (dla {wynik.n} cieczy):")
     st.markdown(f"""
-    - Składnik polarny powierzchni: **γˢᵖ = {gamma_S_p:.2f} mN/m**  
-    - Składnik dyspersyjny powierzchni: **γˢᵈ = {gamma_S_d:.2f} mN/m**  
-    - Całkowita energia powierzchniowa: **γˢ = {gamma_S_total:.2f} mN/m**
+    - Składnik polarny powierzchni: **γˢᵖ = {wynik.gamma_S_p:.2f}{niepewnosc(wynik.se_p)} mN/m**  
+    - Składnik dyspersyjny powierzchni: **γˢᵈ = {wynik.gamma_S_d:.2f}{niepewnosc(wynik.se_d)} mN/m**  
+    - Całkowita energia powierzchniowa: **γˢ = {wynik.gamma_S:.2f} mN/m**
     """)
+    if wynik.n > 2:
+        st.write(f"R² prostej OWRK = {wynik.r2:.4f}")
+
+    x_owrk, y_owrk = wspolrzedne_owrk(df_owrk["gamma"], df_owrk["gamma_d"], df_owrk["gamma_p"], df_owrk["cos_theta"])
+    st.image(renderuj(rysuj_owrk, x_owrk, y_owrk, df_owrk["ciecz"].tolist(), wynik.a, wynik.b), width="stretch")
+
+    if wynik.n > 2:
+        with st.expander("🔢 Zgodność par cieczy (rozwiązania dla każdej pary)"):
+            pary = owrk_pary(
+                [f"{i+1}. {c}" for i, c in enumerate(df_owrk["ciecz"])],
+                df_owrk["gamma"], df_owrk["gamma_d"], df_owrk["gamma_p"], df_owrk["cos_theta"]
+            )
+            st.dataframe(pary.style.format(precision=2), hide_index=True)
+            st.write(f"Rozrzut γˢ między parami: {pary['gamma_S'].min():.2f} – {pary['gamma_S'].max():.2f} mN/m "
+                     f"(odchylenie standardowe {pary['gamma_S'].std():.2f} mN/m)")
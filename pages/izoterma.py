@@ -1,14 +1,320 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
+
+from interfejs import panel_wydajnosci, pomoc_pakietu, uzytkownik, wynik_zadania
+
+
+@st.cache_resource(max_entries=16)
+def siatka_dla_zakresu(x_range):
+    from obliczenia.izoterma import siatka_krzywych
+
+    return siatka_krzywych(x_range)
+
+
+def rysuj_porownanie(ax, x_range, y_fit, y_manual, x_data, y_data, punkt_cmc, punkt_cmc_reczny, tytul):
+    ax.plot(x_range, y_fit, 'r-', label='Dopasowanie automatyczne', linewidth=2)
+    ax.plot(x_range, y_manual, 'g--', label='Parametry ręczne', linewidth=2)
+    ax.scatter(x_data, y_data, label='Dane eksperymentalne', color='blue', zorder=5)
+
+    # Zaznaczenie CMC
+    cmc, gamma_cmc = punkt_cmc
+    cmc_manual, gamma_cmc_manual = punkt_cmc_reczny
+    ax.axvline(cmc, color='purple', linestyle=':', label=f'CMC = {cmc:.6f} mol/L')
+    ax.scatter([cmc], [gamma_cmc], color='purple', s=100, zorder=6)
+    ax.axvline(cmc_manual, color='orange', linestyle=':', label=f'CMC (ręczne) = {cmc_manual:.6f} mol/L')
+    ax.scatter([cmc_manual], [gamma_cmc_manual], color='orange', s=100, zorder=6)
+
+    # Formatowanie wykresu
+    ax.set_xlabel('Stężenie [mol/L]', fontsize=12)
+    ax.set_ylabel('Napięcie powierzchniowe [mN/m]', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    ax.set_title(tytul, fontsize=12, pad=20)
+
+
+def rysuj_nakladke(ax, serie, parametry, y0):
+    import numpy as np
+    from matplotlib import colormaps
+    from obliczenia.izoterma import szyszkowski_model
+
+    kolory = colormaps["viridis"](np.linspace(0, 0.9, max(len(serie), 1)))
+    for kolor, (nazwa, (c, y, _)), (B_sz, A_sz) in zip(kolory, serie, parametry):
+        ax.scatter(c, y, s=12, color=kolor)
+        dodatnie = c[c > 0]
+        if np.isfinite(B_sz) and len(dodatnie):
+            c_linii = np.geomspace(dodatnie.min(), dodatnie.max(), 200)
+            ax.plot(c_linii, szyszkowski_model(c_linii, B_sz, A_sz, y0), color=kolor, linewidth=1.5, label=nazwa)
+    ax.set_xscale("log")
+    ax.set_xlabel('Stężenie [mol/L]', fontsize=12)
+    ax.set_ylabel('Napięcie powierzchniowe [mN/m]', fontsize=12)
+    ax.grid(True, which="both", alpha=0.3)
+    if len(serie) <= 15:
+        ax.legend(fontsize=8)
+
+
+def izotermy_wsadowo(y0, T):
+    import io
+    import numpy as np
+    from obliczenia.archiwum import IZOTERMA, rozpakuj
+    from obliczenia.izoterma import wczytaj_serie, zglos_dopasowanie_serii
+    from obliczenia.wykresy import renderuj
+    from obliczenia.zadania import LimitZadan, domyslna_pula
+
+    st.caption("Każdy plik CSV (separator ';') może zawierać jedną serię (`stezenie`, `napiecie`), "
+               "wiele serii w wierszach (kolumna `seria`) albo kolumny `napiecie_<nazwa>` obok wspólnego `stezenie`. "
+               "Opcjonalna kolumna `temp` (°C) podaje temperaturę serii. "
+               "Archiwum .zip może zawierać wiele takich plików.")
+    pliki = st.file_uploader("Wczytaj pliki CSV z seriami", type=["csv", "zip"], accept_multiple_files=True,
+                             key="pliki_izoterm")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        T_wsadowo = st.number_input("Temperatura [K]", value=float(T), step=0.1, key="T_wsadowo",
+                                    help="Dla serii bez zmierzonej temperatury")
+    with col2:
+        jonowy = st.selectbox("Typ surfaktantu", ["Niejonowy", "Jonowy"], key="typ_wsadowo") == "Jonowy"
+    with col3:
+        alpha = st.number_input("Stopień dysocjacji miceli (α)", min_value=0.0, max_value=1.0, value=0.5,
+                                step=0.1, format="%.2f", disabled=not jonowy, key="alpha_wsadowo")
+
+    zgloszono = False
+    if pliki and st.button("Dopasuj wszystkie serie"):
+        serie = {}
+        zrodla, pominiete = rozpakuj([(plik.name, plik.getvalue()) for plik in pliki], IZOTERMA)
+        if pominiete:
+            st.info(f"Pominięto pliki archiwum bez kolumny 'stezenie': {', '.join(pominiete)}")
+        for nazwa, dane in zrodla:
+            try:
+                serie.update(wczytaj_serie(io.BytesIO(dane), nazwa))
+            except Exception as e:
+                st.warning(f"Pominięto plik {nazwa}: {e}")
+        try:
+            # Serie dopasowywane we wspólnej puli procesów serwera, wspólne γ₀, T i α
+            alpha_zadania = alpha if jonowy else None
+            klucz = zglos_dopasowanie_serii(domyslna_pula(), uzytkownik(), serie, y0, T_wsadowo, alpha_zadania)
+            # Parametry zgłoszenia zostają z wynikami, bo widżety mogą się później zmienić
+            st.session_state.zadanie_serii = (klucz, serie, y0, T_wsadowo, alpha_zadania)
+            zgloszono = True
+        except LimitZadan as e:
+            st.warning(str(e))
+
+    if "zadanie_serii" in st.session_state:
+        # Krótkie zadanie kończy się jeszcze w tym przebiegu skryptu, dłuższe pokazuje postęp
+        stan = wynik_zadania("zadanie_serii", "Dopasowywanie serii", czekaj=0.5 if zgloszono else 0.0)
+        if stan is not None:
+            _, serie, *parametry_zadania = st.session_state.pop("zadanie_serii")
+            if stan.blad:
+                st.error(f"Błąd dopasowania: {stan.blad}")
+            else:
+                st.session_state.izotermy_wsadowe = (serie, stan.wynik, *parametry_zadania)
+
+    with st.expander("📂 Wczytaj zapisaną analizę"):
+        st.file_uploader("Pakiet analizy izoterm (.zip)", type="zip", key="pakiet_izoterm")
+        st.button("Wczytaj analizę", on_click=wczytaj_zapisana_analize,
+                  disabled=st.session_state.pakiet_izoterm is None)
+        if "blad_pakietu" in st.session_state:
+            st.error(st.session_state.pop("blad_pakietu"))
+
+    if "izotermy_wsadowe" not in st.session_state:
+        return
+    serie, wyniki, y0_wynikow, T_wynikow, alpha_wynikow = st.session_state.izotermy_wsadowe
+
+    st.subheader(f"Ranking serii wg CMC ({int(wyniki['pozycja'].notna().sum())}/{len(wyniki)} dopasowanych)")
+    st.dataframe(wyniki, hide_index=True, width="stretch", column_config={
+        "CMC": st.column_config.NumberColumn("CMC [mol/L]", format="%.3e"),
+        "A_sz": st.column_config.NumberColumn("A_sz [mol/L]", format="%.3e"),
+        "Gamma (CMC)": st.column_config.NumberColumn("Γ (CMC) [mol/m²]", format="%.3e"),
+        "Gamma_max": st.column_config.NumberColumn("Γ_max [mol/m²]", format="%.3e"),
+        "DeltaGm": st.column_config.NumberColumn("ΔGm [kJ/mol]", format="%.2f"),
+        "R2": st.column_config.NumberColumn("R²", format="%.4f"),
+    })
+    st.download_button("📥 Pobierz ranking (CSV)", wyniki.to_csv(index=False, sep=";").encode("utf-8-sig"),
+                       file_name="ranking_izoterm.csv", mime="text/csv")
+
+    # Jedna figura dla wszystkich serii, w kolejności rankingu
+    nakladka = [(nazwa, serie[nazwa]) for nazwa in wyniki["seria"]]
+    parametry = list(zip(wyniki["B_sz"].to_numpy(float), wyniki["A_sz"].to_numpy(float)))
+    st.image(renderuj(rysuj_nakladke, nakladka, parametry, y0_wynikow, styl={"figsize": (10, 6)}), width="stretch")
+
+    termo = termodynamika(serie, y0_wynikow, alpha_wynikow, wyniki)
+
+    # Archiwum budowane dopiero po kliknięciu przycisku
+    tabele = {"wyniki": wyniki, "dane": serie}
+    parametry = {"y0": y0_wynikow, "T": T_wynikow, "alpha": alpha_wynikow}
+    if termo is not None:
+        tabele["termodynamika"] = termo[0]
+        parametry.update(termo[1]._asdict())
+    st.download_button("📦 Pobierz całą analizę (.zip)", lambda: pakiet_izoterm(tabele, parametry),
+                       file_name="analiza_izoterm.zip", mime="application/zip", on_click="ignore",
+                       help=pomoc_pakietu("Serie pomiarowe, ranking i termodynamika",
+                                          "Można je później wczytać bez ponownego dopasowania."))
+
+
+def pakiet_izoterm(tabele, parametry):
+    from obliczenia.eksport import zapisz_pakiet
+    from obliczenia.izoterma import ramka_serii
+
+    return zapisz_pakiet("izoterma", {**tabele, "dane": ramka_serii(tabele["dane"])}, parametry)
+
+
+def wczytaj_zapisana_analize():
+    # Wywołanie zwrotne: wyniki z pakietu trafiają do stanu sesji bez ponownego dopasowania
+    from obliczenia.eksport import wczytaj_pakiet
+    from obliczenia.izoterma import T_DOMYSLNA, serie_z_ramki
+
+    try:
+        pakiet = wczytaj_pakiet(st.session_state.pakiet_izoterm)
+        if pakiet.analiza != "izoterma":
+            raise ValueError(f"pakiet zawiera analizę '{pakiet.analiza}'")
+        serie = serie_z_ramki(pakiet.tabele["dane"], "")
+        parametry = pakiet.parametry
+        st.session_state.izotermy_wsadowe = (serie, pakiet.tabele["wyniki"], parametry["y0"],
+                                             parametry.get("T", T_DOMYSLNA), parametry.get("alpha"))
+    except Exception as e:
+        st.session_state.blad_pakietu = f"Nie można wczytać analizy: {e}"
+
+
+def rysuj_delta_g(ax, T, delta_gm, delta_hm, delta_sm):
+    import numpy as np
+
+    ax.scatter(T, delta_gm, color="blue", zorder=5, label="ΔGm z dopasowania")
+    T_linii = np.linspace(T.min(), T.max(), 50)
+    ax.plot(T_linii, delta_hm - T_linii * delta_sm / 1000, color="red",
+            label=f"ΔGm = {delta_hm:.2f} − T·{delta_sm / 1000:.4f}")
+    ax.set_xlabel("T [K]", fontsize=12)
+    ax.set_ylabel("ΔGm [kJ/mol]", fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+
+@st.cache_data(max_entries=32)
+def dopasuj_termodynamike(serie, y0, alpha):
+    # Wspólne dopasowanie serii liczone raz dla danego wyboru, a nie przy każdym odświeżeniu strony
+    from obliczenia.izoterma import termodynamika_micelizacji
+
+    return termodynamika_micelizacji(serie, y0, alpha)
+
+
+def termodynamika(serie, y0, alpha, wyniki):
+    """Sekcja ΔGm(T); zwraca (tabela, WynikTermodynamiki) albo None, gdy brak co najmniej dwóch temperatur."""
+    from obliczenia.wykresy import renderuj
+
+    z_temperatura = [nazwa for nazwa in wyniki.loc[wyniki["blad"] == "", "seria"] if serie[nazwa][2] is not None]
+    if len({serie[nazwa][2] for nazwa in z_temperatura}) < 2:
+        return None
+
+    st.subheader("🌡️ Termodynamika micelizacji – ΔGm(T)")
+    wybrane = st.multiselect("Serie jednego surfaktantu w różnych temperaturach", z_temperatura,
+                             default=z_temperatura, key="serie_termodynamiki")
+    temperatury = [serie[nazwa][2] for nazwa in wybrane]
+    if len(set(temperatury)) < 2:
+        st.info("Wybierz serie zmierzone w co najmniej dwóch różnych temperaturach.")
+        return None
+
+    # Wszystkie wybrane serie dopasowywane razem jednym wektorowym rozwiązaniem
+    tabela, wynik = dopasuj_termodynamike([(serie[n][2], serie[n][0], serie[n][1]) for n in wybrane], y0, alpha)
+    st.dataframe(tabela, hide_index=True, width="stretch", column_config={
+        "CMC": st.column_config.NumberColumn("CMC [mol/L]", format="%.3e"),
+        "A_sz": st.column_config.NumberColumn("A_sz [mol/L]", format="%.3e"),
+        "DeltaGm": st.column_config.NumberColumn("ΔGm [kJ/mol]", format="%.3f"),
+    })
+    niepewnosc = wynik.n > 2
+    st.markdown(
+        f"- **ΔHm** = {wynik.DeltaHm:.2f}{f' ± {wynik.se_H:.2f}' if niepewnosc else ''} kJ/mol\n"
+        f"- **ΔSm** = {wynik.DeltaSm:.1f}{f' ± {wynik.se_S:.1f}' if niepewnosc else ''} J/(mol·K)"
+        + (f"\n- R² prostej ΔGm(T) = {wynik.r2:.4f}" if niepewnosc else "")
+    )
+    st.image(renderuj(rysuj_delta_g, tabela["T"].to_numpy(), tabela["DeltaGm"].to_numpy(),
+                      wynik.DeltaHm, wynik.DeltaSm), width="stretch")
+    return tabela, wynik
+
+
+def rysuj_modele(ax, x_data, y_data, dopasowania, wybrany, y0, T):
+    import numpy as np
+    from obliczenia.modele_izoterm import krzywa_modelu
+
+    dodatnie = x_data[x_data > 0]
+    c_linii = np.geomspace(dodatnie.min(), dodatnie.max(), 300)
+    ax.scatter(x_data, y_data, label='Dane eksperymentalne', color='blue', zorder=5)
+    for nazwa, parametry in dopasowania:
+        ax.plot(c_linii, krzywa_modelu(nazwa, c_linii, parametry, y0, T), label=nazwa,
+                linewidth=2.5 if nazwa == wybrany else 1.0, alpha=1.0 if nazwa == wybrany else 0.6)
+    ax.set_xscale("log")
+    ax.set_xlabel('Stężenie [mol/L]', fontsize=12)
+    ax.set_ylabel('Napięcie powierzchniowe [mN/m]', fontsize=12)
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend()
+
+
+def porownanie_modeli(x_data, y_data, y0, T):
+    """Sekcja porównania modeli izotermy: dopasowanie wszystkich w puli procesów i ranking AICc/AIC/BIC."""
+    import numpy as np
+    from obliczenia.modele_izoterm import KRYTERIA, MODELE, ranking_modeli, zglos_porownanie_modeli
+    from obliczenia.wykresy import renderuj
+    from obliczenia.zadania import LimitZadan, domyslna_pula
+
+    st.subheader("📊 Porównanie modeli izotermy")
+    st.caption(", ".join(f"**{nazwa}**: {model.opis}" for nazwa, model in MODELE.items()))
+    klucz_danych = (x_data.tobytes(), y_data.tobytes(), y0, T)
+
+    zgloszono = False
+    if st.button("Porównaj modele"):
+        try:
+            klucz = zglos_porownanie_modeli(domyslna_pula(), uzytkownik(), x_data, y_data, y0, T)
+            st.session_state.zadanie_porownania = (klucz, klucz_danych)
+            zgloszono = True
+        except (LimitZadan, ValueError) as e:
+            st.warning(str(e))
+
+    if "zadanie_porownania" in st.session_state:
+        stan = wynik_zadania("zadanie_porownania", "Dopasowywanie modeli", czekaj=2.0 if zgloszono else 0.0)
+        if stan is not None:
+            _, klucz_zadania = st.session_state.pop("zadanie_porownania")
+            if stan.blad:
+                st.error(f"Błąd porównania modeli: {stan.blad}")
+            else:
+                st.session_state.porownanie_modeli = (klucz_zadania, stan.wynik)
+
+    if not st.session_state.get("porownanie_modeli") or st.session_state.porownanie_modeli[0] != klucz_danych:
+        return
+    # Zmiana kryterium tylko przestawia ranking, bez ponownego dopasowania
+    kryterium = st.radio("Kryterium", KRYTERIA, index=KRYTERIA.index("AICc"), horizontal=True,
+                         help="AICc to AIC z poprawką na małą liczbę punktów")
+    ranking = ranking_modeli(st.session_state.porownanie_modeli[1].drop(columns=["pozycja"]).to_dict("records"),
+                             kryterium)
+    dopasowane = ranking[ranking["blad"] == ""]
+    tabela = ranking.assign(parametry=[", ".join(f"{k} = {v:.4g}" for k, v in p.items())
+                                       for p in ranking["parametry"]])
+    st.dataframe(tabela, hide_index=True, width="stretch", column_config={
+        "SSE": st.column_config.NumberColumn("SSE [(mN/m)²]", format="%.4g"),
+        "R2": st.column_config.NumberColumn("R²", format="%.4f"),
+        "AIC": st.column_config.NumberColumn(format="%.2f"),
+        "AICc": st.column_config.NumberColumn(format="%.2f"),
+        "BIC": st.column_config.NumberColumn(format="%.2f"),
+        "delta": st.column_config.NumberColumn(f"Δ{kryterium}", format="%.2f"),
+        "waga": st.column_config.NumberColumn("Waga", format="%.3f"),
+        "CMC": st.column_config.NumberColumn("CMC [mol/L]", format="%.3e"),
+    })
+    if dopasowane.empty:
+        return
+
+    # Najlepszy model wybrany domyślnie; inny jednym kliknięciem
+    wybrany = st.radio("Model", list(dopasowane["model"]), horizontal=True, key="wybrany_model")
+    wiersz = dopasowane.set_index("model").loc[wybrany]
+    opis_cmc = (f"CMC = {wiersz['CMC']:.4e} mol/L" if np.isfinite(wiersz["CMC"])
+                else "model nie wyznacza CMC")
+    st.markdown(f"**{wybrany}** ({MODELE[wybrany].opis}): {opis_cmc}, R² = {wiersz['R2']:.4f}, "
+                f"Δ{kryterium} = {wiersz['delta']:.2f}")
+    dopasowania = list(zip(dopasowane["model"], dopasowane["parametry"]))
+    st.image(renderuj(rysuj_modele, x_data, y_data, dopasowania, wybrany, y0, T), width="stretch")
+    st.download_button("📥 Pobierz porównanie modeli (CSV)",
+                       tabela.to_csv(index=False, sep=";").encode("utf-8-sig"), file_name="porownanie_modeli.csv", mime="text/csv")
+
 
 st.title("Izoterma napięcia powierzchniowego — Model Szyszkowskiego")
+panel_wydajnosci()
 
 # Stałe fizyczne
 R = 8.314         # Stała gazowa [J/mol·K]
-T = 298           # Temperatura [K]
+T = 298           # Temperatura domyślna [K], gdy plik nie ma kolumny temperatury
 
 # Edytowalne napięcie powierzchniowe wody
 FIXED_Y0 = st.number_input(
@@ -21,11 +327,25 @@ FIXED_Y0 = st.number_input(
     help="Napięcie powierzchniowe wody w 20°C wynosi około 72.0 mN/m"
 )
 
+if st.radio("Tryb", ["Jedna seria", "Wsadowo (wiele serii)"], horizontal=True) == "Wsadowo (wiele serii)":
+    izotermy_wsadowo(FIXED_Y0, T)
+    st.stop()
+
 uploaded_file = st.file_uploader("Wczytaj plik CSV z danymi (z separatorem ';')", type="csv")
 
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file, sep=";")
-    df.columns = [col.strip().lower() for col in df.columns]
+    # Ciężkie biblioteki importowane dopiero po wczytaniu danych
+    import os
+    import pandas as pd
+    import numpy as np
+    import altair as alt
+    from obliczenia import izoterma
+    from obliczenia.izoterma import wczytaj_plik, krzywa_z_siatki, zglos_bootstrap, zglos_dopasowanie_serii
+    from obliczenia.eksport import zapisz_pakiet
+    from obliczenia.wykresy import renderuj
+    from obliczenia.zadania import LimitZadan, domyslna_pula
+
+    df = wczytaj_plik(uploaded_file)
 
     if "stezenie" not in df.columns or "napiecie" not in df.columns:
         st.error("Plik musi zawierać kolumny 'stezenie' i 'napiecie'")
@@ -39,8 +359,7 @@ if uploaded_file is not None:
 
         def szyszkowski_model(c, B_sz, A_sz):
             """Model Szyszkowskiego ze stałym γ₀=72 mN/m"""
-            safe_c = np.maximum(c, 1e-12)
-            return FIXED_Y0 * (1 - B_sz * np.log(safe_c/A_sz + 1))
+            return izoterma.szyszkowski_model(c, B_sz, A_sz, FIXED_Y0)
 
         # Wybór typu surfaktantu
         surfactant_type = st.selectbox(
@@ -59,31 +378,48 @@ if uploaded_file is not None:
                 format="%.2f"
             )
 
+        # Temperatura zmierzona razem z izotermą (kolumna temp/temperatura w °C)
+        T_pliku = izoterma.temperatura_z_ramki(df)
+        T = st.number_input(
+            "Temperatura [K]:",
+            min_value=200.0,
+            max_value=400.0,
+            value=round(T_pliku, 2) if T_pliku else float(T),
+            step=0.1,
+            help="Domyślnie średnia z kolumny 'temp'/'temperatura' pliku (°C), a bez niej 298 K"
+        )
+
         if "model_fitted" not in st.session_state:
             st.session_state.model_fitted = False
 
+        # Ograniczenia parametrów
+        bounds = (
+            [0.001, 1e-7],  # Dolne granice [B_sz, A_sz]
+            [1.0,   1.0]    # Górne granice
+        )
+
+        zgloszono = False
         if st.button("Modeluj"):
             try:
-                # Ograniczenia parametrów
-                bounds = (
-                    [0.001, 1e-7],  # Dolne granice [B_sz, A_sz]
-                    [1.0,   1.0]    # Górne granice
-                )
-                
-                # Parametry początkowe
-                initial_guess = [0.2, 0.01]  # [B_sz, A_sz]
-                
-                params, _ = curve_fit(szyszkowski_model, x_data, y_data, 
-                                    p0=initial_guess,
-                                    bounds=bounds,
-                                    maxfev=10000)
-                
-                st.session_state.params = params
-                st.session_state.model_fitted = True
+                # Start z wielu punktów siatki (B, A) we wspólnej puli procesów serwera
+                klucz = zglos_dopasowanie_serii(domyslna_pula(), uzytkownik(), {"": (x_data, y_data, None)},
+                                                FIXED_Y0, T, granice=bounds)
+                st.session_state.zadanie_modelu = (klucz,)
+                zgloszono = True
+            except LimitZadan as e:
+                st.warning(str(e))
 
-            except Exception as e:
-                st.error(f"Błąd dopasowania: {e}")
-                st.session_state.model_fitted = False
+        if "zadanie_modelu" in st.session_state:
+            stan = wynik_zadania("zadanie_modelu", "Dopasowywanie modelu", czekaj=2.0 if zgloszono else 0.0)
+            if stan is not None:
+                del st.session_state.zadanie_modelu
+                blad = stan.blad or stan.wynik["blad"].iloc[0]
+                if blad:
+                    st.error(f"Błąd dopasowania: {blad}")
+                    st.session_state.model_fitted = False
+                else:
+                    st.session_state.params = stan.wynik[["B_sz", "A_sz"]].to_numpy(float)[0]
+                    st.session_state.model_fitted = True
 
         if st.session_state.model_fitted:
             B_sz_fit, A_sz_fit = st.session_state.params
@@ -95,19 +431,14 @@ if uploaded_file is not None:
             st.write(f"- B_sz = {B_sz_fit:.4f}")
             st.write(f"- A_sz = {A_sz_fit * 1e6:.6f} µmol/L")
 
-            # Obliczenie CMC
-            cmc = A_sz_fit * (np.exp(1/B_sz_fit) - 1) *0.001  # mmol/L
+            # Obliczenie CMC, adsorpcji i energii micelizacji
+            alpha_sz = alpha if surfactant_type == "Jonowy" else None
+            wyniki_izotermy = izoterma.parametry_izotermy(B_sz_fit, A_sz_fit, FIXED_Y0, T, alpha_sz)
+            cmc = wyniki_izotermy["CMC"]  # mol/L
             gamma_cmc = szyszkowski_model(cmc, B_sz_fit, A_sz_fit)
-
-            # Obliczenia adsorpcji
-            gamma = (FIXED_Y0 * B_sz_fit * cmc) / (R * T * (A_sz_fit + cmc))  # mol/m²
-            gamma_max = (FIXED_Y0 * B_sz_fit) / (R * T)  # mol/m²
-
-            # Obliczenia energii micelizacji
-            if surfactant_type == "Jonowy":
-                delta_gm = R * T * (1 + alpha) * np.log(cmc) / 1000
-            else:
-                delta_gm = R * T * np.log(cmc) / 1000
+            gamma = wyniki_izotermy["Gamma (CMC)"]  # mol/m²
+            gamma_max = wyniki_izotermy["Gamma_max"]  # mol/m²
+            delta_gm = wyniki_izotermy["DeltaGm"]  # kJ/mol
 
             # Wyświetlanie wyników
             st.subheader("Parametry izotermy")
@@ -131,57 +462,112 @@ if uploaded_file is not None:
             if r_squared < 0.9:
                 st.warning("Uwaga: Model może nie być dobrze dopasowany do danych (R² < 0.9).")
 
+            # Przedziały ufności z bootstrapu reszt
+            st.subheader("Przedziały ufności (bootstrap)")
+            col1, col2 = st.columns(2)
+            with col1:
+                proby = st.number_input("Liczba prób bootstrapu", min_value=100, max_value=100000,
+                                        value=2000, step=100)
+            with col2:
+                limit_czasu = st.number_input("Limit czasu [s]", min_value=1.0, max_value=600.0,
+                                              value=30.0, step=1.0)
+            klucz_bootstrapu = (tuple(st.session_state.params), FIXED_Y0, T, surfactant_type, alpha_sz)
+
+            zgloszono = False
+            if st.button("Oblicz przedziały ufności (95%)"):
+                try:
+                    klucz = zglos_bootstrap(domyslna_pula(), uzytkownik(), x_data, y_data, FIXED_Y0, bounds, T,
+                                            alpha_sz, proby=int(proby), limit_czasu=limit_czasu)
+                    st.session_state.zadanie_bootstrapu = (klucz, klucz_bootstrapu)
+                    zgloszono = True
+                except LimitZadan as e:
+                    st.warning(str(e))
+
+            if "zadanie_bootstrapu" in st.session_state:
+                stan = wynik_zadania("zadanie_bootstrapu", "Bootstrap (paczki prób)", czekaj=0.5 if zgloszono else 0.0)
+                if stan is not None:
+                    _, klucz_zadania = st.session_state.pop("zadanie_bootstrapu")
+                    if stan.blad:
+                        st.error(f"Błąd bootstrapu: {stan.blad}")
+                    else:
+                        st.session_state.bootstrap = (klucz_zadania, *stan.wynik)
+
+            tabela_ci = None
+            if st.session_state.get("bootstrap") and st.session_state.bootstrap[0] == klucz_bootstrapu:
+                _, tabela_ci, wykonane = st.session_state.bootstrap
+                if wykonane < proby:
+                    st.warning(f"Limit czasu: wykonano {wykonane} z {int(proby)} prób.")
+                st.dataframe(tabela_ci.style.format(precision=8), hide_index=True)
+
             # Interaktywna modyfikacja parametrów
-            st.subheader("Modyfikacja parametrów modelu")
-            mode = st.radio("Tryb edycji:", ["Suwaki", "Wprowadź ręcznie"])
-            
-            if mode == "Suwaki":
-                col1, col2 = st.columns(2)
-                with col1:
-                    B_sz_manual = st.slider("B", 0.0001, 1.0, float(B_sz_fit), 0.0001, format="%.4f")
-                with col2:
-                    A_sz_manual_umol = st.slider("A", 0.0001, 100.0, float(A_sz_fit * 1e6), 0.0001, format="%.4f")
-                    A_sz_manual = A_sz_manual_umol / 1e6  # Konwersja z µmol/L na mol/L
-            else:
+            @st.fragment
+            def panel_modyfikacji():
+                # Fragment: zmiana parametrów przelicza tylko ten panel, a nie cały skrypt
+                st.subheader("Modyfikacja parametrów modelu")
+                mode = st.radio("Tryb edycji:", ["Suwaki", "Wprowadź ręcznie"])
+
+                x_range = np.linspace(min(x_data), max(x_data)*1.1, 300)
+                y_fit = szyszkowski_model(x_range, B_sz_fit, A_sz_fit)
+
+                if mode == "Suwaki":
+                    # Suwaki działają po stronie przeglądarki (parametry Vega-Lite), bez ponownego
+                    # uruchamiania skryptu; krzywa ręczna liczona jest na gotowej siatce stężeń
+                    B_param = alt.param("B", value=float(B_sz_fit),
+                                        bind=alt.binding_range(min=0.0001, max=1.0, step=0.0001, name="B "))
+                    A_param = alt.param("A", value=round(float(A_sz_fit * 1e6), 4),
+                                        bind=alt.binding_range(min=0.0001, max=100.0, step=0.0001, name="A [µmol/L] "))
+                    os_x = alt.X("c:Q", title="Stężenie [mol/L]")
+                    os_y = alt.Y("y:Q", title="Napięcie powierzchniowe [mN/m]", scale=alt.Scale(zero=False))
+
+                    krzywe = alt.Chart(pd.DataFrame({"c": x_range, "y": y_fit}))
+                    automatyczna = krzywe.mark_line(color="red", strokeWidth=2).encode(x=os_x, y=os_y)
+                    reczna = krzywe.transform_calculate(
+                        y=f"{FIXED_Y0} * (1 - B * log(max(datum.c, 1e-12) / (A * 1e-6) + 1))"
+                    ).mark_line(color="green", strokeDash=[6, 4], strokeWidth=2).encode(x=os_x, y=os_y)
+                    punkty = alt.Chart(pd.DataFrame({"c": x_data, "y": y_data})).mark_circle(
+                        color="blue", size=60, opacity=1).encode(x=os_x, y=os_y)
+                    cmc_auto = alt.Chart(pd.DataFrame({"cmc": [cmc]})).mark_rule(
+                        color="purple", strokeDash=[2, 2]).encode(x="cmc:Q")
+                    cmc_reczne = alt.Chart(pd.DataFrame({"cmc": [0.0]})).transform_calculate(
+                        cmc="A * 1e-6 * (exp(1 / B) - 1) * 0.001",
+                        opis="'CMC (ręczne) = ' + format(datum.cmc, '.6f') + ' mol/L'"
+                    )
+                    cmc_reczne = (cmc_reczne.mark_rule(color="orange", strokeDash=[2, 2]).encode(x="cmc:Q")
+                                  + cmc_reczne.mark_text(align="left", dx=4, dy=-120, color="orange")
+                                  .encode(x="cmc:Q", text="opis:N"))
+
+                    wykres = alt.layer(automatyczna, reczna, punkty, cmc_auto, cmc_reczne).add_params(
+                        B_param, A_param
+                    ).properties(
+                        height=450,
+                        title=f"γ = {FIXED_Y0:.2f}·(1 − {B_sz_fit:.6f}·ln(c/{A_sz_fit * 1e6:.6f} + 1)),  "
+                              f"CMC = {cmc:.6f} mol/L"
+                    )
+                    st.altair_chart(wykres, use_container_width=True)
+                    return
+
                 B_sz_manual = st.number_input("B", value=float(B_sz_fit), step=0.0001, format="%.4f")
-                A_sz_manual_umol = st.number_input("A", value=float(A_sz_fit * 1e6), step=0.0001, format="%.4f")
+                A_sz_manual_umol = st.number_input("A", min_value=0.0001, value=float(A_sz_fit * 1e6), step=0.0001,
+                                                   format="%.4f", help="µmol/L, wartość dodatnia")
                 A_sz_manual = A_sz_manual_umol / 1e6  # µmol/L → mol/L
 
-            # Generowanie wykresu
-            x_range = np.linspace(min(x_data), max(x_data)*1.1, 300)
-            y_fit = szyszkowski_model(x_range, B_sz_fit, A_sz_fit)
-            y_manual = szyszkowski_model(x_range, B_sz_manual, A_sz_manual)
-
-            # Obliczenia dla parametrów ręcznych
-            cmc_manual = A_sz_manual * (np.exp(1/B_sz_manual) - 1) * 0.001
-            gamma_cmc_manual = szyszkowski_model(cmc_manual, B_sz_manual, A_sz_manual)
-
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(x_range, y_fit, 'r-', label='Dopasowanie automatyczne', linewidth=2)
-            ax.plot(x_range, y_manual, 'g--', label='Parametry ręczne', linewidth=2)
-            ax.scatter(x_data, y_data, label='Dane eksperymentalne', color='blue', zorder=5)
-
-            # Zaznaczenie CMC
-            ax.axvline(cmc, color='purple', linestyle=':', label=f'CMC = {cmc:.6f} mol/L')
-            ax.scatter([cmc], [gamma_cmc], color='purple', s=100, zorder=6)
-            ax.axvline(cmc_manual, color='orange', linestyle=':', label=f'CMC (ręczne) = {cmc_manual:.6f} mol/L')
-            ax.scatter([cmc_manual], [gamma_cmc_manual], color='orange', s=100, zorder=6)
-
-            # Formatowanie wykresu
-            ax.set_xlabel('Stężenie [mol/L]', fontsize=12)
-            ax.set_ylabel('Napięcie powierzchniowe [mN/m]', fontsize=12)
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Wyświetlanie równania
-            equation_text = (
-                f"$\gamma = {FIXED_Y0:.2f} \cdot (1 - {B_sz_fit:.6f} \cdot "
-                f"\ln(\\frac{{c}}{{{A_sz_fit * 1e6:.6f}}} + 1))$"            )
-            plt.title(equation_text, fontsize=12, pad=20)
-            
-            st.pyplot(fig)
-            
-            plt.tight_layout()
+                # Krzywa ręczna z gotowej siatki zamiast ponownego liczenia modelu
+                y_manual = krzywa_z_siatki(siatka_dla_zakresu(x_range), B_sz_manual, A_sz_manual, FIXED_Y0)
+
+                # Obliczenia dla parametrów ręcznych
+                cmc_manual = A_sz_manual * (np.exp(1/B_sz_manual) - 1) * 0.001
+                gamma_cmc_manual = szyszkowski_model(cmc_manual, B_sz_manual, A_sz_manual)
+
+                # Wyświetlanie równania
+                equation_text = (
+                    f"$\\gamma = {FIXED_Y0:.2f} \\cdot (1 - {B_sz_fit:.6f} \\cdot "
+                    f"\\ln(\\frac{{c}}{{{A_sz_fit * 1e6:.6f}}} + 1))$"            )
+                obraz = renderuj(rysuj_porownanie, x_range, y_fit, y_manual, x_data, y_data,
+                                 (cmc, gamma_cmc), (cmc_manual, gamma_cmc_manual), equation_text,
+                                 styl={"figsize": (10, 6)})
+                st.image(obraz, width="stretch")
+
+            panel_modyfikacji()
 
             # Eksport wyników
             results = pd.DataFrame({
@@ -197,10 +583,36 @@ if uploaded_file is not None:
                 help="Wprowadź nazwę pliku bez rozszerzenia .csv"
             )
             
+            if tabela_ci is not None:
+                przedzialy = tabela_ci.set_index("Parametr")
+                results["CI95_dolny"] = results["Parametr"].map(przedzialy["CI_dolny"])
+                results["CI95_gorny"] = results["Parametr"].map(przedzialy["CI_gorny"])
+
             csv = results.to_csv(index=False, sep=";", encoding='utf-8-sig')
             st.download_button(
                 label="Pobierz wyniki jako CSV",
                 data=csv,
                 file_name=f"{filename}.csv",
                 mime="text/csv"
-            )
\ No newline at end of file
+            )
+
+            # Pakiet w układzie analizy wsadowej – można go wczytać w trybie "Wsadowo"
+            seria = os.path.splitext(uploaded_file.name)[0]
+            tabele = {
+                "wyniki": pd.DataFrame([{"pozycja": 1, "seria": seria, "punkty": len(x_data), "T": T,
+                                         **wyniki_izotermy, "R2": r_squared, "blad": ""}],
+                                       columns=izoterma.KOLUMNY_WYNIKOW),
+                "dane": izoterma.ramka_serii({seria: (x_data, y_data, T)}),
+            }
+            if tabela_ci is not None:
+                tabele["przedzialy"] = tabela_ci
+            st.download_button(
+                label="📦 Pobierz całą analizę (.zip)",
+                data=lambda: zapisz_pakiet("izoterma", tabele, {"y0": FIXED_Y0, "T": T, "alpha": alpha_sz}),
+                file_name=f"{filename}.zip",
+                mime="application/zip",
+                on_click="ignore",
+                help=pomoc_pakietu("Dane, parametry dopasowania i przedziały ufności")
+            )
+
+        porownanie_modeli(x_data, y_data, FIXED_Y0, T)
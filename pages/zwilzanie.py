@@ -1,11 +1,122 @@
 import streamlit as st 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import linregress
 import math
 
+from interfejs import panel_wydajnosci, pomoc_pakietu, uzytkownik, wynik_zadania
+
+
+@st.cache_data
+def wyznacz_okna(czas, masa2):
+    from obliczenia.zwilzanie import najlepsze_okno
+
+    return najlepsze_okno(czas, masa2)
+
+
+def rysuj_washburna(ax, czas, masa2, czas_reg, slope, intercept, zakres):
+    # plot z markerami zamiast scatter: jedna linia zamiast kolekcji punktów, szybsze dla długich serii
+    ax.plot(czas, masa2, 'o', color='blue', label='Dane eksperymentalne')
+    ax.plot(czas_reg, slope * czas_reg + intercept, color='red', label='Regresja liniowa')
+    ax.set_xlabel("Czas [s]")
+    ax.set_ylabel("m² [g²]")
+    ax.legend()
+    ax.axvline(zakres[0], color='green', linestyle='--', label='Początek zakresu')
+    ax.axvline(zakres[1], color='orange', linestyle='--', label='Koniec zakresu')
+    ax.axvspan(zakres[0], zakres[1], color='yellow', alpha=0.2, label='Zakres regresji')
+
+
+def pakiet_zwilzania(wyniki, zrodla, parametry):
+    import pandas as pd
+    from obliczenia.eksport import zapisz_pakiet
+    from obliczenia.zwilzanie import dane_plikow
+
+    # Surowe dane: ramka z wczytanego pakietu albo pliki parsowane po jednym
+    dane = zrodla if isinstance(zrodla, pd.DataFrame) else dane_plikow(zrodla, wyniki)
+    return zapisz_pakiet("zwilzanie", {"wyniki": wyniki, "dane": dane}, parametry)
+
+
+def wczytaj_zapisana_analize():
+    # Wywołanie zwrotne: wyniki z pakietu trafiają do stanu sesji bez ponownych obliczeń
+    from obliczenia.eksport import wczytaj_pakiet
+
+    try:
+        pakiet = wczytaj_pakiet(st.session_state.pakiet_zwilzania)
+        if pakiet.analiza != "zwilzanie":
+            raise ValueError(f"pakiet zawiera analizę '{pakiet.analiza}'")
+        st.session_state.zwilzanie_wsadowe = (pakiet.tabele["wyniki"], pakiet.tabele["dane"], pakiet.parametry)
+    except Exception as e:
+        st.session_state.blad_pakietu = f"Nie można wczytać analizy: {e}"
+
+
 st.title("Wyznaczanie kąta zwilżania")
+panel_wydajnosci()
+
+tryb = st.radio("Tryb pracy", ["Pojedynczy plik", "Wsadowo (wiele plików)"], horizontal=True)
+
+if tryb == "Wsadowo (wiele plików)":
+    # Ciężkie biblioteki importowane dopiero, gdy tryb ich potrzebuje
+    import pandas as pd
+    from obliczenia.archiwum import ZWILZANIE, rozpakuj
+    from obliczenia.zadania import LimitZadan, domyslna_pula
+    from obliczenia.zwilzanie import PRESETY_CIECZY, podsumuj, zglos_analize_plikow
+
+    st.markdown("#### Parametry cieczy")
+    st.caption("Ciecz jest rozpoznawana z nazwy pliku (np. *wodaceramika1.xls*). "
+               "Pliki goniometru z kolumną 'CA mean [°]' dają bezpośrednio średni zmierzony kąt.")
+    presety = st.data_editor(
+        pd.DataFrame(PRESETY_CIECZY).T.rename_axis("ciecz"),
+        column_config={
+            "eta": st.column_config.NumberColumn("η [mPa·s]"),
+            "rho": st.column_config.NumberColumn("ρ [g/cm³]"),
+            "gamma": st.column_config.NumberColumn("γ [mN/m]"),
+        },
+        num_rows="dynamic",
+        key="presety_cieczy"
+    )
+    B_wsadowo = st.number_input("Stała materiałowa B", value=0.000001, step=0.000001, format="%.8f",
+                                key="B_wsadowo")
+    pliki = st.file_uploader("📂 Wczytaj pliki CSV lub XLS (także w archiwum .zip)", accept_multiple_files=True)
+
+    zgloszono = False
+    if pliki and st.button("Oblicz kąty"):
+        # Archiwa czytane w pamięci; pliki innych analiz (np. izotermy) są pomijane
+        zrodla, pominiete = rozpakuj([(p.name, p.getvalue()) for p in pliki], ZWILZANIE)
+        if pominiete:
+            st.info(f"Pominięto pliki archiwum, które nie są pomiarami zwilżania: {', '.join(pominiete)}")
+        try:
+            # Pliki (także parsowanie XLS) przetwarzane we wspólnej puli procesów serwera
+            klucz = zglos_analize_plikow(domyslna_pula(), uzytkownik(), zrodla, B_wsadowo,
+                                         presety.to_dict(orient="index"))
+            st.session_state.zadanie_zwilzania = (klucz, zrodla, {"B": B_wsadowo})
+            zgloszono = True
+        except LimitZadan as e:
+            st.warning(str(e))
+
+    if "zadanie_zwilzania" in st.session_state:
+        stan = wynik_zadania("zadanie_zwilzania", "Przetwarzanie plików", czekaj=0.5 if zgloszono else 0.0)
+        if stan is not None:
+            _, zrodla, parametry = st.session_state.pop("zadanie_zwilzania")
+            if stan.blad:
+                st.error(f"Błąd obliczeń: {stan.blad}")
+            else:
+                st.session_state.zwilzanie_wsadowe = (stan.wynik, zrodla, parametry)
+
+    with st.expander("📂 Wczytaj zapisaną analizę"):
+        st.file_uploader("Pakiet analizy zwilżania (.zip)", type="zip", key="pakiet_zwilzania")
+        st.button("Wczytaj analizę", on_click=wczytaj_zapisana_analize,
+                  disabled=st.session_state.pakiet_zwilzania is None)
+        if "blad_pakietu" in st.session_state:
+            st.error(st.session_state.pop("blad_pakietu"))
+
+    if "zwilzanie_wsadowe" in st.session_state:
+        wyniki, zrodla, parametry = st.session_state.zwilzanie_wsadowe
+        st.markdown("### Wyniki dla plików")
+        st.dataframe(wyniki, hide_index=True)
+        st.markdown("### Kąt zwilżania dla cieczy (średnia ± odchylenie)")
+        st.dataframe(podsumuj(wyniki), hide_index=True)
+        st.download_button("📦 Pobierz całą analizę (.zip)", lambda: pakiet_zwilzania(wyniki, zrodla, parametry),
+                           file_name="analiza_zwilzania.zip", mime="application/zip", on_click="ignore",
+                           help=pomoc_pakietu("Surowe dane wszystkich plików i wyniki",
+                                              "Można je później wczytać bez ponownych obliczeń."))
+    st.stop()
 
 st.markdown("#### Parametry fizykochemiczne")
 col1, col2 = st.columns(2)
@@ -24,47 +135,45 @@ st.markdown("---")
 uploaded_file = st.file_uploader("📂 Wczytaj plik CSV lub XLS")
 
 if uploaded_file:
+    import os
+    import pandas as pd
+    import numpy as np
+    from obliczenia.eksport import zapisz_pakiet
+    from obliczenia.regresja import regresja_liniowa
+    from obliczenia.wykresy import przerzedz, renderuj
+    from obliczenia.zwilzanie import (KOLUMNY_DANYCH, KOLUMNY_WYNIKOW, kat_zwilzania, przygotuj_dane,
+                                      rozpoznaj_ciecz, wczytaj_plik)
+
     try:
-        if uploaded_file.name.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file, sep=None, engine='python')
-        else:
+        if not uploaded_file.name.endswith(('.xls', '.xlsx', '.csv')):
             st.error("Nieobsługiwany format pliku. Proszę załadować plik CSV lub XLS.")
             st.stop()
-
-        df.columns = [col.strip() for col in df.columns]
-        col_map = {
-            'Time [s]': 'time',
-            'Mass [g]': 'mass',
-            'Mass² [g²]': 'masa^2'
-        }
-        df.rename(columns={k: v for k, v in col_map.items() if k in df.columns}, inplace=True)
+        df = przygotuj_dane(wczytaj_plik(uploaded_file))
 
         if 'time' not in df.columns:
             st.error("Brak kolumny 'time' lub jej odpowiednika.")
             st.stop()
-
         if 'masa^2' not in df.columns:
-            if 'mass' in df.columns:
-                df['mass'] = pd.to_numeric(df['mass'].astype(str).str.replace(',', '.'), errors='coerce')
-                df['masa^2'] = df['mass'] ** 2
-            else:
-                st.error("Brak kolumny 'masa^2' lub 'mass'.")
-                st.stop()
-
-
-        df['time'] = pd.to_numeric(df['time'].astype(str).str.replace(',', '.'), errors='coerce')
+            st.error("Brak kolumny 'masa^2' lub 'mass'.")
+            st.stop()
         df.dropna(subset=['time', 'masa^2'], inplace=True)
 
-        if 'masa^2' in df.columns:
-            df['masa^2'] = pd.to_numeric(df['masa^2'].astype(str).str.replace(',', '.'), errors='coerce')
-
         # wybór zakresu danych na osi X
         time_min = float(df['time'].min())
         time_max = float(df['time'].max())
+
+        # propozycja zakresu: okno o najlepszym kompromisie R² / długość
+        tabela_okien, najlepsze = wyznacz_okna(df['time'].to_numpy(), df['masa^2'].to_numpy())
+        if najlepsze is not None:
+            domyslny_zakres = (max(time_min, math.floor(najlepsze['t_od'] * 10) / 10),
+                               min(time_max, math.ceil(najlepsze['t_do'] * 10) / 10))
+            st.caption(f"Proponowany zakres: {najlepsze['t_od']:.1f}–{najlepsze['t_do']:.1f} s "
+                       f"({int(najlepsze['punkty'])} punktów, R² = {najlepsze['r2']:.4f})")
+        else:
+            domyslny_zakres = (time_min, time_min + (time_max - time_min) / 2)
+
         zakres = st.slider("Zakres czasu do regresji [s]", min_value=time_min, max_value=time_max,
-                           value=(time_min, time_min + (time_max - time_min) / 2), step=0.1)
+                           value=domyslny_zakres, step=0.1)
 
         mask = (df['time'] >= zakres[0]) & (df['time'] <= zakres[1])
         df_reg = df[mask]
@@ -74,32 +183,22 @@ if uploaded_file:
             st.stop()
 
         # regresja liniowa
-        slope, intercept, r_value, _, _ = linregress(df_reg['time'], df_reg['masa^2'])
-        A = 1 / slope if slope != 0 else np.nan
+        slope, intercept = regresja_liniowa(df_reg['time'], df_reg['masa^2'])[:2]
 
-        try:
-            denominator = B * (rho**2) * gamma * A
-            cos_theta = eta / denominator if denominator != 0 else np.nan
-            cos_theta = np.clip(cos_theta, -1, 1)
-            theta = math.degrees(math.acos(cos_theta))
+        # wykres: zakres regresji i reszta punktów przerzedzone do osobnych budżetów pikseli,
+        # prosta rysowana analitycznie z końców zakresu
+        czas, masa2 = df['time'].to_numpy(), df['masa^2'].to_numpy()
+        rysowane = przerzedz(czas, masa2, zachowaj=mask.to_numpy())
+        czas_reg = np.array([df_reg['time'].min(), df_reg['time'].max()])
+        obraz = renderuj(rysuj_washburna, czas[rysowane], masa2[rysowane], czas_reg, slope, intercept, zakres)
+        st.image(obraz, width="stretch")
 
+        try:
+            A, cos_theta, theta = kat_zwilzania(slope, eta, rho, gamma, B)
         except Exception as e:
-            cos_theta = None
-            theta = None
+            # Bez kąta nie ma wyników ani pakietu; wykres zostaje, by można było zmienić zakres
             st.error(f"Błąd podczas obliczania kąta: {e}")
-
-
-        # wykres
-        fig, ax = plt.subplots()
-        ax.scatter(df['time'], df['masa^2'], label='Dane eksperymentalne', color='blue')
-        ax.plot(df_reg['time'], slope * df_reg['time'] + intercept, color='red', label='Regresja liniowa')
-        ax.set_xlabel("Czas [s]")
-        ax.set_ylabel("m² [g²]")
-        ax.legend()
-        ax.axvline(zakres[0], color='green', linestyle='--', label='Początek zakresu')
-        ax.axvline(zakres[1], color='orange', linestyle='--', label='Koniec zakresu')
-        ax.axvspan(zakres[0], zakres[1], color='yellow', alpha=0.2, label='Zakres regresji')
-        st.pyplot(fig)
+            st.stop()
 
         # wyniki
         st.markdown("### Wyniki")
@@ -108,5 +207,21 @@ if uploaded_file:
         st.write(f"cos(θ): **{cos_theta:.6f}**")
         st.write(f"Kąt zwilżania θ: **{theta:.6f}°**")
 
+        with st.expander("📋 Nachylenie dla wszystkich okien czasu"):
+            st.dataframe(tabela_okien.sort_values("ocena", ascending=False), hide_index=True)
+
+        # Pakiet w układzie analizy wsadowej – można go wczytać w trybie "Wsadowo"
+        wynik = pd.DataFrame([{"plik": uploaded_file.name, "ciecz": rozpoznaj_ciecz(uploaded_file.name),
+                               "metoda": "Washburn", "punkty": len(df_reg), "slope": slope, "A": A,
+                               "cos_theta": cos_theta, "theta": theta, "blad": ""}], columns=KOLUMNY_WYNIKOW)
+        dane = df.reindex(columns=KOLUMNY_DANYCH)
+        dane.insert(0, "plik", uploaded_file.name)
+        parametry = {"eta": eta_mPa_s, "rho": rho, "gamma": gamma_mN_m, "B": B, "t_od": zakres[0],
+                     "t_do": zakres[1], "intercept": intercept}
+        st.download_button("📦 Pobierz całą analizę (.zip)",
+                           lambda: zapisz_pakiet("zwilzanie", {"wyniki": wynik, "dane": dane}, parametry),
+                           file_name=f"{os.path.splitext(uploaded_file.name)[0]}.zip", mime="application/zip",
+                           on_click="ignore", help=pomoc_pakietu("Dane pomiaru, zakres regresji i wyniki"))
+
     except Exception as e:
         st.error(f"Błąd podczas przetwarzania pliku: {e}")
@@ -1,24 +1,32 @@
 import subprocess
 import sys
 import os
-import pkg_resources
+import re
 import ctypes
 import platform
+from importlib import metadata
 
 requirements_file = "requirements.txt"
 
-def install_missing_packages():
-    with open(requirements_file) as f:
+def brakujace_pakiety(plik_wymagan):
+    # importlib.metadata sprawdza tylko wymienione pakiety – bez skanowania całego środowiska jak pkg_resources
+    with open(plik_wymagan) as f:
         required = f.read().splitlines()
 
-    installed = {pkg.key for pkg in pkg_resources.working_set}
     missing = []
-
     for requirement in required:
-        if requirement.strip() and not requirement.strip().startswith("#"):
-            pkg_name = requirement.strip().split("==")[0].lower()
-            if pkg_name not in installed:
-                missing.append(requirement.strip())
+        requirement = requirement.strip()
+        if not requirement or requirement.startswith("#"):
+            continue
+        pkg_name = re.split(r"[\s<>=!~;\[]", requirement, maxsplit=1)[0]
+        try:
+            metadata.version(pkg_name)
+        except metadata.PackageNotFoundError:
+            missing.append(requirement)
+    return missing
+
+def install_missing_packages():
+    missing = brakujace_pakiety(requirements_file)
 
     if missing:
         print("Instalowanie brakujących pakietów:")
@@ -30,11 +38,12 @@ def hide_console():
     if platform.system() == "Windows":
         ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 0)
 
-if os.path.exists(requirements_file):
-    install_missing_packages()
+if __name__ == "__main__":
+    if os.path.exists(requirements_file):
+        install_missing_packages()
 
-hide_console()
+    hide_console()
 
-print("Aby całkowicie wylaczyc aplikacje, prosze zamknac to okno\n")
+    print("Aby całkowicie wylaczyc aplikacje, prosze zamknac to okno\n")
 
-subprocess.Popen([sys.executable, "-m", "streamlit", "run", "Home.py", "--server.runOnSave=true"])
+    subprocess.Popen([sys.executable, "-m", "streamlit", "run", "Home.py", "--server.runOnSave=true"])